@@ -1,8 +1,13 @@
 # app.py
 
+import click
 from flask import Flask, render_template, session
 from flask_cors import CORS
 from config import Config
+import models
+from utils import metrics, migrations, profiler
+from regrade import RegradeJob
+from utils.auth import revoke_user, tokens_enabled
 
 # Import Blueprints
 from routes.auth import auth_bp
@@ -24,6 +29,10 @@ app.config.from_object(Config)
 # Secret key for sessions
 app.secret_key = Config.SECRET_KEY
 
+# Bearer tokens need a JWT secret of our own; without one only sessions work
+if not tokens_enabled():
+    print("[app] Warning: JWT_SECRET_KEY is not set, bearer tokens are disabled (session login only)")
+
 # Enable CORS with session/cookie support
 CORS(app, supports_credentials=True)
 
@@ -31,6 +40,27 @@ CORS(app, supports_credentials=True)
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = False  # Set True ONLY in HTTPS
 
+# Per-endpoint timing and GET /metrics when METRICS_ENABLED=1, slow-query
+# log and ?profile=1 when QUERY_PROFILER / REQUEST_PROFILER=1 (registered
+# first so their after_request hooks run after the commit)
+metrics.init_app(app)
+profiler.init_app(app)
+
+# One pooled connection and one transaction per request (committed once)
+models.init_app(app)
+
+# Indexes added to the schema after a MySQL database was created are not
+# there until `flask --app app migrate-indexes` has run (search and the
+# catalogue fail or slow down without them)
+try:
+    with models.db_session():
+        missing = migrations.missing_indexes(models.get_db_connection())
+    if missing:
+        print(f"[app] Warning: missing database indexes {', '.join(index[1] for index in missing)}; "
+              f"run `flask --app app migrate-indexes`")
+except Exception as e:
+    print(f"[app] Warning: could not check database indexes: {e}")
+
 # =====================================================
 # Register API Blueprints
 # =====================================================
@@ -120,6 +150,51 @@ def not_found(e):
 def internal_error(e):
     return render_template('index.html'), 500
 
+# =====================================================
+# CLI Commands
+# =====================================================
+
+@app.cli.command('rebuild-leaderboard')
+def rebuild_leaderboard_command():
+    """Backfill the user_stats leaderboard aggregate from attempts."""
+    with models.db_session():
+        rebuilt = models.Attempt.rebuild_leaderboard()
+    if rebuilt is None:
+        print('Leaderboard rebuild failed')
+    else:
+        print(f'Leaderboard rebuilt for {rebuilt} users')
+
+@app.cli.command('regrade-quiz')
+@click.argument('quiz_id', type=int)
+def regrade_quiz_command(quiz_id):
+    """Rescore all completed attempts of a quiz against its current answer key."""
+    job = RegradeJob(quiz_id)
+    job.run()
+    print(f"Regrade {job.status}: {job.processed} attempts rescored, "
+          f"{job.changed} changed, {job.skipped} skipped without stored answers")
+
+@app.cli.command('revoke-user')
+@click.argument('user_id', type=int)
+def revoke_user_command(user_id):
+    """Invalidate every session and token issued to a user so far."""
+    try:
+        with models.db_session():
+            revoke_user(user_id)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    models.profile_cache.delete(f'user:{user_id}')
+    print(f'Sessions and tokens of user {user_id} revoked')
+
+@app.cli.command('migrate-indexes')
+def migrate_indexes_command():
+    """Add the indexes of database/schema.sql that an existing database lacks."""
+    try:
+        with models.db_session():
+            changed = migrations.add_missing_indexes(models.get_db_connection())
+    except Exception as e:
+        raise click.ClickException(f'Index migration failed: {e}')
+    print(f"Indexes added: {', '.join(changed)}" if changed else 'All indexes are up to date')
+
 # =====================================================
 # Main Entry Point
 # =====================================================
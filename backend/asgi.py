@@ -0,0 +1,452 @@
+# asgi.py
+#
+# ASGI entry point:   uvicorn asgi:application --workers 4
+#
+# SERVER_MODE=async serves the exam hot path (quiz list/detail, questions,
+# start, autosave, submit, leaderboard) natively on the event loop over an
+# aiomysql pool, with the same JSON contracts as routes/quiz.py. Every other
+# route (auth, admin, pages, CORS preflights) falls through to the Flask app.
+# SERVER_MODE=wsgi (default) serves the whole Flask app through the adapter.
+import asyncio
+import re
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from werkzeug.http import http_date, parse_cookie
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # optional: only needed to serve over ASGI
+    WsgiToAsgi = None
+
+import write_behind
+from app import app as flask_app
+from attempt_sessions import sessions
+from models import (
+    Attempt, Quiz, content_cache, leaderboard_cache, ACTIVE_QUIZZES_KEY,
+    ACTIVE_QUIZZES_SQL, QUIZ_BY_ID_SQL, QUESTIONS_BY_QUIZ_SQL, LEADERBOARD_SQL,
+    CREATE_ATTEMPT_SQL, ATTEMPT_SQL, LOCK_ATTEMPT_SQL, LOCK_ANSWERS_SQL, LOCK_ANSWER_BLOB_SQL,
+    ANSWER_STORAGE, stored_answer_map, unstored_answers
+)
+from scoring import AnswerKey, score_submission
+from utils.answer_codec import OPTION_CODES
+from utils import metrics
+from utils.async_db import AsyncDatabase
+from utils.auth import identity_from_session, identity_from_token, AuthError
+from utils.cache import TTLCache
+from utils.rendered import RenderedJSON
+from utils.storage import dialect
+from utils.http_cache import not_modified
+from routes.quiz import (
+    render_questions, QUIZ_HTTP_CACHE, LEADERBOARD_HTTP_CACHE,
+    CATALOGUE_PARAMS, parse_catalogue_args, encode_catalogue_cursor
+)
+
+
+class Request:
+    """The parts of an ASGI HTTP request the async handlers need."""
+
+    def __init__(self, scope, receive, identity, auth_error=None):
+        self.scope = scope
+        self.method = scope['method']
+        self.path = scope['path']
+        # Blank values kept, as in Flask's request.args (e.g. "?category=" is present but empty)
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True)
+        self.args = {k: v[-1] for k, v in query.items()}
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        self.identity = identity
+        self.auth_error = auth_error
+        self._receive = receive
+
+    @property
+    def user_id(self):
+        return self.identity['user_id'] if self.identity else None
+
+    def login_error(self):
+        """The 401 login_required would answer, or None when authenticated."""
+        if self.identity:
+            return None
+        return 401, {'message': self.auth_error or 'Please log in to access this page'}
+
+    async def get_json(self):
+        body = b''
+        while True:
+            message = await self._receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        try:
+            return flask_app.json.loads(body) if body else None
+        except ValueError:
+            return None
+
+
+class AsyncQuizAPI:
+    """ASGI application: native async handlers for the hot routes, Flask for the rest."""
+
+    def __init__(self, flask_app, db=None):
+        self.flask_app = flask_app
+        self.db = db or AsyncDatabase()
+        self.fallback = WsgiToAsgi(flask_app) if WsgiToAsgi else None
+        self.routes = [
+            ('GET', r'/api/quizzes', self.get_quizzes, QUIZ_HTTP_CACHE),
+            ('GET', r'/api/quizzes/(\d+)', self.get_quiz, QUIZ_HTTP_CACHE),
+            ('GET', r'/api/quizzes/(\d+)/questions', self.get_quiz_questions, None),
+            ('POST', r'/api/quizzes/(\d+)/start', self.start_quiz, None),
+            ('POST', r'/api/quizzes/(\d+)/submit', self.submit_quiz, None),
+            ('PATCH', r'/api/attempts/(\d+)/answers', self.autosave_answers, None),
+            ('GET', r'/api/leaderboard', self.get_leaderboard, LEADERBOARD_HTTP_CACHE),
+        ]
+        self.routes = [(method, re.compile(pattern + '$'), handler, policy)
+                       for method, pattern, handler, policy in self.routes]
+        self._cache_blocks = not isinstance(content_cache, TTLCache)
+
+    # ----------------- ASGI plumbing ----------------- #
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http':
+            for method, pattern, handler, policy in self.routes:
+                match = pattern.match(scope['path'])
+                if match and scope['method'] == method:
+                    # Same validation as utils.http_cache.http_cache(): 304 before running the handler
+                    etag = last_modified = None
+                    if policy is not None and policy.tables:
+                        # The version lookup may hit the database: off the event loop
+                        etag, last_modified = await asyncio.to_thread(
+                            policy.validators, f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}")
+                        request_headers = dict(scope.get('headers', []))
+                        if not_modified(request_headers.get(b'if-none-match', b'').decode('latin-1'),
+                                        request_headers.get(b'if-modified-since', b'').decode('latin-1'),
+                                        etag, last_modified):
+                            return await self._respond(scope, send, 304, None, policy, etag, last_modified)
+                    started = time.perf_counter()
+                    request = Request(scope, receive, *await asyncio.to_thread(self._authenticate, scope))
+                    status, payload = await handler(request, *map(int, match.groups()))
+                    await self._respond(scope, send, status, payload, policy, etag, last_modified)
+                    if metrics.ENABLED:
+                        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=f'async.{handler.__name__}',
+                                                        method=method, status=str(status))
+                    return
+        if self.fallback is None:
+            raise RuntimeError('Serving the Flask routes over ASGI requires the asgiref package')
+        return await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.db.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _authenticate(self, scope):
+        """
+        Return (identity, error message) like utils.auth.current_identity() does
+        for Flask. Blocking (the profile lookup may hit MySQL): run in a thread.
+        """
+        headers = dict(scope.get('headers', []))
+        authorization = headers.get(b'authorization', b'').decode('latin-1')
+        if authorization:
+            try:
+                token = authorization[7:] if authorization.startswith('Bearer ') else authorization
+                return identity_from_token(token), None
+            except AuthError as e:
+                return None, str(e)
+        return identity_from_session(self._load_session(headers)), None
+
+    def _load_session(self, headers):
+        """Decode Flask's signed session cookie (read-only: the hot routes never modify it)."""
+        app = self.flask_app
+        cookies = parse_cookie(headers.get(b'cookie', b'').decode('latin-1'))
+        value = cookies.get(app.config['SESSION_COOKIE_NAME'])
+        serializer = app.session_interface.get_signing_serializer(app)
+        if not value or serializer is None:
+            return {}
+        try:
+            return serializer.loads(value, max_age=int(app.permanent_session_lifetime.total_seconds()))
+        except Exception:
+            return {}
+
+    async def _respond(self, scope, send, status, payload, policy=None, etag=None, last_modified=None):
+        request_headers = dict(scope.get('headers', []))
+        headers = [(b'content-type', b'application/json')]
+        if status == 304:
+            body = b''
+        elif isinstance(payload, RenderedJSON):
+            # Pre-rendered body: same validators and encodings as utils.rendered.rendered_response()
+            etag = payload.etag
+            headers.append((b'vary', b'Accept-Encoding'))
+            if payload.matches(request_headers.get(b'if-none-match', b'').decode('latin-1')):
+                status, body = 304, b''
+            else:
+                coding, body = payload.negotiate(request_headers.get(b'accept-encoding', b'').decode('latin-1'))
+                if coding:
+                    headers.append((b'content-encoding', coding.encode()))
+        else:
+            body = f"{self.flask_app.json.dumps(payload)}\n".encode('utf-8')
+        if status in (200, 304):
+            if etag:
+                headers.append((b'etag', etag.encode()))
+            if last_modified:
+                headers.append((b'last-modified', http_date(last_modified).encode()))
+            cache_control = policy.cache_control if policy is not None else 'private, no-cache'
+            if policy is not None or isinstance(payload, RenderedJSON):
+                headers.append((b'cache-control', cache_control.encode()))
+        headers.append((b'content-length', str(len(body)).encode()))
+        # Same CORS behaviour as CORS(app, supports_credentials=True)
+        origin = request_headers.get(b'origin')
+        if origin:
+            headers += [(b'access-control-allow-origin', origin),
+                        (b'access-control-allow-credentials', b'true'),
+                        (b'vary', b'Origin')]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    # ----------------- cached reads ----------------- #
+    async def _cache(self, method, *args):
+        # Shared cache backends do network / disk I/O: keep it off the event loop.
+        if self._cache_blocks:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _cached(self, key, loader, cache=content_cache):
+        value = await self._cache(cache.get, key)
+        if value is None:
+            value = await loader()
+            if value is not None:
+                await self._cache(cache.set, key, value)
+        return value
+
+    async def _quiz(self, quiz_id):
+        return await self._cached(f'quiz:{quiz_id}', lambda: self.db.fetchone(QUIZ_BY_ID_SQL, (quiz_id,)))
+
+    async def _questions(self, quiz_id):
+        return await self._cached(f'questions:{quiz_id}',
+                                  lambda: self.db.fetchall(QUESTIONS_BY_QUIZ_SQL, (quiz_id,)))
+
+    async def _answer_key(self, quiz_id):
+        async def load():
+            return AnswerKey.from_questions(quiz_id, await self._questions(quiz_id) or [])
+        return await self._cached(f'answer_key:{quiz_id}', load)
+
+    async def _owner(self, attempt_id):
+        """Async counterpart of AttemptSessionStore.owner()."""
+        owner = sessions.cached_owner(attempt_id)
+        if owner is not None:
+            return owner
+        attempt = await self.db.fetchone(ATTEMPT_SQL, (attempt_id,))
+        if not attempt or attempt['completed_at'] is not None:
+            return None
+        sessions.register(attempt_id, attempt['user_id'], attempt['quiz_id'])
+        return attempt['user_id'], attempt['quiz_id']
+
+    async def _stored_answers(self, attempt_id, cur=None):
+        """Async counterpart of attempt_sessions.stored_answers() (on `cur`, or in a transaction of its own)."""
+        if cur is None:
+            async with self.db.transaction() as cur:
+                return await self._stored_answers(attempt_id, cur)
+        await cur.execute(LOCK_ANSWERS_SQL, (attempt_id,))
+        rows = [(row['question_id'], row['selected_option']) for row in await cur.fetchall()]
+        blob = None
+        if ANSWER_STORAGE == 'packed':
+            await cur.execute(LOCK_ANSWER_BLOB_SQL, (attempt_id,))
+            row = await cur.fetchone()
+            blob = row['answers'] if row else None
+        return stored_answer_map(rows, blob)
+
+    # ----------------- handlers (see routes/quiz.py) ----------------- #
+    async def get_quizzes(self, request):
+        try:
+            if any(name in request.args for name in CATALOGUE_PARAMS):
+                try:
+                    kwargs = parse_catalogue_args(request.args)
+                except ValueError as e:
+                    return 400, {'message': f'Invalid catalogue query: {e}'}
+                rows = await self.db.fetchall(*Quiz.catalogue_query(**kwargs))
+                quizzes, next_key = Quiz.split_page(rows, kwargs['limit'])
+                return 200, {'quizzes': quizzes, 'next': encode_catalogue_cursor(next_key)}
+            quizzes = await self._cached(ACTIVE_QUIZZES_KEY, lambda: self.db.fetchall(ACTIVE_QUIZZES_SQL))
+            return 200, {'quizzes': quizzes or []}
+        except Exception as e:
+            print(f"[asgi.get_quizzes] Error: {e}")
+            return 500, {'message': f'Error: {str(e)}'}
+
+    async def get_quiz(self, request, quiz_id):
+        try:
+            quiz = await self._quiz(quiz_id)
+            if not quiz:
+                return 404, {'message': 'Quiz not found'}
+            return 200, {'quiz': quiz}
+        except Exception as e:
+            print(f"[asgi.get_quiz] Error: {e}")
+            return 500, {'message': f'Error: {str(e)}'}
+
+    async def get_quiz_questions(self, request, quiz_id):
+        if request.login_error():
+            return request.login_error()
+        try:
+            quiz = await self._quiz(quiz_id)
+            if not quiz:
+                return 404, {'message': 'Quiz not found'}
+
+            async def render():
+                return render_questions(await self._questions(quiz_id) or [])
+            return 200, await self._cached(f'questions_payload:{quiz_id}', render)
+        except Exception as e:
+            print(f"[asgi.get_quiz_questions] Error: {e}")
+            return 500, {'message': f'Error: {str(e)}'}
+
+    async def start_quiz(self, request, quiz_id):
+        if request.login_error():
+            return request.login_error()
+        user_id = request.user_id
+        try:
+            quiz = await self._quiz(quiz_id)
+            if not quiz:
+                return 404, {'message': 'Quiz not found'}
+
+            if write_behind.ENABLED:
+                # Queued; only touches the database to reserve a new id block.
+                attempt_id = await asyncio.to_thread(write_behind.create_attempt, user_id, quiz_id)
+            else:
+                async with self.db.transaction() as cur:
+                    await cur.execute(CREATE_ATTEMPT_SQL, (user_id, quiz_id, datetime.utcnow()))
+                    attempt_id = cur.lastrowid
+            if attempt_id is None:
+                return 500, {'message': 'Failed to start attempt'}
+            sessions.register(attempt_id, user_id, quiz_id)
+
+            return 201, {'message': 'Quiz started', 'attempt_id': attempt_id}
+        except Exception as e:
+            print(f"[asgi.start_quiz] Error: {e}")
+            return 500, {'message': f'Error: {str(e)}'}
+
+    async def submit_quiz(self, request, quiz_id):
+        if request.login_error():
+            return request.login_error()
+        user_id = request.user_id
+        attempt_id = None
+        buffered = {}
+        try:
+            data = await request.get_json() or {}
+            attempt_id = data.get('attempt_id')
+            answers = data.get('answers', {})
+
+            if not attempt_id:
+                return 400, {'message': 'attempt_id is required'}
+
+            owner = await self._owner(attempt_id)
+            if owner is not None and owner[0] != user_id:
+                return 404, {'message': 'Attempt not found'}
+
+            submitted = {int(qid) if str(qid).isdigit() else qid: option for qid, option in answers.items()}
+            key = await self._answer_key(quiz_id)
+            # Same order as routes/quiz.py: take() may wait for a flush in progress.
+            # Taken answers are restore()d if the completion is not saved.
+            buffered = await asyncio.to_thread(sessions.take, attempt_id)
+            latest = {**buffered, **submitted}
+
+            if write_behind.ENABLED:
+                stored = await self._stored_answers(attempt_id)
+                scored = score_submission(key, {**stored, **latest})
+                ok = await asyncio.to_thread(
+                    write_behind.complete_attempt, attempt_id, scored.score, len(key),
+                    unstored_answers(zip(key.question_ids, scored.options()), stored)
+                )
+            else:
+                scored = await self._complete_attempt(attempt_id, key, latest)
+                ok = scored is not None
+            if not ok:
+                sessions.restore(attempt_id, buffered)
+                return 500, {'message': 'Failed to save attempt result'}
+            body = {
+                'message': 'Quiz submitted successfully',
+                'score': scored.score,
+                'total_questions': len(key),
+                'results': scored.results()
+            }
+            sessions.finish(attempt_id)
+            return 200, body
+        except Exception as e:
+            print(f"[asgi.submit_quiz] Error: {e}")
+            sessions.restore(attempt_id, buffered)
+            return 500, {'message': f'Error: {str(e)}'}
+
+    async def _complete_attempt(self, attempt_id, key, latest):
+        """
+        Async counterpart of Attempt.complete_attempt() (same statements): scores the
+        stored answers overridden by `latest` in the transaction that locks the
+        attempt. Returns the ScoredSubmission, or None if the attempt does not exist.
+        """
+        async with self.db.transaction() as cur:
+            await cur.execute(LOCK_ATTEMPT_SQL, (attempt_id,))
+            previous = await cur.fetchone()
+            if not previous:
+                return None
+            stored = await self._stored_answers(attempt_id, cur)
+            scored = score_submission(key, {**stored, **latest})
+            statements, attempts_delta, score_delta = Attempt.completion_statements(
+                previous, attempt_id, scored.score, len(key),
+                unstored_answers(zip(key.question_ids, scored.options()), stored)
+            )
+            for sql, params in statements:
+                await cur.execute(sql, params)
+        await asyncio.to_thread(Attempt._record_in_boards, previous['user_id'], previous['quiz_id'],
+                                attempts_delta, score_delta, scored.score)
+        return scored
+
+    async def autosave_answers(self, request, attempt_id):
+        if request.login_error():
+            return request.login_error()
+        user_id = request.user_id
+        try:
+            data = await request.get_json() or {}
+            answers = data.get('answers')
+            if not isinstance(answers, dict):
+                return 400, {'message': 'answers must be an object'}
+
+            owner = await self._owner(attempt_id)
+            if owner is None or owner[0] != user_id:
+                return 404, {'message': 'Attempt not found or already submitted'}
+
+            key = await self._answer_key(owner[1])
+            accepted = {}
+            for qid, option in answers.items():
+                if option is not None and option not in OPTION_CODES:
+                    return 400, {'message': 'Options must be A, B, C, D or null'}
+                position = key.positions.get(qid)
+                if position is not None:
+                    accepted[key.question_ids[position]] = option
+
+            sessions.record(attempt_id, accepted)
+            return 202, {'message': 'Answers saved', 'saved': len(accepted)}
+        except Exception as e:
+            print(f"[asgi.autosave_answers] Error: {e}")
+            return 500, {'message': f'Error: {str(e)}'}
+
+    async def get_leaderboard(self, request):
+        try:
+            async def render():
+                return RenderedJSON({'leaderboard': await self.db.fetchall(LEADERBOARD_SQL) or []})
+            return 200, await self._cached('global:rendered', render, cache=leaderboard_cache)
+        except Exception as e:
+            print(f"[asgi.get_leaderboard] Error: {e}")
+            return 500, {'message': f'Error: {str(e)}'}
+
+
+def create_asgi_app(app=flask_app):
+    """Build the ASGI application for the configured SERVER_MODE."""
+    if app.config.get('SERVER_MODE') == 'async':
+        if dialect.name != 'mysql':
+            raise RuntimeError('SERVER_MODE=async requires DB_BACKEND=mysql (it runs on aiomysql)')
+        return AsyncQuizAPI(app)
+    if WsgiToAsgi is None:
+        raise RuntimeError('Serving over ASGI requires the asgiref package')
+    return WsgiToAsgi(app)
+
+
+application = create_asgi_app()
@@ -0,0 +1,136 @@
+# attempt_sessions.py
+import atexit
+import os
+import threading
+
+from models import Attempt, db_session
+from utils.cache import TTLCache
+
+FLUSH_INTERVAL = float(os.getenv('AUTOSAVE_FLUSH_INTERVAL', 2.0))
+FLUSH_BATCH = int(os.getenv('AUTOSAVE_FLUSH_BATCH', 500))
+
+
+class AttemptSessionStore:
+    """
+    Server-side state of attempts in progress.
+
+    PATCH /api/attempts/<id>/answers only records answers in this buffer;
+    a background thread writes everything that changed to attempt_answers
+    every FLUSH_INTERVAL seconds (or as soon as FLUSH_BATCH attempts are
+    pending) as one multi-row upsert. Submitting then merges what is stored
+    with what is still buffered and finalizes the attempt; take() waits for
+    a flush of the attempt in progress, so its answers are either still
+    buffered or committed, and a submission that fails restore()s them.
+
+    Attempt ownership is cached so autosaves do not query the attempt row
+    each time; attempts started on another worker are looked up once.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, flush_batch=FLUSH_BATCH):
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._pending = {}
+        self._flushing = set()
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._owners = TTLCache(maxsize=100000, ttl=6 * 3600)
+        self._pid = None
+
+    # ----------------- ownership ----------------- #
+    def register(self, attempt_id, user_id, quiz_id):
+        self._owners.set(attempt_id, (user_id, quiz_id))
+
+    def cached_owner(self, attempt_id):
+        """Return the cached (user_id, quiz_id) of an attempt without touching the database."""
+        return self._owners.get(attempt_id)
+
+    def owner(self, attempt_id):
+        """Return (user_id, quiz_id) of an open attempt, or None if unknown / completed."""
+        owner = self.cached_owner(attempt_id)
+        if owner is not None:
+            return owner
+        attempt = Attempt.get_attempt(attempt_id)
+        if not attempt or attempt['completed_at'] is not None:
+            return None
+        owner = (attempt['user_id'], attempt['quiz_id'])
+        self._owners.set(attempt_id, owner)
+        return owner
+
+    # ----------------- buffering ----------------- #
+    def record(self, attempt_id, answers):
+        """Buffer {question_id: option} for an attempt (later values win)."""
+        self._ensure_flusher()
+        with self._lock:
+            self._pending.setdefault(attempt_id, {}).update(answers)
+            full = len(self._pending) >= self.flush_batch
+        if full:
+            self._wakeup.set()
+
+    def take(self, attempt_id):
+        """Remove and return the answers still buffered for an attempt (blocks while they are being flushed)."""
+        with self._lock:
+            while attempt_id in self._flushing:
+                self._flushed.wait()
+            return self._pending.pop(attempt_id, {})
+
+    def restore(self, attempt_id, answers):
+        """Put back answers taken by a submission that was not committed (newer autosaves win)."""
+        if not answers:
+            return
+        with self._lock:
+            self._pending[attempt_id] = {**answers, **self._pending.get(attempt_id, {})}
+
+    def finish(self, attempt_id):
+        """Forget a finalized attempt."""
+        self.take(attempt_id)
+        self._owners.delete(attempt_id)
+
+    # ----------------- write-behind ----------------- #
+    def flush(self):
+        """Write every buffered answer in one transaction. Returns the number written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushing.update(pending)
+        if not pending:
+            return 0
+        try:
+            with db_session():
+                return Attempt.save_autosaved_answers(pending)
+        except Exception as e:
+            print(f"[attempt_sessions.flush] Error: {e}")
+            for attempt_id, answers in pending.items():
+                self.restore(attempt_id, answers)
+            return 0
+        finally:
+            with self._lock:
+                self._flushing.difference_update(pending)
+                self._flushed.notify_all()
+
+    def _ensure_flusher(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, name='autosave-flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def stored_answers(attempt_id):
+    """
+    Answers already written for an attempt, keyed by question id. Locks the
+    attempt row for the rest of the transaction, so a flush of it in flight
+    on another worker has committed (or failed) before they are read.
+    """
+    return Attempt.lock_answers(attempt_id)
+
+
+sessions = AttemptSessionStore()
+atexit.register(sessions.flush)
@@ -0,0 +1,90 @@
+# benchmarks/fake_db.py
+import models
+from utils.db_pool import ConnectionPool
+
+
+class FakeDatabase:
+    """
+    Canned result sets for the micro-benchmarks: respond(fragment, columns, rows)
+    makes every statement containing `fragment` return those rows. Rows are
+    kept as tuples and turned into dicts per fetch, like mysql.connector's
+    dictionary cursors, so row conversion is part of what gets measured.
+    """
+
+    def __init__(self):
+        self._results = []
+        self.statements = 0
+
+    def respond(self, fragment, columns, rows):
+        self._results.insert(0, (fragment, tuple(columns), [tuple(row) for row in rows]))
+
+    def result_for(self, operation):
+        for fragment, columns, rows in self._results:
+            if fragment in operation:
+                return columns, rows
+        return (), []
+
+
+class FakeCursor:
+    def __init__(self, db, dictionary=False):
+        self._db = db
+        self._dictionary = dictionary
+        self._columns = ()
+        self._rows = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, operation, params=None, **kwargs):
+        self._db.statements += 1
+        self._columns, self._rows = self._db.result_for(operation)
+        self.rowcount = len(self._rows)
+        self.lastrowid = 1
+
+    def executemany(self, operation, seq_params, **kwargs):
+        self._db.statements += 1
+        self._columns, self._rows = (), []
+        self.rowcount = len(seq_params)
+
+    def _convert(self, row):
+        return dict(zip(self._columns, row)) if self._dictionary else row
+
+    def fetchone(self):
+        if not self._rows:
+            return None
+        row, self._rows = self._rows[0], self._rows[1:]
+        return self._convert(row)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return [self._convert(row) for row in rows]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self, dictionary=False, **kwargs):
+        return FakeCursor(self._db, dictionary)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        pass
+
+
+def install(db, pool_size=5):
+    """Point the models at `db` through a real ConnectionPool."""
+    models._pool = ConnectionPool(lambda: FakeConnection(db), pool_size=pool_size, max_overflow=0)
+    return db
@@ -0,0 +1,328 @@
+# benchmarks/load_test.py
+#
+# Load test of the exam flow, run from backend/:
+#
+#   python -m benchmarks.load_test seed --users 200 --quizzes 20 --questions 25 --attempts 5000
+#   python -m benchmarks.load_test run --concurrency 20 --iterations 10 --output results/baseline.json
+#   python -m benchmarks.load_test run ... --output results/new.json --compare results/baseline.json
+#   python -m benchmarks.load_test reset
+#
+# Every virtual user repeats login -> /api/quizzes -> start -> questions ->
+# submit -> leaderboard. Without --base-url the Flask app is driven
+# in-process (no HTTP server, measures the app and the database); with it,
+# a running server is load-tested over HTTP. Seed against the same
+# database the app uses (MYSQL_* variables), and restart a running server
+# after seeding so its caches do not hide the new data.
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+STEPS = ('login', 'quizzes', 'start', 'questions', 'submit', 'leaderboard')
+
+
+# ----------------- transports ----------------- #
+class HttpClient:
+    """Requests against a running server (one per virtual user, with its own session cookie)."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, payload=None, token=None):
+        headers = {'Accept': 'application/json', 'Accept-Encoding': 'identity'}
+        data = None
+        if payload is not None:
+            data = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                return resp.status, _json(resp.read())
+        except urllib.error.HTTPError as e:
+            return e.code, _json(e.read())
+        except (urllib.error.URLError, OSError) as e:
+            return 0, {'message': str(e)}
+
+
+class AppClient:
+    """Requests through the Flask test client: same code path minus the HTTP server."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, payload=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        resp = self.client.open(path, method=method, json=payload, headers=headers)
+        return resp.status_code, _json(resp.get_data())
+
+
+def _json(body):
+    try:
+        return json.loads(body) if body else {}
+    except ValueError:
+        return {}
+
+
+# ----------------- the exam flow ----------------- #
+class Recorder:
+    """Latency samples (seconds) and error counts per step, shared by all workers."""
+
+    def __init__(self):
+        self.samples = {step: [] for step in STEPS}
+        self.errors = {step: 0 for step in STEPS}
+        self.flows = 0
+        self._lock = threading.Lock()
+
+    def timed(self, step, call, *args, **kwargs):
+        started = time.perf_counter()
+        status, body = call(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        ok = 200 <= status < 300
+        with self._lock:
+            self.samples[step].append(elapsed)
+            if not ok:
+                self.errors[step] += 1
+        return ok, body
+
+    def flow_done(self):
+        with self._lock:
+            self.flows += 1
+
+
+def run_flow(client, recorder, email, password, rng):
+    """One exam: returns early (after recording the error) if a step fails."""
+    ok, body = recorder.timed('login', client.request, 'POST', '/api/auth/login',
+                              {'email': email, 'password': password})
+    if not ok:
+        return
+    token = body.get('token')   # None without JWT_SECRET_KEY: the session cookie is used instead
+
+    ok, body = recorder.timed('quizzes', client.request, 'GET', '/api/quizzes', token=token)
+    quizzes = [q for q in body.get('quizzes', []) if str(q.get('title', '')).startswith('Benchmark quiz')]
+    if not ok or not quizzes:
+        return
+    quiz_id = rng.choice(quizzes)['id']
+
+    ok, body = recorder.timed('start', client.request, 'POST', f'/api/quizzes/{quiz_id}/start', token=token)
+    if not ok:
+        return
+    attempt_id = body.get('attempt_id')
+
+    ok, body = recorder.timed('questions', client.request, 'GET', f'/api/quizzes/{quiz_id}/questions', token=token)
+    if not ok:
+        return
+    answers = {str(q['id']): rng.choice('ABCD') for q in body.get('questions', [])}
+
+    ok, _ = recorder.timed('submit', client.request, 'POST', f'/api/quizzes/{quiz_id}/submit',
+                           {'attempt_id': attempt_id, 'answers': answers}, token=token)
+    if not ok:
+        return
+
+    ok, _ = recorder.timed('leaderboard', client.request, 'GET', '/api/leaderboard', token=token)
+    if ok:
+        recorder.flow_done()
+
+
+def run(make_client, users, concurrency, iterations, duration, warmup, random_seed):
+    """Drive `concurrency` virtual users; returns (recorder, wall seconds)."""
+    from benchmarks.seed import PASSWORD, bench_email
+
+    def worker(n, recorder, rounds, deadline):
+        rng = random.Random(random_seed * 1000 + n)
+        client = make_client()
+        # Workers spread over all seeded users except the admin (bench-0)
+        email = bench_email(1 + n % max(users - 1, 1))
+        done = 0
+        while (rounds is None or done < rounds) and (deadline is None or time.monotonic() < deadline):
+            run_flow(client, recorder, email, PASSWORD, rng)
+            done += 1
+
+    if warmup:
+        _run_workers(worker, Recorder(), concurrency, warmup, None)
+    recorder = Recorder()
+    deadline = time.monotonic() + duration if duration else None
+    started = time.perf_counter()
+    _run_workers(worker, recorder, concurrency, None if duration else iterations, deadline)
+    return recorder, time.perf_counter() - started
+
+
+def _run_workers(worker, recorder, concurrency, rounds, deadline):
+    with ThreadPoolExecutor(concurrency, thread_name_prefix='bench') as pool:
+        futures = [pool.submit(worker, n, recorder, rounds, deadline) for n in range(concurrency)]
+        for future in futures:
+            future.result()
+
+
+# ----------------- reporting ----------------- #
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder, wall_seconds, config):
+    endpoints = {}
+    for step in STEPS:
+        values = sorted(recorder.samples[step])
+        ms = [v * 1000 for v in values]
+        endpoints[step] = {
+            'count': len(values),
+            'errors': recorder.errors[step],
+            'throughput_rps': round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+            'mean_ms': round(sum(ms) / len(ms), 3) if ms else None,
+            'p50_ms': _round(percentile(ms, 50)),
+            'p95_ms': _round(percentile(ms, 95)),
+            'p99_ms': _round(percentile(ms, 99)),
+            'max_ms': _round(ms[-1] if ms else None),
+        }
+    requests = sum(e['count'] for e in endpoints.values())
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'config': config,
+        },
+        'total': {
+            'wall_seconds': round(wall_seconds, 3),
+            'flows': recorder.flows,
+            'flows_per_second': round(recorder.flows / wall_seconds, 2) if wall_seconds else 0.0,
+            'requests': requests,
+            'requests_per_second': round(requests / wall_seconds, 2) if wall_seconds else 0.0,
+            'errors': sum(e['errors'] for e in endpoints.values()),
+        },
+        'endpoints': endpoints,
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_report(result):
+    total = result['total']
+    print(f"{total['flows']} flows in {total['wall_seconds']}s: {total['flows_per_second']} flows/s, "
+          f"{total['requests_per_second']} req/s, {total['errors']} errors")
+    print(f"{'endpoint':<12}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, stats in result['endpoints'].items():
+        print(f"{step:<12}{stats['count']:>8}{stats['errors']:>8}{stats['throughput_rps']:>10}"
+              f"{_cell(stats['p50_ms'])}{_cell(stats['p95_ms'])}{_cell(stats['p99_ms'])}")
+
+
+def _cell(value):
+    return f"{'-' if value is None else value:>10}"
+
+
+def compare(result, baseline, threshold):
+    """Print per-endpoint changes against a saved run; returns the regressions beyond threshold %."""
+    regressions = []
+    print(f"vs {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('timestamp')}):")
+    for step, stats in result['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(step)
+        if not before:
+            continue
+        changes = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            if not before.get(key) or stats.get(key) is None:
+                continue
+            delta = (stats[key] - before[key]) / before[key] * 100
+            changes.append(f"{key} {before[key]} -> {stats[key]} ({delta:+.1f}%)")
+            worse = delta < -threshold if key == 'throughput_rps' else delta > threshold
+            if worse and key in ('p95_ms', 'throughput_rps'):
+                regressions.append(f"{step} {key} {delta:+.1f}%")
+        print(f"  {step:<12}" + ', '.join(changes))
+    return regressions
+
+
+# ----------------- CLI ----------------- #
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load_test', description='Load test of the exam flow.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_cmd = commands.add_parser('seed', help='replace the benchmark data set')
+    seed_cmd.add_argument('--users', type=int, default=100)
+    seed_cmd.add_argument('--quizzes', type=int, default=10)
+    seed_cmd.add_argument('--questions', type=int, default=20)
+    seed_cmd.add_argument('--attempts', type=int, default=1000)
+    seed_cmd.add_argument('--seed', type=int, default=42)
+
+    commands.add_parser('reset', help='delete the benchmark data set')
+
+    run_cmd = commands.add_parser('run', help='drive the exam flow and report latencies')
+    run_cmd.add_argument('--base-url', help='load-test a running server instead of the in-process app')
+    run_cmd.add_argument('--users', type=int, default=100, help='users seeded with "seed --users"')
+    run_cmd.add_argument('--concurrency', type=int, default=10)
+    run_cmd.add_argument('--iterations', type=int, default=5, help='flows per virtual user')
+    run_cmd.add_argument('--duration', type=float, help='run for this many seconds instead of --iterations')
+    run_cmd.add_argument('--warmup', type=int, default=1, help='unrecorded flows per virtual user first')
+    run_cmd.add_argument('--seed', type=int, default=42)
+    run_cmd.add_argument('--output', help='save the results as JSON')
+    run_cmd.add_argument('--compare', help='JSON results of a previous run to compare against')
+    run_cmd.add_argument('--threshold', type=float, default=10.0,
+                         help='exit 1 if p95 or throughput of a step is this %% worse than --compare')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'seed':
+        from benchmarks.seed import reset, seed
+        reset()
+        print(f"Seeded: {seed(args.users, args.quizzes, args.questions, args.attempts, args.seed)}")
+        return 0
+    if args.command == 'reset':
+        from benchmarks.seed import reset
+        print(f"Removed {reset()} benchmark users")
+        return 0
+
+    if args.base_url:
+        make_client = lambda: HttpClient(args.base_url)
+    else:
+        from app import app
+        make_client = lambda: AppClient(app)
+
+    config = {k: getattr(args, k) for k in ('base_url', 'users', 'concurrency', 'iterations', 'duration',
+                                            'warmup', 'seed')}
+    recorder, wall_seconds = run(make_client, args.users, args.concurrency, args.iterations, args.duration,
+                                 args.warmup, args.seed)
+    result = summarize(recorder, wall_seconds, config)
+    print_report(result)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions: " + '; '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# benchmarks/micro.py
+#
+# Micro-benchmarks of the model-layer and scoring hot paths, against an
+# in-memory fake database (benchmarks.fake_db), so no MySQL is needed:
+#
+#   python -m benchmarks.micro --output results/micro-baseline.json
+#   python -m benchmarks.micro --compare results/micro-baseline.json
+#   python -m benchmarks.micro -k score
+#
+# Each benchmark is timed like timeit: the loop count is calibrated to take
+# at least --min-time seconds, then --repeat timings are taken with the GC
+# off. The median time per call is what --compare checks.
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import fake_db
+from benchmarks.load_test import git_commit
+
+QUESTION_COLUMNS = ('id', 'quiz_id', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+                    'correct_answer', 'points', 'created_at')
+QUIZ_COLUMNS = ('id', 'title', 'description', 'time_limit', 'category_id', 'category_name',
+                'created_by', 'created_by_name', 'is_active', 'created_at')
+
+
+def make_questions(count, quiz_id=1, rng=None):
+    rng = rng or random.Random(count)
+    created_at = datetime(2024, 1, 1)
+    return [
+        (n + 1, quiz_id, f'Question number {n + 1}: which option is right?', 'Option A', 'Option B',
+         'Option C', 'Option D', rng.choice('ABCD'), 10, created_at)
+        for n in range(count)
+    ]
+
+
+def make_quizzes(count):
+    created_at = datetime(2024, 1, 1)
+    return [
+        (n + 1, f'Quiz {n + 1}', f'Description of quiz {n + 1}', 30, 1, 'General', 1, 'admin', 1,
+         created_at - timedelta(minutes=n))
+        for n in range(count)
+    ]
+
+
+# ----------------- benchmarks ----------------- #
+# Each factory prepares its inputs and returns the zero-argument callable to time.
+def bench_question_rows(count):
+    from models import Question
+    db = fake_db.install(fake_db.FakeDatabase())
+    db.respond('FROM questions', QUESTION_COLUMNS, make_questions(count))
+    return lambda: Question._fetch_questions(1)
+
+
+def bench_questions_payload(count):
+    from routes.quiz import render_questions
+    questions = [dict(zip(QUESTION_COLUMNS, row)) for row in make_questions(count)]
+    return lambda: render_questions(questions)
+
+
+def bench_score_submission(count):
+    from scoring import AnswerKey, score_submission
+    rng = random.Random(count)
+    questions = [dict(zip(QUESTION_COLUMNS, row)) for row in make_questions(count)]
+    key = AnswerKey.from_questions(1, questions)
+    answers = {str(q['id']): rng.choice('ABCD') for q in questions}
+    # What submit_quiz does per request: score, then build the per-question results
+    return lambda: score_submission(key, answers).results()
+
+
+def bench_answer_key(count):
+    from scoring import AnswerKey
+    questions = [dict(zip(QUESTION_COLUMNS, row)) for row in make_questions(count)]
+    return lambda: AnswerKey.from_questions(1, questions)
+
+
+def bench_jsonify_quizzes(count):
+    from flask import jsonify
+    from app import app
+    quizzes = [dict(zip(QUIZ_COLUMNS, row)) for row in make_quizzes(count)]
+
+    def run():
+        with app.app_context():
+            return jsonify({'quizzes': quizzes})
+    return run
+
+
+def _claims():
+    from config import Config
+    from utils.auth import issue_claims, tokens_enabled
+    if not tokens_enabled():
+        Config.JWT_SECRET_KEY = os.urandom(32).hex()   # throwaway key for this process
+    return issue_claims({'id': 1, 'username': 'bench', 'email': 'bench@bench.local', 'role': 'user'})
+
+
+def bench_jwt_encode():
+    from utils.auth import issue_token
+    claims = _claims()
+    return lambda: issue_token(claims)
+
+
+def bench_jwt_decode():
+    from utils.auth import identity_from_token, issue_token
+    db = fake_db.install(fake_db.FakeDatabase())
+    db.respond('FROM users', ('id', 'username', 'email', 'role'), [(1, 'bench', 'bench@bench.local', 'user')])
+    token = issue_token(_claims())
+    # Includes the profile lookup, served from profile_cache after the first call
+    return lambda: identity_from_token(token)
+
+
+def bench_bcrypt_check():
+    from utils.hashing import hasher
+    hashed = hasher.hash('bench-password')
+    return lambda: hasher.check(hashed, 'bench-password')
+
+
+BENCHMARKS = [
+    ('question_rows[20]', lambda: bench_question_rows(20)),
+    ('question_rows[200]', lambda: bench_question_rows(200)),
+    ('questions_payload[20]', lambda: bench_questions_payload(20)),
+    ('questions_payload[200]', lambda: bench_questions_payload(200)),
+    ('answer_key[100]', lambda: bench_answer_key(100)),
+    ('score_submission[10]', lambda: bench_score_submission(10)),
+    ('score_submission[100]', lambda: bench_score_submission(100)),
+    ('score_submission[1000]', lambda: bench_score_submission(1000)),
+    ('jsonify_quizzes[50]', lambda: bench_jsonify_quizzes(50)),
+    ('jsonify_quizzes[500]', lambda: bench_jsonify_quizzes(500)),
+    ('jwt_encode', bench_jwt_encode),
+    ('jwt_decode', bench_jwt_decode),
+    ('bcrypt_check', bench_bcrypt_check),
+]
+
+
+# ----------------- timing ----------------- #
+def _time(fn, loops):
+    started = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - started
+
+
+def measure(fn, min_time=0.2, repeat=5):
+    """Seconds per call: calibrate the loop count, then take `repeat` timings."""
+    fn()  # warm caches and lazy imports
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            elapsed = _time(fn, loops)
+            if elapsed >= min_time or loops >= 1_000_000:
+                break
+            loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.1))
+        timings = [_time(fn, loops) / loops for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    median = statistics.median(timings)
+    return {
+        'loops': loops,
+        'min_us': round(min(timings) * 1e6, 3),
+        'median_us': round(median * 1e6, 3),
+        'mean_us': round(statistics.fmean(timings) * 1e6, 3),
+        'stdev_us': round(statistics.stdev(timings) * 1e6, 3) if len(timings) > 1 else 0.0,
+        'ops_per_second': round(1 / median, 1) if median else None,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print median changes against a saved run; returns the benchmarks slower than threshold %."""
+    regressions = []
+    print(f"vs {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('timestamp')}):")
+    for name, stats in results.items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before or not before.get('median_us'):
+            continue
+        delta = (stats['median_us'] - before['median_us']) / before['median_us'] * 100
+        flag = '  <-- slower' if delta > threshold else ''
+        print(f"  {name:<26}{before['median_us']:>12} -> {stats['median_us']:<12}({delta:+.1f}%){flag}")
+        if delta > threshold:
+            regressions.append(f"{name} {delta:+.1f}%")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.micro',
+                                     description='Micro-benchmarks of the model and scoring hot paths.')
+    parser.add_argument('-k', dest='keyword', help='only run benchmarks whose name contains this')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timing (default 0.2)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='save the results as JSON')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='exit 1 if a median is this %% slower than --compare (default 10)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'benchmark':<26}{'median us':>12}{'min us':>12}{'stdev us':>12}{'ops/s':>14}")
+    for name, factory in BENCHMARKS:
+        if args.keyword and args.keyword not in name:
+            continue
+        stats = measure(factory(), args.min_time, args.repeat)
+        results[name] = stats
+        print(f"{name:<26}{stats['median_us']:>12}{stats['min_us']:>12}{stats['stdev_us']:>12}"
+              f"{stats['ops_per_second']:>14}")
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+        },
+        'benchmarks': results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions: " + '; '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# benchmarks/seed.py
+import random
+from datetime import datetime, timedelta
+
+from models import Attempt, db_session, get_db_connection
+from utils.hashing import hasher
+
+# Everything the benchmarks create hangs off users with this e-mail pattern,
+# so reset() can remove it all (quizzes, questions and attempts cascade).
+EMAIL_DOMAIN = 'bench.local'
+PASSWORD = 'bench-password'
+INSERT_CHUNK = 1000
+
+
+def bench_email(n):
+    return f'bench-{n}@{EMAIL_DOMAIN}'
+
+
+def _insert_many(cur, sql, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        cur.executemany(sql, rows[start:start + INSERT_CHUNK])
+
+
+def _ids(cur, sql, params):
+    cur.execute(sql, params)
+    return [row[0] for row in cur.fetchall()]
+
+
+def reset():
+    """Delete every benchmark user and, through the foreign keys, their data."""
+    with db_session():
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            # Attempts on benchmark quizzes by other users would keep the quiz alive
+            cur.execute("""
+                DELETE FROM attempts WHERE quiz_id IN (
+                    SELECT id FROM quizzes WHERE created_by IN (
+                        SELECT id FROM users WHERE email LIKE %s))
+            """, (f'%@{EMAIL_DOMAIN}',))
+            cur.execute("DELETE FROM users WHERE email LIKE %s", (f'%@{EMAIL_DOMAIN}',))
+            removed = cur.rowcount
+        finally:
+            cur.close()
+        Attempt.rebuild_leaderboard()
+    return removed
+
+
+def seed(users=100, quizzes=10, questions=20, attempts=1000, random_seed=42):
+    """
+    Create `users` benchmark users (bench-0 is an admin, all share PASSWORD),
+    `quizzes` active quizzes of `questions` questions each and `attempts`
+    completed historical attempts, then rebuild the leaderboard aggregates.
+    The same arguments always produce the same data set.
+    """
+    rng = random.Random(random_seed)
+    # One bcrypt hash for everybody: seeding 10k users must not take 10k hashes
+    hashed = hasher.hash(PASSWORD)
+    now = datetime.now().replace(microsecond=0)
+
+    with db_session():
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            _insert_many(cur, "INSERT INTO users (username, email, password, role) VALUES (%s, %s, %s, %s)", [
+                (f'bench_user_{n}', bench_email(n), hashed, 'admin' if n == 0 else 'user')
+                for n in range(users)
+            ])
+            user_ids = _ids(cur, "SELECT id FROM users WHERE email LIKE %s ORDER BY id", (f'%@{EMAIL_DOMAIN}',))
+
+            _insert_many(cur, "INSERT INTO quizzes (title, description, time_limit, created_by, is_active, created_at) "
+                              "VALUES (%s, %s, %s, %s, %s, %s)", [
+                (f'Benchmark quiz {n}', f'Generated benchmark quiz number {n}', 30, user_ids[0], 1,
+                 now - timedelta(minutes=quizzes - n))
+                for n in range(quizzes)
+            ])
+            quiz_ids = _ids(cur, "SELECT id FROM quizzes WHERE created_by = %s ORDER BY id", (user_ids[0],))
+
+            _insert_many(cur, "INSERT INTO questions (quiz_id, question_text, option_a, option_b, option_c, "
+                              "option_d, correct_option, points) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", [
+                (quiz_id, f'Question {n} of quiz {quiz_id}?', 'Option A', 'Option B', 'Option C', 'Option D',
+                 rng.choice('ABCD'), 10)
+                for quiz_id in quiz_ids for n in range(questions)
+            ])
+
+            attempt_rows = []
+            for _ in range(attempts):
+                completed_at = now - timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+                attempt_rows.append((
+                    rng.choice(user_ids), rng.choice(quiz_ids), rng.randint(0, questions) * 10, questions,
+                    completed_at - timedelta(minutes=rng.randint(1, 30)), completed_at
+                ))
+            _insert_many(cur, "INSERT INTO attempts (user_id, quiz_id, score, total_questions, started_at, "
+                              "completed_at) VALUES (%s, %s, %s, %s, %s, %s)", attempt_rows)
+        finally:
+            cur.close()
+        Attempt.rebuild_leaderboard()
+
+    return {'users': len(user_ids), 'quizzes': len(quiz_ids), 'questions': len(quiz_ids) * questions,
+            'attempts': attempts}
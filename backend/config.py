@@ -11,10 +11,14 @@ class Config:
     MYSQL_DB = 'quiz_app'
     MYSQL_CURSORCLASS = 'DictCursor'
 
-    # JWT Configuration
-    JWT_SECRET_KEY = 'super-secret-jwt-key'
+    # JWT Configuration (bearer tokens are disabled until JWT_SECRET_KEY is set)
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)   # FIXED
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=1)    # FIXED
 
     # Session Configuration
     PERMANENT_SESSION_LIFETIME = 3600
+
+    # Serving mode for asgi.py: 'wsgi' (whole Flask app) or 'async'
+    # (hot quiz endpoints on an aiomysql pool, see asgi.py)
+    SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
@@ -1,29 +1,278 @@
 # models.py
 import os
-import mysql.connector
-from flask_bcrypt import Bcrypt
-from datetime import datetime
+import threading
+import time
+from flask import g, has_app_context, jsonify
+from datetime import datetime, timedelta
+from utils.db_pool import ConnectionPool
+from utils.unit_of_work import UnitOfWork, current_unit_of_work, session_scope
+from utils.cache import build_cache
+from utils.ranking import BoardRegistry
+from utils.answer_codec import pack_answers, unpack_answers
+from utils.hashing import hasher, HasherBusy
+from utils.http_cache import forget_versions
+from utils.search import boolean_query
+from utils import auth, http_cache, metrics, profiler, tracing
+from utils.storage import storage, dialect
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Quiz content (quiz rows, active quiz list, question sets) only changes
+# through the admin write paths below, which invalidate it precisely.
+# The backend (per-process / file / Redis) is chosen by CACHE_BACKEND.
+content_cache = build_cache(
+    'content',
+    ttl=int(os.getenv('CONTENT_CACHE_TTL', 300)),
+    maxsize=int(os.getenv('CONTENT_CACHE_SIZE', 2048))
+)
+ACTIVE_QUIZZES_KEY = 'quizzes:active'
+
+# How submitted answers are persisted: 'rows' (one attempt_answers row per
+# question, written as multi-row INSERTs) or 'packed' (one compact blob per
+# attempt in attempt_answer_blobs, see utils.answer_codec).
+ANSWER_STORAGE = os.getenv('ANSWER_STORAGE', 'rows')
+ANSWER_INSERT_CHUNK = 1000
+
+# The leaderboard changes with every submission, so it is only cached for a
+# few seconds: enough to absorb polling without noticeably lagging.
+leaderboard_cache = build_cache(
+    'leaderboard',
+    ttl=int(os.getenv('LEADERBOARD_CACHE_TTL', 10)),
+    maxsize=256
+)
+
+# Admin dashboard aggregates: a few seconds stale is fine, recomputing them
+# on every dashboard load is not.
+stats_cache = build_cache(
+    'stats',
+    ttl=int(os.getenv('ADMIN_STATS_CACHE_TTL', 30)),
+    maxsize=16
+)
+ACTIVE_TAKER_WINDOW = timedelta(minutes=int(os.getenv('ACTIVE_TAKER_WINDOW_MINUTES', 15)))
+
+# Public user profiles (id, username, email, role) for the auth layer.
+profile_cache = build_cache(
+    'profiles',
+    ttl=int(os.getenv('PROFILE_CACHE_TTL', 300)),
+    maxsize=int(os.getenv('PROFILE_CACHE_SIZE', 10000))
+)
+
+
+def _open_connection():
+    """Open a raw connection to the configured storage backend (DB_BACKEND, utils.storage)."""
+    return storage.connect()
+
+
+def _connect():
+    """Pool connection factory: statements are reported to utils.tracing hooks when any are set."""
+    return tracing.trace(_open_connection())
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect,
+                    pool_size=int(os.getenv('MYSQL_POOL_SIZE', 5)),
+                    max_overflow=int(os.getenv('MYSQL_POOL_MAX_OVERFLOW', 10)),
+                    timeout=float(os.getenv('MYSQL_POOL_TIMEOUT', 30)),
+                    recycle=int(os.getenv('MYSQL_POOL_RECYCLE', 3600)),
+                    pre_ping=os.getenv('MYSQL_POOL_PRE_PING', '1') != '0'
+                )
+                metrics.watch_pool(_pool)
+    return _pool
 
-bcrypt = Bcrypt()
 
 def get_db_connection():
-    """Return a new database connection using environment vars with sensible defaults."""
-    return mysql.connector.connect(
-        host=os.getenv('MYSQL_HOST', 'localhost'),
-        user=os.getenv('MYSQL_USER', 'quiz_user'),
-        password=os.getenv('MYSQL_PASSWORD', 'quiz_pass'),
-        database=os.getenv('MYSQL_DB', 'quiz_app'),
-        autocommit=False
-    )
+    """
+    Return a database connection for a model method.
+
+    Inside session_scope() or a Flask request every call shares one pooled
+    connection and one transaction (utils.unit_of_work); commit()/close() on
+    it are deferred to the end of the unit. Outside of both, a plain pooled
+    connection is returned and close() hands it back to the pool.
+    """
+    uow = current_unit_of_work()
+    if uow is None and has_app_context():
+        uow = g.get('_uow')
+        if uow is None:
+            uow = g._uow = UnitOfWork(get_pool().acquire())
+    if uow is not None:
+        return uow.connection()
+    return get_pool().acquire()
+
+
+def release_connection():
+    """
+    Hand the request's pooled connection back to the pool before a slow step
+    that needs no database (bcrypt), if its transaction has nothing pending.
+    The next model call checks a connection out again.
+    """
+    if current_unit_of_work() is not None or not has_app_context():
+        return
+    uow = g.get('_uow')
+    if uow is not None and not uow.dirty and not uow.failed:
+        g.pop('_uow')
+        uow.close()
+
+
+def after_commit(callback):
+    """Run callback once the current unit of work commits (immediately if there is none)."""
+    uow = _current_uow()
+    if uow is None:
+        callback()
+    else:
+        uow.after_commit(callback)
+
+
+def after_rollback(callback):
+    """
+    Run callback if the current unit of work ends without committing (rolled
+    back, failed, or its request errored). In a request the unit is opened if
+    needed; with no unit of work at all the callback is dropped.
+    """
+    if _current_uow() is None and has_app_context():
+        get_db_connection()
+    uow = _current_uow()
+    if uow is not None:
+        uow.after_rollback(callback)
+
+
+def _current_uow():
+    uow = current_unit_of_work()
+    if uow is None and has_app_context():
+        uow = g.get('_uow')
+    return uow
+
+
+def cached(key, loader, cache=None):
+    """
+    Read-through cache lookup (content_cache by default). Results read inside a
+    unit of work that already has uncommitted writes are not cached (they might
+    be rolled back).
+    """
+    uow = _current_uow()
+    if uow is not None and uow.dirty:
+        return loader()
+    return (cache or content_cache).get_or_load(key, loader)
+
+
+def invalidate(*keys, cache=None):
+    """Drop cache keys now and again after commit, so a concurrent reader
+    cannot re-cache the pre-commit state in between. With a shared backend
+    the delete also reaches every other worker."""
+    cache = cache or content_cache
+    cache.delete(*keys)
+    after_commit(lambda: cache.delete(*keys))
+
+
+def touch(*tables):
+    """
+    Bump the HTTP cache versions of tables in the current transaction (so
+    they commit or roll back with the write); this worker drops its cached
+    versions once it commits.
+    """
+    TableVersion.bump(tables)
+    after_commit(forget_versions)
+
+
+def question_set_keys(quiz_id):
+    """Cache keys derived from a quiz's question set (dropped whenever it changes)."""
+    return f'questions:{quiz_id}', f'answer_key:{quiz_id}', f'questions_payload:{quiz_id}'
+
+
+def db_session():
+    """Context manager grouping model calls outside a request into one transaction."""
+    return session_scope(get_pool().acquire())
+
+
+def commit_request(response):
+    """after_request hook: commit the request's unit of work once."""
+    uow = g.get('_uow')
+    if uow is None:
+        return response
+    try:
+        uow.finish(success=response.status_code < 500)
+    except Exception as e:
+        print(f"[models.commit_request] Error committing: {e}")
+        response = jsonify({'message': 'Failed to save changes'})
+        response.status_code = 500
+    return response
+
+
+def release_request(exc=None):
+    """Teardown hook: roll back anything uncommitted and release the connection."""
+    uow = g.pop('_uow', None)
+    if uow is not None:
+        uow.close()
+
+
+def init_app(app):
+    """Register the per-request unit of work hooks on the Flask app."""
+    app.after_request(commit_request)
+    app.teardown_appcontext(release_request)
+
+# ----------------- SHARED SQL ----------------- #
+# Hot-path statements, shared with the async serving mode (asgi.py).
+QUIZ_SELECT_SQL = """
+    SELECT q.id, q.title, q.description, q.time_limit,
+           q.category_id, c.name AS category_name,
+           q.created_by, u.username AS created_by_name,
+           q.is_active, q.created_at
+    FROM quizzes q
+    LEFT JOIN categories c ON q.category_id = c.id
+    LEFT JOIN users u ON q.created_by = u.id
+"""
+ACTIVE_QUIZZES_SQL = QUIZ_SELECT_SQL + """
+    WHERE q.is_active = 1
+    ORDER BY q.created_at DESC
+"""
+QUIZ_BY_ID_SQL = QUIZ_SELECT_SQL + """
+    WHERE q.id = %s
+"""
+QUESTIONS_BY_QUIZ_SQL = """
+    SELECT id, quiz_id, question_text, option_a, option_b, option_c, option_d,
+           correct_option AS correct_answer, points, created_at
+    FROM questions
+    WHERE quiz_id = %s
+    ORDER BY id
+"""
+LEADERBOARD_SQL = """
+    SELECT u.username,
+           s.total_attempts,
+           s.avg_score,
+           s.total_score
+    FROM user_stats s
+    INNER JOIN users u ON u.id = s.user_id
+    WHERE s.total_attempts > 0
+    ORDER BY s.avg_score DESC, s.total_score DESC
+    LIMIT 10
+"""
+CREATE_ATTEMPT_SQL = "INSERT INTO attempts (user_id, quiz_id, started_at) VALUES (%s, %s, %s)"
+ATTEMPT_SQL = "SELECT id, user_id, quiz_id, completed_at FROM attempts WHERE id = %s"
+LOCK_ATTEMPT_SQL = "SELECT user_id, quiz_id, score, completed_at FROM attempts WHERE id=%s FOR UPDATE"
+# Stored answers of an attempt, read with its row locked (waits for an
+# autosave flush of it in flight, which locks the same row first)
+LOCK_ANSWERS_SQL = (
+    "SELECT aa.question_id, aa.selected_option FROM attempts a "
+    "LEFT JOIN attempt_answers aa ON aa.attempt_id = a.id WHERE a.id = %s FOR UPDATE"
+)
+LOCK_ANSWER_BLOB_SQL = "SELECT answers FROM attempt_answer_blobs WHERE attempt_id = %s FOR UPDATE"
+
 
 # ----------------- USER ----------------- #
 class User:
     @staticmethod
     def create(username, email, password, role='user'):
+        # Hashed before touching the database; HasherBusy propagates to the route.
+        hashed_password = hasher.hash(password)
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
         try:
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
             cur.execute(
                 "INSERT INTO users (username, email, password, role, created_at) "
                 "VALUES (%s, %s, %s, %s, %s)",
@@ -67,14 +316,158 @@ class User:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def get_profile(user_id):
+        """Return the cached {id, username, email, role} of a user, or None."""
+        try:
+            return cached(f'user:{user_id}', lambda: User._fetch_profile(user_id), cache=profile_cache)
+        except Exception as e:
+            print(f"[models.User.get_profile] Error: {e}")
+            return None
+
+    @staticmethod
+    def _fetch_profile(user_id):
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute("SELECT id, username, email, role FROM users WHERE id = %s", (user_id,))
+            return cur.fetchone()
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def get_usernames(user_ids):
+        """Return {id: username} for the given ids in one query."""
+        if not user_ids:
+            return {}
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            placeholders = ', '.join(['%s'] * len(user_ids))
+            cur.execute(f"SELECT id, username FROM users WHERE id IN ({placeholders})", tuple(user_ids))
+            return {row['id']: row['username'] for row in cur.fetchall()}
+        except Exception as e:
+            print(f"[models.User.get_usernames] Error: {e}")
+            return {}
+        finally:
+            cur.close()
+            conn.close()
+
     @staticmethod
     def verify_password(hashed_password, password):
         try:
-            return bcrypt.check_password_hash(hashed_password, password)
+            return hasher.check(hashed_password, password)
+        except HasherBusy:
+            raise
         except Exception as e:
             print(f"[models.User.verify_password] Error: {e}")
             return False
 
+    @staticmethod
+    def rehash_password(user_id, password):
+        """Re-hash a verified password with the current BCRYPT_LOG_ROUNDS and store it (best effort)."""
+        # Hashed before touching the database (no connection held meanwhile)
+        try:
+            hashed_password = hasher.hash(password)
+        except Exception as e:
+            print(f"[models.User.rehash_password] Error: {e}")
+            return False
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("UPDATE users SET password = %s WHERE id = %s", (hashed_password, user_id))
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"[models.User.rehash_password] Error: {e}")
+            return False
+        finally:
+            cur.close()
+            conn.close()
+
+# ----------------- REVOCATION ----------------- #
+class Revocation:
+    """Revoked token / session ids and per-user cut-offs (see utils.auth), stored for every worker."""
+
+    @staticmethod
+    def save(name, revoked_at, expires_at):
+        """Record a revocation (and drop expired ones); returns False when it could not be stored."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "INSERT INTO revocations (name, revoked_at, expires_at) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE revoked_at = VALUES(revoked_at), expires_at = VALUES(expires_at)",
+                (name, revoked_at, expires_at)
+            )
+            cur.execute("DELETE FROM revocations WHERE expires_at <= %s", (revoked_at,))
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"[models.Revocation.save] Error: {e}")
+            return False
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def lookup(names, now):
+        """{name: revoked_at} of the unexpired revocations among `names` (raises on database errors)."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(names))
+            cur.execute(
+                f"SELECT name, revoked_at FROM revocations WHERE name IN ({placeholders}) AND expires_at > %s",
+                (*names, now)
+            )
+            return {name: revoked_at for name, revoked_at in cur.fetchall()}
+        finally:
+            cur.close()
+            conn.close()
+
+
+class TableVersion:
+    """Version and last-change time of the tables behind HTTP ETags (see utils.http_cache), shared by every worker."""
+
+    @staticmethod
+    def bump(tables):
+        """Advance the versions of tables (raises on database errors)."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            now = int(time.time())
+            cur.executemany(
+                "INSERT INTO table_versions (table_name, version, updated_at) VALUES (%s, 1, %s) "
+                "ON DUPLICATE KEY UPDATE version = version + 1, updated_at = VALUES(updated_at)",
+                [(table, now) for table in tables]
+            )
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def lookup(tables):
+        """{table: (version, updated_at)} of `tables`, (0, 0) for ones never written (raises on database errors)."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(tables))
+            cur.execute(
+                f"SELECT table_name, version, updated_at FROM table_versions WHERE table_name IN ({placeholders})",
+                tuple(tables)
+            )
+            found = {table: (version, updated_at) for table, version, updated_at in cur.fetchall()}
+            return {table: found.get(table, (0, 0)) for table in tables}
+        finally:
+            cur.close()
+            conn.close()
+
+
 # ----------------- QUIZ ----------------- #
 class Quiz:
     @staticmethod
@@ -88,6 +481,8 @@ class Quiz:
                 (title, description, category_id, time_limit, created_by, datetime.utcnow())
             )
             conn.commit()
+            invalidate(ACTIVE_QUIZZES_KEY)
+            touch('quizzes')
             return cur.lastrowid
         except Exception as e:
             conn.rollback()
@@ -100,48 +495,140 @@ class Quiz:
     @staticmethod
     def get_all_quizzes():
         """Return list of quizzes with category_name and created_by_name (matching routes)."""
+        try:
+            return cached(ACTIVE_QUIZZES_KEY, Quiz._fetch_all_quizzes)
+        except Exception as e:
+            print(f"[models.Quiz.get_all_quizzes] Error: {e}")
+            return []
+
+    # Catalogue projections: 'full' is the row get_all_quizzes() returns,
+    # 'summary' leaves out the description and creator for list views.
+    CATALOGUE_COLUMNS = {
+        'full': """q.id, q.title, q.description, q.time_limit,
+                   q.category_id, c.name AS category_name,
+                   q.created_by, u.username AS created_by_name,
+                   q.is_active, q.created_at""",
+        'summary': """q.id, q.title, q.time_limit,
+                      q.category_id, c.name AS category_name, q.created_at""",
+    }
+
+    @staticmethod
+    def catalogue_query(after=None, limit=20, category_id=None, q=None, fields='full'):
+        """
+        (sql, params) for one page of the active catalogue, newest first, by
+        keyset on (created_at, id) so deep pages cost the same as the first
+        (idx_active_created / idx_active_category_created). `after` is the
+        (created_at, id) of the previous page's last row; `q` is a
+        utils.search.boolean_query() matched against title and description
+        (ft_quiz). One extra row is selected to tell whether a next page exists.
+        """
+        columns = Quiz.CATALOGUE_COLUMNS[fields]
+        joins = "LEFT JOIN categories c ON q.category_id = c.id"
+        if fields == 'full':
+            joins += " LEFT JOIN users u ON q.created_by = u.id"
+        where, params = ["q.is_active = 1"], []
+        if category_id is not None:
+            where.append("q.category_id = %s")
+            params.append(category_id)
+        if q:
+            match, match_params = dialect.match(('q.title', 'q.description'), q)
+            where.append(match)
+            params += match_params
+        if after is not None:
+            where.append("(q.created_at < %s OR (q.created_at = %s AND q.id < %s))")
+            params += [after[0], after[0], after[1]]
+        params.append(limit + 1)
+        sql = (f"SELECT {columns} FROM quizzes q {joins} WHERE {' AND '.join(where)} "
+               f"ORDER BY q.created_at DESC, q.id DESC LIMIT %s")
+        return sql, tuple(params)
+
+    @staticmethod
+    def split_page(rows, limit):
+        """Trim the extra row of catalogue_query(); return (rows, next_key or None)."""
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1]['created_at'], rows[-1]['id'])
+
+    @staticmethod
+    def get_page(after=None, limit=20, category_id=None, q=None, fields='full'):
+        """
+        One catalogue page (see catalogue_query). Returns (rows, next_key or
+        None); query errors, such as a missing FULLTEXT index, are raised.
+        """
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
         try:
-            cur.execute("""
+            cur.execute(*Quiz.catalogue_query(after, limit, category_id, q, fields))
+            return Quiz.split_page(cur.fetchall(), limit)
+        except Exception as e:
+            print(f"[models.Quiz.get_page] Error: {e}")
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def search(text, limit=20):
+        """
+        Active quizzes matching `text` (prefix match on every word) over the
+        FULLTEXT indexes, best first; title hits weigh double.
+        """
+        query = boolean_query(text)
+        if query is None:
+            return []
+        title_score, title_params = dialect.relevance(('q.title',), query)
+        score, score_params = dialect.relevance(('q.title', 'q.description'), query)
+        match, match_params = dialect.match(('q.title', 'q.description'), query)
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(f"""
                 SELECT q.id, q.title, q.description, q.time_limit,
                        q.category_id, c.name AS category_name,
-                       q.created_by, u.username AS created_by_name,
-                       q.is_active, q.created_at
+                       2 * {title_score} + {score} AS score
                 FROM quizzes q
                 LEFT JOIN categories c ON q.category_id = c.id
-                LEFT JOIN users u ON q.created_by = u.id
                 WHERE q.is_active = 1
-                ORDER BY q.created_at DESC
-            """)
-            rows = cur.fetchall()
-            return rows or []
+                  AND {match}
+                ORDER BY score DESC, q.id DESC
+                LIMIT %s
+            """, (*title_params, *score_params, *match_params, limit))
+            return cur.fetchall() or []
         except Exception as e:
-            print(f"[models.Quiz.get_all_quizzes] Error: {e}")
-            return []
+            print(f"[models.Quiz.search] Error: {e}")
+            raise
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
-    def get_quiz_by_id(quiz_id):
+    def _fetch_all_quizzes():
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
         try:
-            cur.execute("""
-                SELECT q.id, q.title, q.description, q.time_limit,
-                       q.category_id, c.name AS category_name,
-                       q.created_by, u.username AS created_by_name,
-                       q.is_active, q.created_at
-                FROM quizzes q
-                LEFT JOIN categories c ON q.category_id = c.id
-                LEFT JOIN users u ON q.created_by = u.id
-                WHERE q.id = %s
-            """, (quiz_id,))
-            return cur.fetchone()
+            cur.execute(ACTIVE_QUIZZES_SQL)
+            rows = cur.fetchall()
+            return rows or []
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def get_quiz_by_id(quiz_id):
+        try:
+            return cached(f'quiz:{quiz_id}', lambda: Quiz._fetch_quiz(quiz_id))
         except Exception as e:
             print(f"[models.Quiz.get_quiz_by_id] Error: {e}")
             return None
+
+    @staticmethod
+    def _fetch_quiz(quiz_id):
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(QUIZ_BY_ID_SQL, (quiz_id,))
+            return cur.fetchone()
         finally:
             cur.close()
             conn.close()
@@ -153,6 +640,8 @@ class Quiz:
         try:
             cur.execute("UPDATE quizzes SET is_active = 0 WHERE id = %s", (quiz_id,))
             conn.commit()
+            invalidate(ACTIVE_QUIZZES_KEY, f'quiz:{quiz_id}')
+            touch('quizzes')
             return True
         except Exception as e:
             conn.rollback()
@@ -175,6 +664,7 @@ class Question:
                 (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_option, points, datetime.utcnow())
             )
             conn.commit()
+            invalidate(*question_set_keys(quiz_id))
             return cur.lastrowid
         except Exception as e:
             conn.rollback()
@@ -184,26 +674,160 @@ class Question:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def create_many(quiz_id, rows):
+        """
+        Insert many questions with one multi-row INSERT.
+        `rows` are tuples in utils.question_io.FIELDS order. Returns the count
+        inserted, or None on failure.
+        """
+        if not rows:
+            return 0
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            now = datetime.utcnow()
+            values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows))
+            params = []
+            for row in rows:
+                params.append(quiz_id)
+                params.extend(row)
+                params.append(now)
+            cur.execute(
+                "INSERT INTO questions (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_option, points, created_at) "
+                f"VALUES {values}",
+                tuple(params)
+            )
+            conn.commit()
+            invalidate(*question_set_keys(quiz_id))
+            return len(rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"[models.Question.create_many] Error: {e}")
+            return None
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def iter_by_quiz(quiz_id, page_size=500):
+        """
+        Yield every question of a quiz (with correct_option), fetched in
+        keyset pages so exports never hold the whole bank in memory.
+        """
+        after_id = 0
+        while True:
+            conn = get_db_connection()
+            cur = conn.cursor(dictionary=True)
+            try:
+                cur.execute("""
+                    SELECT id, question_text, option_a, option_b, option_c, option_d,
+                           correct_option, points
+                    FROM questions
+                    WHERE quiz_id = %s AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (quiz_id, after_id, page_size))
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+                conn.close()
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1]['id']
+
     @staticmethod
     def get_questions_by_quiz(quiz_id):
         """
         Return questions but expose the correct answer as 'correct_answer' (so routes that expect that will work).
         """
+        try:
+            return cached(f'questions:{quiz_id}', lambda: Question._fetch_questions(quiz_id))
+        except Exception as e:
+            print(f"[models.Question.get_questions_by_quiz] Error: {e}")
+            return []
+
+    @staticmethod
+    def _fetch_questions(quiz_id):
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
         try:
-            cur.execute("""
-                SELECT id, quiz_id, question_text, option_a, option_b, option_c, option_d,
-                       correct_option AS correct_answer, points, created_at
-                FROM questions
-                WHERE quiz_id = %s
-                ORDER BY id
-            """, (quiz_id,))
+            cur.execute(QUESTIONS_BY_QUIZ_SQL, (quiz_id,))
             rows = cur.fetchall()
             return rows or []
-        except Exception as e:
-            print(f"[models.Question.get_questions_by_quiz] Error: {e}")
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def search(text, limit=20):
+        """Questions of active quizzes matching `text` over ft_question (text and options), best first."""
+        query = boolean_query(text)
+        if query is None:
             return []
+        columns = ('qu.question_text', 'qu.option_a', 'qu.option_b', 'qu.option_c', 'qu.option_d')
+        score, score_params = dialect.relevance(columns, query)
+        match, match_params = dialect.match(columns, query)
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(f"""
+                SELECT qu.id, qu.quiz_id, z.title AS quiz_title, qu.question_text,
+                       qu.option_a, qu.option_b, qu.option_c, qu.option_d,
+                       {score} AS score
+                FROM questions qu
+                INNER JOIN quizzes z ON z.id = qu.quiz_id
+                WHERE z.is_active = 1
+                  AND {match}
+                ORDER BY score DESC, qu.id DESC
+                LIMIT %s
+            """, (*score_params, *match_params, limit))
+            return cur.fetchall() or []
+        except Exception as e:
+            print(f"[models.Question.search] Error: {e}")
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    # What students get: no correct_option
+    PUBLIC_FIELDS = ('id', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'points')
+    UPDATABLE_FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option', 'points')
+    SCORING_FIELDS = ('correct_option', 'points')
+
+    @staticmethod
+    def update(question_id, fields):
+        """
+        Update the given columns of a question.
+        Returns (quiz_id, scoring_changed) or None on failure / unknown question;
+        scoring_changed tells the caller whether existing attempts need a regrade.
+        """
+        fields = {k: v for k, v in fields.items() if k in Question.UPDATABLE_FIELDS}
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute("SELECT quiz_id, correct_option, points FROM questions WHERE id = %s FOR UPDATE",
+                        (question_id,))
+            current = cur.fetchone()
+            if not current:
+                conn.rollback()
+                return None
+            if fields:
+                assignments = ', '.join(f"{name} = %s" for name in fields)
+                cur.execute(f"UPDATE questions SET {assignments} WHERE id = %s",
+                            tuple(fields.values()) + (question_id,))
+            conn.commit()
+            quiz_id = current['quiz_id']
+            invalidate(*question_set_keys(quiz_id))
+            scoring_changed = any(
+                name in fields and fields[name] != current[name] for name in Question.SCORING_FIELDS
+            )
+            return quiz_id, scoring_changed
+        except Exception as e:
+            conn.rollback()
+            print(f"[models.Question.update] Error: {e}")
+            return None
         finally:
             cur.close()
             conn.close()
@@ -213,8 +837,12 @@ class Question:
         conn = get_db_connection()
         cur = conn.cursor()
         try:
+            cur.execute("SELECT quiz_id FROM questions WHERE id = %s", (question_id,))
+            row = cur.fetchone()
             cur.execute("DELETE FROM questions WHERE id = %s", (question_id,))
             conn.commit()
+            if row:
+                invalidate(*question_set_keys(row[0]))
             return True
         except Exception as e:
             conn.rollback()
@@ -231,10 +859,7 @@ class Attempt:
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
         try:
-            cur.execute(
-                "INSERT INTO attempts (user_id, quiz_id, started_at) VALUES (%s, %s, %s)",
-                (user_id, quiz_id, datetime.utcnow())
-            )
+            cur.execute(CREATE_ATTEMPT_SQL, (user_id, quiz_id, datetime.utcnow()))
             conn.commit()
             return cur.lastrowid
         except Exception as e:
@@ -246,15 +871,93 @@ class Attempt:
             conn.close()
 
     @staticmethod
-    def complete_attempt(attempt_id, score, total_questions):
+    def create_attempts_bulk(rows):
+        """
+        Insert attempts with pre-allocated ids in one multi-row statement
+        (write-behind path). `rows` are (id, user_id, quiz_id, started_at).
+        """
+        if not rows:
+            return
         conn = get_db_connection()
         cur = conn.cursor()
         try:
+            values = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
             cur.execute(
-                "UPDATE attempts SET score=%s, total_questions=%s, completed_at=%s WHERE id=%s",
-                (score, total_questions, datetime.utcnow(), attempt_id)
+                f"INSERT INTO attempts (id, user_id, quiz_id, started_at) VALUES {values}",
+                tuple(value for row in rows for value in row)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def reserve_ids(count):
+        """
+        Reserve a block of `count` attempt ids (hi-lo allocation through the
+        id_blocks table) and return range(first, first + count). Every block
+        starts above the highest existing attempt id, so attempts inserted
+        with AUTO_INCREMENT meanwhile (WRITE_BEHIND switched off and on
+        again) are never handed out twice.
+        """
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("INSERT IGNORE INTO id_blocks (name, next_id) VALUES ('attempts', 1)")
+            if dialect.name == 'sqlite':
+                cur.execute("""
+                    UPDATE id_blocks
+                    SET next_id = MAX(next_id, (SELECT COALESCE(MAX(id), 0) + 1 FROM attempts)) + %s
+                    WHERE name = 'attempts'
+                    RETURNING next_id
+                """, (count,))
+            else:
+                cur.execute("""
+                    UPDATE id_blocks
+                    SET next_id = LAST_INSERT_ID(GREATEST(next_id, (SELECT COALESCE(MAX(id), 0) + 1 FROM attempts)) + %s)
+                    WHERE name = 'attempts'
+                """, (count,))
+                cur.execute("SELECT LAST_INSERT_ID()")
+            end = cur.fetchone()[0]
+            conn.commit()
+            return range(end - count, end)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def complete_attempt(attempt_id, score, total_questions, answers=None, completed_at=None):
+        """
+        Record the final score and fold it into the user's leaderboard
+        aggregates (user_stats, user_quiz_stats) in the same transaction.
+        Re-submitting an already completed attempt only applies the score
+        difference. `answers` ([(question_id, option or None), ...]) are
+        stored in the same transaction too, as ANSWER_STORAGE dictates.
+        """
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(LOCK_ATTEMPT_SQL, (attempt_id,))
+            previous = cur.fetchone()
+            if not previous:
+                conn.rollback()
+                return False
+
+            statements, attempts_delta, score_delta = Attempt.completion_statements(
+                previous, attempt_id, score, total_questions, answers, completed_at
             )
+            for sql, params in statements:
+                cur.execute(sql, params)
             conn.commit()
+            after_commit(lambda: Attempt._record_in_boards(
+                previous['user_id'], previous['quiz_id'], attempts_delta, score_delta, score
+            ))
             return True
         except Exception as e:
             conn.rollback()
@@ -264,6 +967,253 @@ class Attempt:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def completion_statements(previous, attempt_id, score, total_questions, answers=None, completed_at=None):
+        """
+        Build the writes that complete an attempt whose row `previous`
+        (LOCK_ATTEMPT_SQL) is locked: the attempt update, both leaderboard
+        aggregates and the answers. Returns (statements, attempts_delta, score_delta).
+        """
+        if previous['completed_at'] is None:
+            attempts_delta, score_delta = 1, score
+        else:
+            attempts_delta, score_delta = 0, score - (previous['score'] or 0)
+        statements = [
+            ("UPDATE attempts SET score=%s, total_questions=%s, completed_at=%s WHERE id=%s",
+             (score, total_questions, completed_at or datetime.utcnow(), attempt_id)),
+            ("INSERT INTO user_stats (user_id, total_attempts, total_score) VALUES (%s, %s, %s) "
+             "ON DUPLICATE KEY UPDATE total_attempts = total_attempts + VALUES(total_attempts), "
+             "total_score = total_score + VALUES(total_score)",
+             (previous['user_id'], attempts_delta, score_delta)),
+            ("INSERT INTO user_quiz_stats (user_id, quiz_id, attempts, best_score, total_score) "
+             "VALUES (%s, %s, %s, %s, %s) "
+             "ON DUPLICATE KEY UPDATE attempts = attempts + VALUES(attempts), "
+             "best_score = GREATEST(best_score, VALUES(best_score)), "
+             "total_score = total_score + VALUES(total_score)",
+             (previous['user_id'], previous['quiz_id'], attempts_delta, score, score_delta)),
+        ]
+        if answers is not None:
+            statements.extend(_answer_statements(attempt_id, answers))
+        return statements, attempts_delta, score_delta
+
+    @staticmethod
+    def save_answers(attempt_id, answers):
+        """
+        Store selected options for an attempt outside of complete_attempt.
+        `answers` is an iterable of (question_id, selected_option or None).
+        """
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            _store_answers(cur, attempt_id, answers)
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"[models.Attempt.save_answers] Error: {e}")
+            return False
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def lock_answers(attempt_id):
+        """
+        Return the stored answers of an attempt ({question_id: option}),
+        read with its row locked like complete_attempt does; the lock is
+        held until the caller's transaction ends. The blob is only read with
+        ANSWER_STORAGE=packed.
+        """
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(LOCK_ANSWERS_SQL, (attempt_id,))
+            rows = cur.fetchall()
+            blob = None
+            if ANSWER_STORAGE == 'packed':
+                cur.execute(LOCK_ANSWER_BLOB_SQL, (attempt_id,))
+                row = cur.fetchone()
+                blob = row[0] if row else None
+            return stored_answer_map(rows, blob)
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def get_attempt(attempt_id):
+        """Return {id, user_id, quiz_id, completed_at} for an attempt, or None."""
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(ATTEMPT_SQL, (attempt_id,))
+            return cur.fetchone()
+        except Exception as e:
+            print(f"[models.Attempt.get_attempt] Error: {e}")
+            return None
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def save_autosaved_answers(pending):
+        """
+        Write-behind flush for autosaved answers: `pending` is
+        {attempt_id: {question_id: option}}. Attempts that were completed in
+        the meantime are skipped (their final answers are already stored);
+        the row locks taken here serialize with complete_attempt.
+        Returns the number of answers written.
+        """
+        if not pending:
+            return 0
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            ids = list(pending)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cur.execute(
+                f"SELECT id FROM attempts WHERE id IN ({placeholders}) AND completed_at IS NULL FOR UPDATE",
+                tuple(ids)
+            )
+            open_ids = {row[0] for row in cur.fetchall()}
+            rows = [
+                (attempt_id, qid, option)
+                for attempt_id, answers in pending.items() if attempt_id in open_ids
+                for qid, option in answers.items()
+            ]
+            for sql, params in _answer_row_statements(rows):
+                cur.execute(sql, params)
+            conn.commit()
+            return len(rows)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    # ---- regrade support (see regrade.py) ---- #
+    @staticmethod
+    def get_completed_batch(quiz_id, after_id, limit):
+        """Keyset-paginated completed attempts of a quiz: [{id, user_id, score}], ordered by id."""
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute("""
+                SELECT id, user_id, score
+                FROM attempts
+                WHERE quiz_id = %s AND completed_at IS NOT NULL AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (quiz_id, after_id, limit))
+            return cur.fetchall() or []
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def get_answers_for(attempt_ids):
+        """
+        Return {attempt_id: {question_id: selected_option}} for the given
+        attempts, from attempt_answers rows and packed blobs (blobs win).
+        """
+        if not attempt_ids:
+            return {}
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(attempt_ids))
+            cur.execute(
+                f"SELECT attempt_id, question_id, selected_option FROM attempt_answers "
+                f"WHERE attempt_id IN ({placeholders})",
+                tuple(attempt_ids)
+            )
+            answers = {}
+            for attempt_id, question_id, option in cur.fetchall():
+                answers.setdefault(attempt_id, {})[question_id] = option
+            cur.execute(
+                f"SELECT attempt_id, answers FROM attempt_answer_blobs WHERE attempt_id IN ({placeholders})",
+                tuple(attempt_ids)
+            )
+            for attempt_id, blob in cur.fetchall():
+                answers.setdefault(attempt_id, {}).update(unpack_answers(bytes(blob)))
+            return answers
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def apply_regrade(new_scores):
+        """
+        Write rescored attempts ({attempt_id: new_score}) in batched statements.
+        The current scores are re-read FOR UPDATE in the same transaction, so
+        the user_stats deltas are exact even if an attempt was resubmitted
+        since it was read. Returns the number of attempts whose score changed.
+        """
+        if not new_scores:
+            return 0
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            ids = list(new_scores)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cur.execute(
+                f"SELECT id, user_id, score FROM attempts WHERE id IN ({placeholders}) FOR UPDATE",
+                tuple(ids)
+            )
+            changes = [
+                (attempt_id, user_id, old, new_scores[attempt_id])
+                for attempt_id, user_id, old in cur.fetchall()
+                if new_scores[attempt_id] != old
+            ]
+            if not changes:
+                return 0
+            cur.executemany(
+                "UPDATE attempts SET score = %s WHERE id = %s",
+                [(new, attempt_id) for attempt_id, _, _, new in changes]
+            )
+            deltas = {}
+            for _, user_id, old, new in changes:
+                deltas[user_id] = deltas.get(user_id, 0) + new - (old or 0)
+            cur.executemany(
+                "INSERT INTO user_stats (user_id, total_attempts, total_score) VALUES (%s, 0, %s) "
+                "ON DUPLICATE KEY UPDATE total_score = total_score + VALUES(total_score)",
+                list(deltas.items())
+            )
+            conn.commit()
+            return len(changes)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def refresh_quiz_stats(quiz_id):
+        """Recompute user_quiz_stats rows of one quiz from its attempts."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                INSERT INTO user_quiz_stats (user_id, quiz_id, attempts, best_score, total_score)
+                SELECT user_id, quiz_id, COUNT(*), COALESCE(MAX(score), 0), COALESCE(SUM(score), 0)
+                FROM attempts
+                WHERE quiz_id = %s AND completed_at IS NOT NULL
+                GROUP BY user_id, quiz_id
+                ON DUPLICATE KEY UPDATE attempts = VALUES(attempts),
+                                        best_score = VALUES(best_score),
+                                        total_score = VALUES(total_score)
+            """, (quiz_id,))
+            conn.commit()
+            after_commit(leaderboard_cache.clear)
+            after_commit(leaderboards.clear)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
     @staticmethod
     def get_user_attempts(user_id):
         conn = get_db_connection()
@@ -287,30 +1237,252 @@ class Attempt:
 
     @staticmethod
     def get_leaderboard():
+        try:
+            return cached('global', Attempt._fetch_leaderboard, cache=leaderboard_cache)
+        except Exception as e:
+            print(f"[models.Attempt.get_leaderboard] Error: {e}")
+            return []
+
+    @staticmethod
+    def _fetch_leaderboard():
+        """Top 10 by average then total score, read from the user_stats aggregate."""
         conn = get_db_connection()
         cur = conn.cursor(dictionary=True)
         try:
-            cur.execute("""
-                SELECT u.username,
-                       COUNT(a.id) AS total_attempts,
-                       AVG(a.score) AS avg_score,
-                       SUM(a.score) AS total_score
-                FROM users u
-                INNER JOIN attempts a ON u.id = a.user_id
-                WHERE a.completed_at IS NOT NULL
-                GROUP BY u.id, u.username
-                ORDER BY avg_score DESC, total_score DESC
-                LIMIT 10
-            """)
+            cur.execute(LEADERBOARD_SQL)
             rows = cur.fetchall()
             return rows or []
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def rebuild_leaderboard():
+        """Recompute user_stats and user_quiz_stats from the attempts table (backfill / repair)."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("DELETE FROM user_stats")
+            cur.execute("""
+                INSERT INTO user_stats (user_id, total_attempts, total_score)
+                SELECT user_id, COUNT(*), COALESCE(SUM(score), 0)
+                FROM attempts
+                WHERE completed_at IS NOT NULL
+                GROUP BY user_id
+            """)
+            rebuilt = cur.rowcount
+            cur.execute("DELETE FROM user_quiz_stats")
+            cur.execute("""
+                INSERT INTO user_quiz_stats (user_id, quiz_id, attempts, best_score, total_score)
+                SELECT user_id, quiz_id, COUNT(*), COALESCE(MAX(score), 0), COALESCE(SUM(score), 0)
+                FROM attempts
+                WHERE completed_at IS NOT NULL
+                GROUP BY user_id, quiz_id
+            """)
+            conn.commit()
+            after_commit(leaderboard_cache.clear)
+            after_commit(leaderboards.clear)
+            return rebuilt
         except Exception as e:
-            print(f"[models.Attempt.get_leaderboard] Error: {e}")
-            return []
+            conn.rollback()
+            print(f"[models.Attempt.rebuild_leaderboard] Error: {e}")
+            return None
+        finally:
+            cur.close()
+            conn.close()
+
+    # ---- ranked boards (global, per quiz, per category) ---- #
+    @staticmethod
+    def _load_board(name):
+        """BoardRegistry loader: yield (user_id, scores, extra) for a board name."""
+        kind, _, board_id = name.partition(':')
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            if kind == 'global':
+                cur.execute("""
+                    SELECT s.user_id, u.username, s.total_attempts, s.total_score, s.avg_score
+                    FROM user_stats s
+                    INNER JOIN users u ON u.id = s.user_id
+                    WHERE s.total_attempts > 0
+                """)
+                return [
+                    (r['user_id'], (r['avg_score'], r['total_score']),
+                     {'username': r['username'], 'total_attempts': r['total_attempts'],
+                      'total_score': r['total_score']})
+                    for r in cur.fetchall()
+                ]
+            if kind == 'quiz':
+                cur.execute("""
+                    SELECT s.user_id, u.username, s.attempts, s.best_score
+                    FROM user_quiz_stats s
+                    INNER JOIN users u ON u.id = s.user_id
+                    WHERE s.quiz_id = %s AND s.attempts > 0
+                """, (int(board_id),))
+                return [
+                    (r['user_id'], (r['best_score'],),
+                     {'username': r['username'], 'attempts': r['attempts']})
+                    for r in cur.fetchall()
+                ]
+            if kind == 'category':
+                cur.execute("""
+                    SELECT s.user_id, u.username,
+                           SUM(s.best_score) AS score, SUM(s.attempts) AS attempts
+                    FROM user_quiz_stats s
+                    INNER JOIN quizzes q ON q.id = s.quiz_id
+                    INNER JOIN users u ON u.id = s.user_id
+                    WHERE q.category_id = %s AND q.is_active = 1 AND s.attempts > 0
+                    GROUP BY s.user_id, u.username
+                """, (int(board_id),))
+                return [
+                    (r['user_id'], (r['score'],),
+                     {'username': r['username'], 'attempts': int(r['attempts'])})
+                    for r in cur.fetchall()
+                ]
+            raise ValueError(f"Unknown leaderboard: {name}")
         finally:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def _record_in_boards(user_id, quiz_id, attempts_delta, score_delta, score):
+        """Apply a committed submission to the boards this process has loaded."""
+        board = leaderboards.loaded('global')
+        if board is not None:
+            current = board.get(user_id)
+            extra = dict(current[1]) if current else {}
+            total_attempts = extra.get('total_attempts', 0) + attempts_delta
+            total_score = extra.get('total_score', 0) + score_delta
+            extra.update(total_attempts=total_attempts, total_score=total_score)
+            if total_attempts > 0:
+                board.update(user_id, (total_score / total_attempts, total_score), extra)
+
+        old_best = None
+        board = leaderboards.loaded(f'quiz:{quiz_id}')
+        if board is not None:
+            current = board.get(user_id)
+            old_best = current[0][0] if current else 0
+            extra = dict(current[1]) if current else {}
+            extra['attempts'] = extra.get('attempts', 0) + attempts_delta
+            board.update(user_id, (max(old_best, score),), extra)
+
+        # A category score is the sum of best quiz scores; the delta is only
+        # known when the quiz board was loaded, otherwise the TTL rebuild catches up.
+        quiz = Quiz.get_quiz_by_id(quiz_id)
+        board = leaderboards.loaded(f"category:{quiz['category_id']}") if quiz else None
+        if board is not None and old_best is not None:
+            current = board.get(user_id)
+            extra = dict(current[1]) if current else {}
+            extra['attempts'] = extra.get('attempts', 0) + attempts_delta
+            previous = current[0][0] if current else 0
+            board.update(user_id, (previous + max(score - old_best, 0),), extra)
+
+    @staticmethod
+    def get_board_page(name, after=None, limit=10):
+        """
+        Return (entries, next_cursor) for a board, best first, keyset-paginated.
+        Raises on DB errors so routes can tell an empty board from a failure.
+        """
+        entries, next_cursor = leaderboards.get(name).page(after, limit)
+        missing = [user_id for _, user_id, _, extra in entries if 'username' not in extra]
+        usernames = User.get_usernames(missing) if missing else {}
+        return [
+            _board_entry(name, rank, user_id, scores, extra, usernames)
+            for rank, user_id, scores, extra in entries
+        ], next_cursor
+
+    @staticmethod
+    def get_board_rank(name, user_id):
+        """Return the user's entry (with rank) and the board size, or (None, size)."""
+        board = leaderboards.get(name)
+        current = board.get(user_id)
+        if current is None:
+            return None, len(board)
+        scores, extra = current
+        usernames = {} if 'username' in extra else User.get_usernames([user_id])
+        return _board_entry(name, board.rank(user_id), user_id, scores, extra, usernames), len(board)
+
+
+def _store_answers(cur, attempt_id, answers):
+    """Persist a submission's answers on `cur` (the caller owns the transaction)."""
+    for sql, params in _answer_statements(attempt_id, answers):
+        cur.execute(sql, params)
+
+
+def _answer_statements(attempt_id, answers):
+    """
+    Statements storing a submission's answers: 'rows' mode upserts
+    attempt_answers with multi-row statements; 'packed' mode writes a
+    single blob.
+    """
+    answers = list(answers)
+    if not answers:
+        return []
+    if ANSWER_STORAGE == 'packed':
+        return [(
+            "INSERT INTO attempt_answer_blobs (attempt_id, answers) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE answers = VALUES(answers)",
+            (attempt_id, pack_answers(answers))
+        )]
+    return _answer_row_statements([(attempt_id, qid, option) for qid, option in answers])
+
+
+def stored_answer_map(rows, blob=None):
+    """{question_id: option} from LOCK_ANSWERS_SQL rows and a packed blob (which wins)."""
+    answers = {question_id: option for question_id, option in rows if question_id is not None}
+    if blob is not None:
+        answers.update(unpack_answers(bytes(blob)))
+    return answers
+
+
+def unstored_answers(answers, stored):
+    """
+    The (question_id, option) pairs of a submission that `stored` does not
+    hold yet (new or changed), so completing an attempt leaves its
+    autosaved rows alone. A packed blob is rewritten whole if anything changed.
+    """
+    answers = list(answers)
+    changed = [(qid, option) for qid, option in answers if qid not in stored or stored[qid] != option]
+    if ANSWER_STORAGE == 'packed' and changed:
+        return answers
+    return changed
+
+
+def _answer_row_statements(rows):
+    """Upserts of (attempt_id, question_id, option) rows, one statement per ANSWER_INSERT_CHUNK."""
+    statements = []
+    for start in range(0, len(rows), ANSWER_INSERT_CHUNK):
+        chunk = rows[start:start + ANSWER_INSERT_CHUNK]
+        values = ', '.join(['(%s, %s, %s)'] * len(chunk))
+        params = [value for row in chunk for value in row]
+        statements.append((
+            f"INSERT INTO attempt_answers (attempt_id, question_id, selected_option) VALUES {values} "
+            f"ON DUPLICATE KEY UPDATE selected_option = VALUES(selected_option)",
+            tuple(params)
+        ))
+    return statements
+
+
+def _board_entry(name, rank, user_id, scores, extra, usernames):
+    entry = {
+        'rank': rank,
+        'user_id': user_id,
+        'username': extra.get('username') or usernames.get(user_id),
+    }
+    if name == 'global':
+        entry.update(avg_score=scores[0], total_score=scores[1],
+                     total_attempts=extra.get('total_attempts'))
+    elif name.startswith('quiz:'):
+        entry.update(best_score=scores[0], attempts=extra.get('attempts'))
+    else:
+        entry.update(score=scores[0], attempts=extra.get('attempts'))
+    return entry
+
+
+# In-process rank indexes over the aggregate tables, rebuilt every
+# LEADERBOARD_INDEX_TTL seconds to pick up other workers' submissions.
+leaderboards = BoardRegistry(Attempt._load_board, ttl=int(os.getenv('LEADERBOARD_INDEX_TTL', 60)))
+
 # ----------------- CATEGORY ----------------- #
 class Category:
     @staticmethod
@@ -321,6 +1493,7 @@ class Category:
             cur.execute("INSERT INTO categories (name, description, created_at) VALUES (%s, %s, %s)",
                         (name, description, datetime.utcnow()))
             conn.commit()
+            touch('categories')
             return cur.lastrowid
         except Exception as e:
             conn.rollback()
@@ -344,3 +1517,141 @@ class Category:
         finally:
             cur.close()
             conn.close()
+
+
+# ----------------- REGRADE JOB ----------------- #
+class RegradeRecord:
+    """Progress of regrade jobs (see regrade.py), stored so every worker can report it."""
+    FIELDS = ('status', 'processed', 'changed', 'skipped', 'error', 'started_at', 'finished_at')
+
+    @staticmethod
+    def create(quiz_id):
+        """Insert a queued job and return its id (raises on database errors)."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("INSERT INTO regrade_jobs (quiz_id, status) VALUES (%s, 'queued')", (quiz_id,))
+            conn.commit()
+            return cur.lastrowid
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def save(job_id, state):
+        """Store a job's RegradeRecord.FIELDS from `state`; returns False when it could not be stored."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            assignments = ', '.join(f"{name} = %s" for name in RegradeRecord.FIELDS)
+            cur.execute(f"UPDATE regrade_jobs SET {assignments} WHERE id = %s",
+                        tuple(state[name] for name in RegradeRecord.FIELDS) + (job_id,))
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"[models.RegradeRecord.save] Error: {e}")
+            return False
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def get(job_id):
+        """A job in RegradeJob.to_dict() form, or None (raises on database errors)."""
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(
+                f"SELECT id AS job_id, quiz_id, {', '.join(RegradeRecord.FIELDS)} FROM regrade_jobs WHERE id = %s",
+                (job_id,)
+            )
+            return cur.fetchone()
+        finally:
+            cur.close()
+            conn.close()
+
+
+# ----------------- STATS ----------------- #
+class Stats:
+    RECENT_QUIZZES = 10
+
+    @staticmethod
+    def get_dashboard():
+        """Admin dashboard totals and the most recent quizzes with their counts (cached briefly)."""
+        try:
+            return cached('dashboard', Stats._fetch_dashboard, cache=stats_cache)
+        except Exception as e:
+            print(f"[models.Stats.get_dashboard] Error: {e}")
+            return None
+
+    @staticmethod
+    def _fetch_dashboard():
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        try:
+            # Attempt totals come from the user_stats aggregate, not a scan of attempts;
+            # active takers are open attempts started within ACTIVE_TAKER_WINDOW (idx_completed).
+            cur.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM quizzes WHERE is_active = 1) AS quizzes,
+                    (SELECT COUNT(*) FROM questions qu
+                       INNER JOIN quizzes z ON z.id = qu.quiz_id
+                       WHERE z.is_active = 1) AS questions,
+                    (SELECT COUNT(*) FROM categories) AS categories,
+                    (SELECT COALESCE(SUM(total_attempts), 0) FROM user_stats) AS attempts,
+                    (SELECT COALESCE(SUM(total_score), 0) FROM user_stats) AS total_score,
+                    (SELECT COUNT(DISTINCT user_id) FROM attempts
+                       WHERE completed_at IS NULL AND started_at >= %s) AS active_takers
+            """, (datetime.utcnow() - ACTIVE_TAKER_WINDOW,))
+            totals = cur.fetchone()
+            total_score = totals.pop('total_score')
+            totals['attempts'] = int(totals['attempts'])   # SUM() comes back as DECIMAL
+            totals['average_score'] = round(float(total_score) / totals['attempts'], 2) if totals['attempts'] else None
+
+            cur.execute("""
+                SELECT q.id, q.title, q.time_limit,
+                       q.category_id, c.name AS category_name,
+                       u.username AS created_by_name, q.created_at,
+                       (SELECT COUNT(*) FROM questions qu WHERE qu.quiz_id = q.id) AS question_count,
+                       (SELECT COALESCE(SUM(s.attempts), 0) FROM user_quiz_stats s
+                          WHERE s.quiz_id = q.id) AS attempts,
+                       (SELECT SUM(s.total_score) FROM user_quiz_stats s
+                          WHERE s.quiz_id = q.id) AS total_score
+                FROM (
+                    SELECT id FROM quizzes
+                    WHERE is_active = 1
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                ) recent
+                INNER JOIN quizzes q ON q.id = recent.id
+                LEFT JOIN categories c ON q.category_id = c.id
+                LEFT JOIN users u ON q.created_by = u.id
+                ORDER BY q.created_at DESC, q.id DESC
+            """, (Stats.RECENT_QUIZZES,))
+            recent = cur.fetchall()
+            for quiz in recent:
+                total = quiz.pop('total_score')
+                quiz['attempts'] = int(quiz['attempts'])
+                quiz['average_score'] = round(float(total) / quiz['attempts'], 2) if quiz['attempts'] else None
+            return {'totals': totals, 'recent_quizzes': recent}
+        finally:
+            cur.close()
+            conn.close()
+
+
+# Per-method latency in /metrics when METRICS_ENABLED=1 (utils.metrics)
+metrics.instrument_models(User, Revocation, TableVersion, Quiz, Question, Attempt, Category, RegradeRecord, Stats)
+
+# The slow-query log runs EXPLAIN on its own, untraced connection
+profiler.explain_connector = _open_connection
+profiler.explain_prefix = dialect.explain
+
+# Requests authenticate against the stored user (role included), not the token's
+# claims, and check revocations in the database
+auth.profile_loader = User.get_profile
+auth.revocation_store = Revocation
+http_cache.version_store = TableVersion
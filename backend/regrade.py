@@ -0,0 +1,138 @@
+# regrade.py
+import os
+import threading
+import time
+
+from models import Attempt, Question, RegradeRecord, db_session
+from scoring import AnswerKey, score_many
+
+BATCH_SIZE = int(os.getenv('REGRADE_BATCH_SIZE', 1000))
+
+_running = {}            # quiz_id -> job currently running for it in this process
+_jobs_lock = threading.Lock()
+
+
+class RegradeJob:
+    """
+    Rescore every completed attempt of one quiz against its current answer
+    key. Attempts are streamed in id order, BATCH_SIZE at a time, each batch
+    scored in one score_many() call and written back in its own transaction,
+    so memory stays flat however many attempts the quiz has. Attempts with
+    no stored answers (taken before answers were recorded) are skipped.
+    Progress is saved in regrade_jobs after every batch, so any worker can
+    report it.
+    """
+
+    def __init__(self, quiz_id, batch_size=BATCH_SIZE):
+        with db_session():
+            self.id = RegradeRecord.create(quiz_id)
+        self.quiz_id = quiz_id
+        self.batch_size = batch_size
+        self.status = 'queued'
+        self.processed = 0
+        self.changed = 0
+        self.skipped = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.rerun = False
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'quiz_id': self.quiz_id,
+            'status': self.status,
+            'processed': self.processed,
+            'changed': self.changed,
+            'skipped': self.skipped,
+            'error': self.error,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+    def run(self):
+        # A rerun starts over: counters describe the latest pass only
+        self.status = 'running'
+        self.processed = self.changed = self.skipped = 0
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._save()
+        try:
+            with db_session():
+                questions = Question._fetch_questions(self.quiz_id)
+            key = AnswerKey.from_questions(self.quiz_id, questions)
+
+            after_id = 0
+            while True:
+                with db_session():
+                    batch = Attempt.get_completed_batch(self.quiz_id, after_id, self.batch_size)
+                    if not batch:
+                        break
+                    after_id = batch[-1]['id']
+                    self._regrade_batch(key, batch)
+                self._save()
+
+            with db_session():
+                Attempt.refresh_quiz_stats(self.quiz_id)
+            self.status = 'finished'
+        except Exception as e:
+            print(f"[regrade.RegradeJob] Error regrading quiz {self.quiz_id}: {e}")
+            self.status = 'failed'
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+            self._save()
+
+    def _save(self):
+        try:
+            with db_session():
+                RegradeRecord.save(self.id, self.to_dict())
+        except Exception as e:
+            print(f"[regrade.RegradeJob._save] Error: {e}")
+
+    def _regrade_batch(self, key, batch):
+        answers = Attempt.get_answers_for([a['id'] for a in batch])
+        graded = [a for a in batch if a['id'] in answers]
+        self.skipped += len(batch) - len(graded)
+
+        scores = score_many(key, [answers[a['id']] for a in graded])
+        # Only attempts that look changed are locked; apply_regrade re-reads their scores
+        new_scores = {a['id']: new_score for a, new_score in zip(graded, scores) if new_score != a['score']}
+        self.changed += Attempt.apply_regrade(new_scores)
+        self.processed += len(graded)
+
+
+def _run_job(job):
+    while True:
+        job.run()
+        with _jobs_lock:
+            if not job.rerun or job.status == 'failed':
+                _running.pop(job.quiz_id, None)
+                return
+            # The key changed again while we were running: go over it once more.
+            job.rerun = False
+
+
+def start_regrade(quiz_id):
+    """
+    Start a background regrade of a quiz and return its job. If one is
+    already running for the quiz, it is asked to run again when done
+    (the answer key changed under it) and that job is returned.
+    """
+    with _jobs_lock:
+        job = _running.get(quiz_id)
+        if job is not None:
+            job.rerun = True
+            return job
+        job = RegradeJob(quiz_id)
+        _running[quiz_id] = job
+
+    threading.Thread(target=_run_job, args=(job,), name=f'regrade-{quiz_id}', daemon=True).start()
+    return job
+
+
+def get_job(job_id):
+    """The latest saved state of a job (as RegradeJob.to_dict()), or None."""
+    with db_session():
+        return RegradeRecord.get(job_id)
@@ -1,14 +1,23 @@
-from flask import Blueprint, request, jsonify, session
-from models import Quiz, Question, Category
+import os
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from models import Quiz, Question, Category, Stats, after_commit, db_session
 from utils.decorators import admin_required
+from utils.auth import current_identity, AuthError
+from utils import question_io
+from regrade import start_regrade, get_job
+
+IMPORT_BATCH_SIZE = int(os.getenv('QUESTION_IMPORT_BATCH_SIZE', 500))
+MAX_REPORTED_ERRORS = 100
 
 admin_bp = Blueprint('admin', __name__)
 
 def check_admin():
     """Helper function to check if user is admin"""
-    if 'user_id' not in session or session.get('role') != 'admin':
+    try:
+        identity = current_identity()
+    except AuthError:
         return False
-    return True
+    return identity is not None and identity['role'] == 'admin'
 
 @admin_bp.route('/quizzes', methods=['POST'])
 def create_quiz():
@@ -26,7 +35,7 @@ def create_quiz():
         if not title or not description:
             return jsonify({'message': 'Title and description are required'}), 400
         
-        quiz_id = Quiz.create(title, description, category_id, time_limit, session['user_id'])
+        quiz_id = Quiz.create(title, description, category_id, time_limit, current_identity()['user_id'])
         
         return jsonify({
             'message': 'Quiz created successfully',
@@ -62,7 +71,6 @@ def create_question():
         option_c = data.get('option_c')
         option_d = data.get('option_d')
         correct_option = data.get('correct_option')
-        points = data.get('points', 10)
         
         if not all([quiz_id, question_text, option_a, option_b, option_c, option_d, correct_option]):
             return jsonify({'message': 'All fields are required'}), 400
@@ -70,6 +78,11 @@ def create_question():
         if correct_option not in ['A', 'B', 'C', 'D']:
             return jsonify({'message': 'Correct option must be A, B, C, or D'}), 400
         
+        try:
+            points = question_io.parse_points(data.get('points'))
+        except question_io.RowError as e:
+            return jsonify({'message': str(e)}), 400
+        
         question_id = Question.create(
             quiz_id, question_text, option_a, option_b, 
             option_c, option_d, correct_option, points
@@ -82,6 +95,71 @@ def create_question():
     except Exception as e:
         return jsonify({'message': f'Error: {str(e)}'}), 500
 
+@admin_bp.route('/questions/<int:question_id>', methods=['PUT'])
+def update_question(question_id):
+    """Update a question; changing the correct option or points regrades past attempts"""
+    try:
+        if not check_admin():
+            return jsonify({'message': 'Admin access required'}), 403
+        
+        data = request.get_json() or {}
+        fields = {k: v for k, v in data.items() if k in Question.UPDATABLE_FIELDS}
+        
+        if not fields:
+            return jsonify({'message': 'No updatable fields provided'}), 400
+        
+        if 'correct_option' in fields and fields['correct_option'] not in ['A', 'B', 'C', 'D']:
+            return jsonify({'message': 'Correct option must be A, B, C, or D'}), 400
+        
+        if 'points' in fields:
+            # Compared with the stored int to decide whether a regrade is needed
+            try:
+                fields['points'] = question_io.parse_points(fields['points'], default=None)
+            except question_io.RowError as e:
+                return jsonify({'message': str(e)}), 400
+        
+        updated = Question.update(question_id, fields)
+        if updated is None:
+            return jsonify({'message': 'Question not found or update failed'}), 404
+        
+        quiz_id, scoring_changed = updated
+        if scoring_changed:
+            # Only once the new answer key is committed
+            after_commit(lambda: start_regrade(quiz_id))
+        
+        return jsonify({
+            'message': 'Question updated successfully',
+            'regrade_started': scoring_changed
+        }), 200
+    except Exception as e:
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+@admin_bp.route('/quizzes/<int:quiz_id>/regrade', methods=['POST'])
+def regrade_quiz(quiz_id):
+    """Rescore all completed attempts of a quiz in the background"""
+    try:
+        if not check_admin():
+            return jsonify({'message': 'Admin access required'}), 403
+        
+        job = start_regrade(quiz_id)
+        return jsonify({'message': 'Regrade started', 'job': job.to_dict()}), 202
+    except Exception as e:
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+@admin_bp.route('/regrade/<int:job_id>', methods=['GET'])
+def get_regrade_job(job_id):
+    """Progress of a regrade job"""
+    try:
+        if not check_admin():
+            return jsonify({'message': 'Admin access required'}), 403
+        
+        job = get_job(job_id)
+        if job is None:
+            return jsonify({'message': 'Regrade job not found'}), 404
+        return jsonify({'job': job}), 200
+    except Exception as e:
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
 @admin_bp.route('/questions/<int:question_id>', methods=['DELETE'])
 def delete_question(question_id):
     """Delete a question"""
@@ -117,6 +195,21 @@ def create_category():
     except Exception as e:
         return jsonify({'message': f'Error: {str(e)}'}), 500
 
+@admin_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """Dashboard totals (quizzes, questions, categories, attempts, average score,
+    active takers) and the recent quizzes with their counts, in one call."""
+    try:
+        if not check_admin():
+            return jsonify({'message': 'Admin access required'}), 403
+
+        stats = Stats.get_dashboard()
+        if stats is None:
+            return jsonify({'message': 'Failed to load stats'}), 500
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
 @admin_bp.route('/quizzes/<int:quiz_id>/questions', methods=['GET'])
 def get_quiz_questions_admin(quiz_id):
     """Get all questions for a quiz (including correct answers)"""
@@ -124,7 +217,88 @@ def get_quiz_questions_admin(quiz_id):
         if not check_admin():
             return jsonify({'message': 'Admin access required'}), 403
         
-        questions = Question.get_by_quiz(quiz_id)
+        # The cached question set exposes the answer as correct_answer; admin pages read correct_option
+        questions = [
+            {**q, 'correct_option': q['correct_answer']}
+            for q in Question.get_questions_by_quiz(quiz_id) or []
+        ]
         return jsonify({'questions': questions}), 200
     except Exception as e:
-        return jsonify({'message': f'Error: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+@admin_bp.route('/quizzes/<int:quiz_id>/questions/import', methods=['POST'])
+def import_questions(quiz_id):
+    """
+    Bulk-import questions from a CSV or JSON Lines request body
+    (Content-Type text/csv or application/x-ndjson, or ?format=csv|jsonl).
+    The body is parsed as it streams in; valid rows are inserted in batched
+    transactions of IMPORT_BATCH_SIZE, invalid rows are skipped and reported.
+    """
+    try:
+        if not check_admin():
+            return jsonify({'message': 'Admin access required'}), 403
+        
+        fmt = question_io.detect_format(request.content_type, request.args.get('format'))
+        if fmt is None:
+            return jsonify({'message': 'Send text/csv or application/x-ndjson (or ?format=csv|jsonl)'}), 415
+        
+        if not Quiz.get_quiz_by_id(quiz_id):
+            return jsonify({'message': 'Quiz not found'}), 404
+        
+        imported = 0
+        errors = []
+        error_count = 0
+        batch = []
+        
+        def flush():
+            # Each batch commits on its own, independent of the request transaction
+            with db_session():
+                inserted = Question.create_many(quiz_id, batch)
+            if inserted is None:
+                raise RuntimeError(f'Database error after importing {imported} questions')
+            batch.clear()
+            return inserted
+        
+        for line_no, row in question_io.iter_rows(request.stream, fmt):
+            try:
+                if isinstance(row, question_io.RowError):
+                    raise row
+                batch.append(question_io.validate_row(row))
+            except question_io.RowError as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'line': line_no, 'message': str(e)})
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += flush()
+        
+        if batch:
+            imported += flush()
+        
+        return jsonify({
+            'message': 'Import finished',
+            'imported': imported,
+            'error_count': error_count,
+            'errors': errors
+        }), 200
+    except Exception as e:
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+@admin_bp.route('/quizzes/<int:quiz_id>/questions/export', methods=['GET'])
+def export_questions(quiz_id):
+    """Stream all questions of a quiz as CSV (default) or JSON Lines (?format=jsonl)"""
+    try:
+        if not check_admin():
+            return jsonify({'message': 'Admin access required'}), 403
+        
+        fmt = request.args.get('format', 'csv')
+        if fmt not in question_io.FORMATS:
+            return jsonify({'message': 'Format must be csv or jsonl'}), 400
+        
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        body = question_io.export_lines(Question.iter_by_quiz(quiz_id), fmt)
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=quiz_{quiz_id}_questions.{fmt}'
+        return response
+    except Exception as e:
+        return jsonify({'message': f'Error: {str(e)}'}), 500
@@ -1,11 +1,18 @@
 from flask import Blueprint, request, jsonify, session
-from models import User
-from datetime import datetime, timedelta
-import jwt
-from config import Config
+from models import User, release_connection
+from utils.hashing import hasher, HasherBusy
+from utils.auth import current_identity, issue_claims, issue_token, revoke, AuthError
 
 auth_bp = Blueprint('auth', __name__)
 
+def _busy_response():
+    """Password hashing is saturated (login storm): ask the client to retry shortly."""
+    response = jsonify({'message': 'Too many logins in progress, please retry in a moment'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '2'
+    return response
+
+
 # ---------------------- REGISTER ---------------------- #
 # FIXED → removed /api
 @auth_bp.route('/register', methods=['POST'])
@@ -34,10 +41,14 @@ def register():
         if existing:
             return jsonify({'message': 'Email already registered'}), 400
 
+        # Do not hold a pooled connection while the password is hashed
+        release_connection()
         user_id = User.create(username, email, password, role)
 
         return jsonify({'message': 'Registration successful', 'user_id': user_id}), 201
 
+    except HasherBusy:
+        return _busy_response()
     except Exception as e:
         print("❌ Registration Error:", str(e))
         return jsonify({'message': 'Registration failed'}), 500
@@ -57,20 +68,22 @@ def login():
             return jsonify({'message': 'Email and password required'}), 400
 
         user = User.get_by_email(email)
+        # Do not hold a pooled connection while bcrypt runs (or waits for a worker)
+        release_connection()
         if not user or not User.verify_password(user['password'], password):
             return jsonify({'message': 'Invalid email or password'}), 401
 
-        # Create JWT
-        token = jwt.encode({
-            'user_id': user['id'],
-            'role': user['role'],
-            'exp': datetime.utcnow() + timedelta(hours=2)
-        }, Config.JWT_SECRET_KEY, algorithm='HS256')
+        # Transparently upgrade hashes made with an older BCRYPT_LOG_ROUNDS
+        if hasher.needs_rehash(user['password']):
+            User.rehash_password(user['id'], password)
+
+        # Same claims in the JWT and the session (no token without JWT_SECRET_KEY)
+        claims = issue_claims(user)
+        token = issue_token(claims)
 
         # Save session
-        session['user_id'] = user['id']
-        session['username'] = user['username']
-        session['role'] = user['role']
+        session.clear()
+        session.update(claims)
 
         return jsonify({
             'message': 'Login successful',
@@ -83,6 +96,8 @@ def login():
             }
         }), 200
 
+    except HasherBusy:
+        return _busy_response()
     except Exception as e:
         print("❌ Login Error:", str(e))
         return jsonify({'message': 'Login failed'}), 500
@@ -92,12 +107,19 @@ def login():
 # FIXED → removed /api
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
+    revoked = True
     try:
-        session.clear()
-        return jsonify({'message': 'Logout successful'}), 200
+        revoke(current_identity())
+    except AuthError:
+        pass
     except Exception as e:
         print("❌ Logout Error:", str(e))
-        return jsonify({'message': 'Logout failed'}), 500
+        revoked = False
+    # The session cookie is dropped even when the revocation could not be stored
+    session.clear()
+    if not revoked:
+        return jsonify({'message': 'Logged out of this session, but the token could not be revoked'}), 500
+    return jsonify({'message': 'Logout successful'}), 200
 
 
 # ---------------------- CURRENT USER ---------------------- #
@@ -105,21 +127,20 @@ def logout():
 @auth_bp.route('/me', methods=['GET'])
 def get_current_user():
     try:
-        if 'user_id' not in session:
+        try:
+            identity = current_identity()
+        except AuthError:
+            identity = None
+        if not identity:
             return jsonify({'message': 'Not authenticated'}), 401
 
-        user = User.get_by_id(session['user_id'])
-
-        if not user:
-            session.clear()
-            return jsonify({'message': 'User not found'}), 404
-
+        # current_identity() already carries the cached profile of the user
         return jsonify({
             'user': {
-                'id': user['id'],
-                'username': user['username'],
-                'email': user['email'],
-                'role': user['role']
+                'id': identity['user_id'],
+                'username': identity['username'],
+                'email': identity['email'],
+                'role': identity['role']
             }
         }), 200
 
@@ -1,17 +1,46 @@
 # backend/routes/quiz.py
-from flask import Blueprint, request, jsonify, session
-from models import Quiz, Question, Attempt
+import os
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from models import Quiz, Question, Attempt, after_commit, after_rollback, cached, leaderboard_cache, unstored_answers
 from utils.decorators import login_required
+from utils.ranking import encode_cursor, decode_cursor
+from scoring import get_answer_key, score_submission
+from attempt_sessions import sessions, stored_answers
+from utils.answer_codec import OPTION_CODES
+from utils.rendered import RenderedJSON, rendered_response
+from utils.http_cache import CachePolicy, http_cache
+from utils.search import boolean_query
+from utils.auth import current_identity, current_user_id, AuthError
+import write_behind
 
 quiz_bp = Blueprint('quiz', __name__)
 
+# HTTP caching of the public reads (also honoured by a CDN in front of /api).
+# Quiz data is versioned by table, so revalidation is a 304 without a query;
+# the leaderboard is tagged by the content of its short-lived cached body.
+QUIZ_HTTP_CACHE = CachePolicy(
+    tables=('quizzes', 'categories'),
+    max_age=int(os.getenv('QUIZ_HTTP_MAX_AGE', 5)),
+    stale_while_revalidate=int(os.getenv('QUIZ_HTTP_SWR', 60))
+)
+LEADERBOARD_HTTP_CACHE = CachePolicy(
+    max_age=int(os.getenv('LEADERBOARD_HTTP_MAX_AGE', 5)),
+    stale_while_revalidate=int(os.getenv('LEADERBOARD_HTTP_SWR', 30))
+)
+
 # -------------------------
 # GET /api/quizzes
 # -------------------------
 @quiz_bp.route('/quizzes', methods=['GET'])
+@http_cache(QUIZ_HTTP_CACHE)
 def get_quizzes():
-    """Return list of quizzes (public)."""
+    """Return list of quizzes (public).
+       With any of ?limit=&after=&category=&q=&fields=summary one keyset-paginated
+       page is returned as { "quizzes": [...], "next": cursor|null }."""
     try:
+        if any(name in request.args for name in CATALOGUE_PARAMS):
+            return _catalogue_page_response()
         quizzes = Quiz.get_all_quizzes() or []
         # Return exactly: { "quizzes": [...] }
         return jsonify({'quizzes': quizzes}), 200
@@ -20,10 +49,55 @@ def get_quizzes():
         return jsonify({'message': f'Error: {str(e)}'}), 500
 
 
+CATALOGUE_PARAMS = ('limit', 'after', 'category', 'q', 'fields')
+
+
+def parse_catalogue_args(args):
+    """Validate catalogue query args; returns get_page() kwargs or raises ValueError."""
+    fields = args.get('fields', 'full')
+    if fields not in Quiz.CATALOGUE_COLUMNS:
+        raise ValueError('fields must be full or summary')
+    category = args.get('category')
+    query = None
+    if args.get('q'):
+        query = boolean_query(args['q'])
+        if query is None:
+            raise ValueError('search terms must be at least 3 characters')
+    return {
+        'after': decode_catalogue_cursor(args.get('after')),
+        'limit': min(max(int(args.get('limit', 20)), 1), 100),
+        'category_id': int(category) if category else None,
+        'q': query,
+        'fields': fields,
+    }
+
+
+def encode_catalogue_cursor(key):
+    return None if key is None else f'{key[0].isoformat()},{key[1]}'
+
+
+def decode_catalogue_cursor(value):
+    if not value:
+        return None
+    created_at, _, quiz_id = value.rpartition(',')
+    return datetime.fromisoformat(created_at), int(quiz_id)
+
+
+def _catalogue_page_response():
+    try:
+        kwargs = parse_catalogue_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': f'Invalid catalogue query: {e}'}), 400
+
+    quizzes, next_key = Quiz.get_page(**kwargs)
+    return jsonify({'quizzes': quizzes, 'next': encode_catalogue_cursor(next_key)}), 200
+
+
 # -------------------------
 # GET /api/quizzes/<id>
 # -------------------------
 @quiz_bp.route('/quizzes/<int:quiz_id>', methods=['GET'])
+@http_cache(QUIZ_HTTP_CACHE)
 def get_quiz(quiz_id):
     """Return quiz details (public)."""
     try:
@@ -42,36 +116,29 @@ def get_quiz(quiz_id):
 @quiz_bp.route('/quizzes/<int:quiz_id>/questions', methods=['GET'])
 @login_required
 def get_quiz_questions(quiz_id):
-    """Return questions for a quiz (protected). Correct answers are included in DB but will be returned as 'correct_answer'
-       (your frontend must not show them)."""
+    """Return questions for a quiz (protected), without the correct answers.
+       The body is rendered once per question set and revalidated with its ETag."""
     try:
         quiz = Quiz.get_quiz_by_id(quiz_id)
         if not quiz:
             return jsonify({'message': 'Quiz not found'}), 404
 
-        questions = Question.get_questions_by_quiz(quiz_id) or []
-        # Build safe response (frontend code expects these keys)
-        safe_questions = []
-        for q in questions:
-            safe_questions.append({
-                'id': q.get('id'),
-                'question_text': q.get('question_text'),
-                'option_a': q.get('option_a'),
-                'option_b': q.get('option_b'),
-                'option_c': q.get('option_c'),
-                'option_d': q.get('option_d'),
-                'points': q.get('points'),
-                # NOTE: correct_answer exists in DB rows (correct_answer or correct_option),
-                # but frontend should NOT display it. We still include it if you later need it for admin routes.
-                'correct_answer': q.get('correct_answer')
-            })
-
-        return jsonify({'questions': safe_questions}), 200
+        rendered = cached(f'questions_payload:{quiz_id}', lambda: render_questions(
+            Question.get_questions_by_quiz(quiz_id) or []
+        ))
+        return rendered_response(rendered)
     except Exception as e:
         print(f"[quiz.get_quiz_questions] Error: {e}")
         return jsonify({'message': f'Error: {str(e)}'}), 500
 
 
+def render_questions(questions):
+    """Serialize a question set once, keeping only Question.PUBLIC_FIELDS."""
+    return RenderedJSON({'questions': [
+        {name: q.get(name) for name in Question.PUBLIC_FIELDS} for q in questions
+    ]})
+
+
 # -------------------------
 # POST /api/quizzes/<id>/start
 # -------------------------
@@ -80,7 +147,7 @@ def get_quiz_questions(quiz_id):
 def start_quiz(quiz_id):
     """Create an attempt record and return attempt_id (protected)."""
     try:
-        user_id = session.get('user_id')
+        user_id = current_user_id()
         if not user_id:
             return jsonify({'message': 'Please log in to take quiz'}), 401
 
@@ -88,9 +155,10 @@ def start_quiz(quiz_id):
         if not quiz:
             return jsonify({'message': 'Quiz not found'}), 404
 
-        attempt_id = Attempt.create_attempt(user_id, quiz_id)
+        attempt_id = write_behind.create_attempt(user_id, quiz_id)
         if attempt_id is None:
             return jsonify({'message': 'Failed to start attempt'}), 500
+        sessions.register(attempt_id, user_id, quiz_id)
 
         return jsonify({'message': 'Quiz started', 'attempt_id': attempt_id}), 201
     except Exception as e:
@@ -106,7 +174,7 @@ def start_quiz(quiz_id):
 def submit_quiz(quiz_id):
     """Submit answers for an attempt. Expects JSON: { attempt_id: int, answers: { question_id: selected_option } }"""
     try:
-        user_id = session.get('user_id')
+        user_id = current_user_id()
         if not user_id:
             return jsonify({'message': 'Please log in'}), 401
 
@@ -117,34 +185,36 @@ def submit_quiz(quiz_id):
         if not attempt_id:
             return jsonify({'message': 'attempt_id is required'}), 400
 
-        questions = Question.get_questions_by_quiz(quiz_id) or []
-        score = 0
-        total_questions = len(questions)
-        results = []
-
-        for question in questions:
-            qid = question.get('id')
-            qid_str = str(qid)
-            selected_option = answers.get(qid_str) or answers.get(qid)  # accept either key type
-            correct_option = question.get('correct_answer')  # models returns this column
-            is_correct = (selected_option == correct_option)
-            points_awarded = question.get('points') if is_correct else 0
-            if is_correct:
-                # Depending on your scoring logic you might sum points or count corrects; here we add points.
-                score += points_awarded
-
-            results.append({
-                'question_id': qid,
-                'selected_option': selected_option,
-                'correct_option': correct_option,
-                'is_correct': is_correct,
-                'points_awarded': points_awarded
-            })
-
-        # Save completion info
-        ok = Attempt.complete_attempt(attempt_id, score, total_questions)
+        owner = sessions.owner(attempt_id)
+        if owner is not None and owner[0] != user_id:
+            return jsonify({'message': 'Attempt not found'}), 404
+
+        # Final answers = autosaved (stored + still buffered) overridden by the submitted ones.
+        # Buffered first: take() waits for a flush of this attempt in progress here, and
+        # stored_answers() locks the attempt row, waiting for one on another worker.
+        # Taken answers go back into the buffer unless the completion commits (the
+        # callback is registered before take() and reads `buffered` when it runs).
+        submitted = {int(qid) if str(qid).isdigit() else qid: option for qid, option in answers.items()}
+        buffered = {}
+        after_rollback(lambda: sessions.restore(attempt_id, buffered))
+        buffered = sessions.take(attempt_id)
+        stored = stored_answers(attempt_id)
+        answers = {**stored, **buffered, **submitted}
+
+        key = get_answer_key(quiz_id)
+        scored = score_submission(key, answers)
+        score = scored.score
+        total_questions = len(key)
+        results = scored.results()
+
+        # Save completion info and the answers not stored yet (same transaction)
+        ok = write_behind.complete_attempt(
+            attempt_id, score, total_questions,
+            unstored_answers(zip(key.question_ids, scored.options()), stored)
+        )
         if not ok:
             return jsonify({'message': 'Failed to save attempt result'}), 500
+        after_commit(lambda: sessions.finish(attempt_id))
 
         return jsonify({
             'message': 'Quiz submitted successfully',
@@ -157,6 +227,41 @@ def submit_quiz(quiz_id):
         return jsonify({'message': f'Error: {str(e)}'}), 500
 
 
+# -------------------------
+# PATCH /api/attempts/<id>/answers
+# -------------------------
+@quiz_bp.route('/attempts/<int:attempt_id>/answers', methods=['PATCH'])
+@login_required
+def autosave_answers(attempt_id):
+    """Autosave answers of an attempt in progress. Expects JSON: { answers: { question_id: option|null } }.
+       Answers are buffered and written behind in batches; submit picks them up."""
+    try:
+        user_id = current_user_id()
+        data = request.get_json() or {}
+        answers = data.get('answers')
+        if not isinstance(answers, dict):
+            return jsonify({'message': 'answers must be an object'}), 400
+
+        owner = sessions.owner(attempt_id)
+        if owner is None or owner[0] != user_id:
+            return jsonify({'message': 'Attempt not found or already submitted'}), 404
+
+        key = get_answer_key(owner[1])
+        accepted = {}
+        for qid, option in answers.items():
+            if option is not None and option not in OPTION_CODES:
+                return jsonify({'message': 'Options must be A, B, C, D or null'}), 400
+            position = key.positions.get(qid)
+            if position is not None:
+                accepted[key.question_ids[position]] = option
+
+        sessions.record(attempt_id, accepted)
+        return jsonify({'message': 'Answers saved', 'saved': len(accepted)}), 202
+    except Exception as e:
+        print(f"[quiz.autosave_answers] Error: {e}")
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+
 # -------------------------
 # GET /api/my-attempts
 # -------------------------
@@ -165,7 +270,7 @@ def submit_quiz(quiz_id):
 def get_my_attempts():
     """Return completed attempts for the logged-in user."""
     try:
-        user_id = session.get('user_id')
+        user_id = current_user_id()
         if not user_id:
             return jsonify({'message': 'Please log in'}), 401
 
@@ -180,11 +285,109 @@ def get_my_attempts():
 # GET /api/leaderboard
 # -------------------------
 @quiz_bp.route('/leaderboard', methods=['GET'])
+@http_cache(LEADERBOARD_HTTP_CACHE)
 def get_leaderboard():
-    """Return leaderboard (public)."""
+    """Return leaderboard (public), rendered once per leaderboard cache period."""
     try:
-        leaderboard = Attempt.get_leaderboard() or []
-        return jsonify({'leaderboard': leaderboard}), 200
+        rendered = cached('global:rendered', lambda: RenderedJSON(
+            {'leaderboard': Attempt._fetch_leaderboard() or []}
+        ), cache=leaderboard_cache)
+        return rendered_response(rendered)
     except Exception as e:
         print(f"[quiz.get_leaderboard] Error: {e}")
         return jsonify({'message': f'Error: {str(e)}'}), 500
+
+
+# -------------------------
+# Ranked boards: /api/quizzes/<id>/leaderboard, /api/categories/<id>/leaderboard
+# Query: ?limit=<1..100>&after=<cursor from previous page's "next">
+# -------------------------
+def _board_page_response(board_name):
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        after = decode_cursor(request.args.get('after'))
+    except (ValueError, IndexError):
+        return jsonify({'message': 'Invalid pagination cursor'}), 400
+
+    entries, next_cursor = Attempt.get_board_page(board_name, after, limit)
+    return jsonify({'leaderboard': entries, 'next': encode_cursor(next_cursor)}), 200
+
+
+@quiz_bp.route('/quizzes/<int:quiz_id>/leaderboard', methods=['GET'])
+def get_quiz_leaderboard(quiz_id):
+    """Return a quiz's leaderboard ranked by best score (public, paginated)."""
+    try:
+        return _board_page_response(f'quiz:{quiz_id}')
+    except Exception as e:
+        print(f"[quiz.get_quiz_leaderboard] Error: {e}")
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+
+@quiz_bp.route('/categories/<int:category_id>/leaderboard', methods=['GET'])
+def get_category_leaderboard(category_id):
+    """Return a category's leaderboard ranked by the sum of best quiz scores (public, paginated)."""
+    try:
+        return _board_page_response(f'category:{category_id}')
+    except Exception as e:
+        print(f"[quiz.get_category_leaderboard] Error: {e}")
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+
+# -------------------------
+# GET /api/leaderboard/me[?quiz_id=|?category_id=]
+# -------------------------
+@quiz_bp.route('/leaderboard/me', methods=['GET'])
+@login_required
+def get_my_rank():
+    """Return the logged-in user's rank on the global, a quiz or a category board."""
+    try:
+        user_id = current_user_id()
+        quiz_id = request.args.get('quiz_id', type=int)
+        category_id = request.args.get('category_id', type=int)
+        if quiz_id:
+            board_name = f'quiz:{quiz_id}'
+        elif category_id:
+            board_name = f'category:{category_id}'
+        else:
+            board_name = 'global'
+
+        entry, total = Attempt.get_board_rank(board_name, user_id)
+        return jsonify({'rank': entry, 'total_ranked': total}), 200
+    except Exception as e:
+        print(f"[quiz.get_my_rank] Error: {e}")
+        return jsonify({'message': f'Error: {str(e)}'}), 500
+
+
+# -------------------------
+# GET /api/search?q=<text>[&type=quizzes|questions|all][&limit=<1..50>]
+# -------------------------
+@quiz_bp.route('/search', methods=['GET'])
+def search():
+    """Ranked full-text search with prefix matching. Quizzes are public;
+       question text is only searched for admins."""
+    try:
+        text = request.args.get('q', '')
+        if boolean_query(text) is None:
+            return jsonify({'message': 'Search terms must be at least 3 characters'}), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+
+        try:
+            identity = current_identity()
+        except AuthError:
+            identity = None
+        is_admin = bool(identity) and identity['role'] == 'admin'
+        kind = request.args.get('type', 'all' if is_admin else 'quizzes')
+        if kind not in ('quizzes', 'questions', 'all'):
+            return jsonify({'message': 'type must be quizzes, questions or all'}), 400
+        if kind != 'quizzes' and not is_admin:
+            return jsonify({'message': 'Admin access required'}), 403
+
+        results = {'query': text}
+        if kind in ('quizzes', 'all'):
+            results['quizzes'] = Quiz.search(text, limit)
+        if kind in ('questions', 'all'):
+            results['questions'] = Question.search(text, limit)
+        return jsonify(results), 200
+    except Exception as e:
+        print(f"[quiz.search] Error: {e}")
+        return jsonify({'message': f'Error: {str(e)}'}), 500
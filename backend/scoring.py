@@ -0,0 +1,148 @@
+# scoring.py
+from array import array
+from itertools import compress
+from operator import eq
+
+from models import Question, cached
+from utils.answer_codec import OPTION_CODES, CODE_OPTIONS
+
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up score_many()
+    np = None
+
+# Stored for a question whose correct option is unusable: never matches an answer
+NO_KEY = 0xFF
+
+
+class AnswerKey:
+    """
+    Compact, precompiled answer key for one quiz: question ids in display
+    order, the correct option of each as one byte, and an int array of points.
+    Picklable, so it can live in any cache backend.
+    """
+
+    __slots__ = ('quiz_id', 'question_ids', 'positions', 'correct', 'points', 'total_points')
+
+    def __init__(self, quiz_id, question_ids, correct, points):
+        self.quiz_id = quiz_id
+        self.question_ids = tuple(question_ids)
+        # Answers arrive as JSON objects, so ids are usually strings; accept both.
+        self.positions = {}
+        for i, qid in enumerate(self.question_ids):
+            self.positions[qid] = i
+            self.positions[str(qid)] = i
+        self.correct = bytes(correct)
+        self.points = array('i', points)
+        self.total_points = sum(self.points)
+
+    def __getstate__(self):
+        return (self.quiz_id, self.question_ids, self.correct, self.points)
+
+    def __setstate__(self, state):
+        quiz_id, question_ids, correct, points = state
+        self.__init__(quiz_id, question_ids, correct, points)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    @classmethod
+    def from_questions(cls, quiz_id, questions):
+        return cls(
+            quiz_id,
+            [q['id'] for q in questions],
+            [OPTION_CODES.get(q.get('correct_answer'), NO_KEY) for q in questions],
+            [q.get('points') or 0 for q in questions],
+        )
+
+    def encode(self, answers):
+        """Turn {question_id: option} into a byte string aligned with question_ids."""
+        selected = bytearray(len(self.question_ids))
+        positions = self.positions
+        for qid, option in answers.items():
+            i = positions.get(qid)
+            if i is not None:
+                selected[i] = OPTION_CODES.get(option, 0)
+        return bytes(selected)
+
+
+class ScoredSubmission:
+    """Outcome of scoring one submission against an AnswerKey."""
+
+    __slots__ = ('key', 'selected', 'raw', 'correct_mask', 'score')
+
+    def __init__(self, key, selected, raw, correct_mask, score):
+        self.key = key
+        self.selected = selected
+        self.raw = raw
+        self.correct_mask = correct_mask
+        self.score = score
+
+    def options(self):
+        """Selected option per question ('A'..'D' or None), aligned with key.question_ids."""
+        return [CODE_OPTIONS.get(code) for code in self.selected]
+
+    def results(self):
+        """Per-question breakdown in the shape submit_quiz has always returned."""
+        key = self.key
+        return [
+            {
+                'question_id': qid,
+                'selected_option': raw,
+                'correct_option': CODE_OPTIONS.get(correct),
+                'is_correct': is_correct,
+                'points_awarded': points if is_correct else 0,
+            }
+            for qid, raw, correct, is_correct, points
+            in zip(key.question_ids, self.raw, key.correct, self.correct_mask, key.points)
+        ]
+
+
+def get_answer_key(quiz_id):
+    """Return the cached AnswerKey for a quiz (invalidated with its question set)."""
+    return cached(
+        f'answer_key:{quiz_id}',
+        lambda: AnswerKey.from_questions(quiz_id, Question.get_questions_by_quiz(quiz_id) or [])
+    )
+
+
+def score_submission(key, answers):
+    """
+    Score one {question_id: option} submission in a single pass: the selected
+    options are packed into a byte string aligned with the key, compared
+    bytewise with the correct options and the matching points summed.
+    """
+    selected = key.encode(answers)
+    correct_mask = list(map(eq, selected, key.correct))
+    score = sum(compress(key.points, correct_mask))
+    positions = key.positions
+    raw = [None] * len(key)
+    for qid, option in answers.items():
+        i = positions.get(qid)
+        if i is not None and raw[i] is None:
+            raw[i] = option
+    return ScoredSubmission(key, selected, raw, correct_mask, score)
+
+
+def score_many(key, submissions):
+    """
+    Bulk scoring for regrades: `submissions` is an iterable of answer dicts or
+    already-encoded byte strings (see AnswerKey.encode). Returns a list of
+    scores. Uses one matrix comparison when numpy is available.
+    """
+    encoded = [s if isinstance(s, (bytes, bytearray)) else key.encode(s) for s in submissions]
+    if not encoded:
+        return []
+
+    if np is not None and len(key):
+        matrix = np.frombuffer(b''.join(encoded), dtype=np.uint8).reshape(len(encoded), len(key))
+        correct = np.frombuffer(key.correct, dtype=np.uint8)
+        hits = matrix == correct
+        return (hits @ np.asarray(key.points, dtype=np.int64)).tolist()
+
+    points = key.points
+    correct = key.correct
+    return [
+        sum(compress(points, map(eq, selected, correct)))
+        for selected in encoded
+    ]
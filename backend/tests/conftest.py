@@ -0,0 +1,102 @@
+# tests/conftest.py
+#
+# The suite runs on the embedded SQLite backend, from backend/:
+#
+#   python -m pytest
+#
+# Configuration is read when the modules are imported, so the environment
+# is set here, before any test imports models or the app.
+import os
+import tempfile
+import uuid
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix='quiz_app_tests_')
+os.environ.update({
+    'DB_BACKEND': 'sqlite',
+    'SQLITE_PATH': os.path.join(WORKDIR, 'quiz_app.db'),
+    'CACHE_BACKEND': 'memory',
+    'BCRYPT_LOG_ROUNDS': '4',
+    'PASSWORD_HASH_EXECUTOR': 'thread',
+    'JWT_SECRET_KEY': uuid.uuid4().hex,
+    'WRITE_BEHIND': '0',
+    'WRITE_BEHIND_SPILL_FILE': os.path.join(WORKDIR, 'spill.jsonl'),
+    'AUTOSAVE_FLUSH_INTERVAL': '3600',
+    'METRICS_ENABLED': '0',
+    'QUERY_PROFILER': '0',
+    'REQUEST_PROFILER': '0',
+})
+
+import models  # noqa: E402  (after the environment above)
+from app import app as flask_app  # noqa: E402
+
+ADMIN_ID = 1   # sample admin from schema_sqlite.sql
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def sql():
+    """Run one statement in its own transaction; returns the fetched rows (tuples)."""
+    def run(statement, params=()):
+        with models.db_session():
+            conn = models.get_db_connection()
+            cur = conn.cursor()
+            cur.execute(statement, params)
+            rows = cur.fetchall() if cur.description else []
+            conn.commit()
+            return rows
+    return run
+
+
+@pytest.fixture
+def make_quiz():
+    """Create an active quiz whose questions have the given correct options (10 points each)."""
+    def create(correct='ABC', title='Test quiz'):
+        with models.db_session():
+            quiz_id = models.Quiz.create(title, 'Created by the test suite', None, 30, ADMIN_ID)
+            models.Question.create_many(quiz_id, [
+                (f'Question {n}', 'a', 'b', 'c', 'd', option, 10) for n, option in enumerate(correct, 1)
+            ])
+        with models.db_session():
+            questions = models.Question._fetch_questions(quiz_id)
+        return quiz_id, [q['id'] for q in questions]
+    return create
+
+
+def _logged_in_client(app, role='user'):
+    client = app.test_client()
+    email = f'{uuid.uuid4().hex[:12]}@example.com'
+    response = client.post('/api/auth/register', json={'username': 'tester', 'email': email, 'password': 'secret1'})
+    assert response.status_code == 201
+    if role != 'user':
+        with models.db_session():
+            conn = models.get_db_connection()
+            conn.cursor().execute("UPDATE users SET role = %s WHERE email = %s", (role, email))
+            conn.commit()
+    response = client.post('/api/auth/login', json={'email': email, 'password': 'secret1'})
+    assert response.status_code == 200
+    client.user_id = response.get_json()['user']['id']
+    return client
+
+
+@pytest.fixture
+def user_client(app):
+    """A test client logged in as a freshly registered user; `.user_id` holds its id."""
+    return _logged_in_client(app)
+
+
+@pytest.fixture
+def admin_client(app):
+    """Like user_client, for a freshly registered admin."""
+    return _logged_in_client(app, role='admin')
@@ -0,0 +1,48 @@
+# tests/test_answer_codec.py
+import pytest
+
+import models
+from utils.answer_codec import pack_answers, unpack_answers
+
+
+def test_round_trip():
+    answers = [(101, 'A'), (7, 'D'), (4_000_000_000, None), (3, 'C')]
+    assert unpack_answers(pack_answers(answers)) == dict(answers)
+
+
+def test_five_bytes_per_answer():
+    assert len(pack_answers([(n, 'B') for n in range(40)])) == 5 + 5 * 40
+
+
+def test_invalid_options_are_stored_as_unanswered():
+    assert unpack_answers(pack_answers([(1, 'E'), (2, 'a'), (3, '')])) == {1: None, 2: None, 3: None}
+
+
+def test_empty():
+    assert unpack_answers(pack_answers([])) == {}
+
+
+def test_unknown_version():
+    blob = bytearray(pack_answers([(1, 'A')]))
+    blob[0] = 99
+    with pytest.raises(ValueError):
+        unpack_answers(bytes(blob))
+
+
+@pytest.mark.parametrize('storage', ['rows', 'packed'])
+def test_submitted_answers_are_stored_in_chunks(user_client, make_quiz, sql, monkeypatch, storage):
+    monkeypatch.setattr(models, 'ANSWER_STORAGE', storage)
+    monkeypatch.setattr(models, 'ANSWER_INSERT_CHUNK', 2)
+    quiz_id, question_ids = make_quiz('ABCDA')
+    attempt_id = user_client.post(f'/api/quizzes/{quiz_id}/start').get_json()['attempt_id']
+    answers = {str(question_ids[0]): 'A', str(question_ids[2]): 'D', str(question_ids[4]): 'A'}
+    response = user_client.post(f'/api/quizzes/{quiz_id}/submit', json={'attempt_id': attempt_id, 'answers': answers})
+    assert response.get_json()['score'] == 20
+
+    with models.db_session():
+        stored = models.Attempt.get_answers_for([attempt_id])[attempt_id]
+    assert stored == {question_ids[0]: 'A', question_ids[1]: None, question_ids[2]: 'D',
+                      question_ids[3]: None, question_ids[4]: 'A'}
+    rows = sql("SELECT COUNT(*) FROM attempt_answers WHERE attempt_id = %s", (attempt_id,))
+    blobs = sql("SELECT COUNT(*) FROM attempt_answer_blobs WHERE attempt_id = %s", (attempt_id,))
+    assert (rows, blobs) == (([(5,)], [(0,)]) if storage == 'rows' else ([(0,)], [(1,)]))
@@ -0,0 +1,84 @@
+# tests/test_attempt_sessions.py
+import pytest
+
+import models
+import write_behind
+from attempt_sessions import sessions
+from utils.storage import SQLiteConnection
+
+
+@pytest.fixture
+def attempt(user_client, make_quiz):
+    """(client, quiz_id, question_ids, attempt_id) of a started attempt on a three-question quiz."""
+    quiz_id, question_ids = make_quiz('ABC')
+    attempt_id = user_client.post(f'/api/quizzes/{quiz_id}/start').get_json()['attempt_id']
+    return user_client, quiz_id, question_ids, attempt_id
+
+
+def autosave(client, attempt_id, answers):
+    response = client.patch(f'/api/attempts/{attempt_id}/answers',
+                            json={'answers': {str(qid): option for qid, option in answers.items()}})
+    assert response.status_code == 202
+
+
+def submit(client, quiz_id, attempt_id, answers=None):
+    return client.post(f'/api/quizzes/{quiz_id}/submit', json={'attempt_id': attempt_id, 'answers': answers or {}})
+
+
+def stored(attempt_id):
+    with models.db_session():
+        return models.Attempt.get_answers_for([attempt_id]).get(attempt_id, {})
+
+
+def test_autosaved_answers_are_kept_on_submit(attempt):
+    client, quiz_id, question_ids, attempt_id = attempt
+    autosave(client, attempt_id, {question_ids[0]: 'A'})
+    sessions.flush()
+    assert stored(attempt_id) == {question_ids[0]: 'A'}
+    autosave(client, attempt_id, {question_ids[1]: 'B'})      # still buffered
+
+    response = submit(client, quiz_id, attempt_id, {str(question_ids[2]): 'D'})
+    assert response.get_json()['score'] == 20
+    assert stored(attempt_id) == {question_ids[0]: 'A', question_ids[1]: 'B', question_ids[2]: 'D'}
+    # Finished: nothing left buffered, and further autosaves are refused
+    assert attempt_id not in sessions._pending
+    assert client.patch(f'/api/attempts/{attempt_id}/answers', json={'answers': {}}).status_code == 404
+
+
+def test_failed_completion_keeps_buffered_answers(attempt, monkeypatch):
+    client, quiz_id, question_ids, attempt_id = attempt
+    autosave(client, attempt_id, {question_ids[0]: 'A', question_ids[1]: 'B'})
+
+    monkeypatch.setattr(write_behind, 'complete_attempt', lambda *args: False)
+    assert submit(client, quiz_id, attempt_id).status_code == 500
+    assert sessions._pending[attempt_id] == {question_ids[0]: 'A', question_ids[1]: 'B'}
+
+    def broken(*args):
+        raise RuntimeError('database unavailable')
+    monkeypatch.setattr(write_behind, 'complete_attempt', broken)
+    assert submit(client, quiz_id, attempt_id).status_code == 500
+    assert sessions._pending[attempt_id] == {question_ids[0]: 'A', question_ids[1]: 'B'}
+
+    monkeypatch.undo()
+    assert submit(client, quiz_id, attempt_id).get_json()['score'] == 20
+
+
+def test_failed_commit_keeps_buffered_answers(attempt, monkeypatch):
+    client, quiz_id, question_ids, attempt_id = attempt
+    autosave(client, attempt_id, {question_ids[0]: 'A'})
+
+    def commit_fails(self):
+        raise OSError('disk I/O error')
+    monkeypatch.setattr(SQLiteConnection, 'commit', commit_fails)
+    assert submit(client, quiz_id, attempt_id).status_code == 500
+    monkeypatch.undo()
+    assert sessions._pending[attempt_id] == {question_ids[0]: 'A'}
+    assert stored(attempt_id) == {}
+
+    assert submit(client, quiz_id, attempt_id).get_json()['score'] == 10
+
+
+def test_restore_does_not_clobber_newer_autosaves():
+    sessions.record(-1, {1: 'B'})
+    sessions.restore(-1, {1: 'A', 2: 'C'})
+    assert sessions.take(-1) == {1: 'B', 2: 'C'}
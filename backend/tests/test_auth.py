@@ -0,0 +1,92 @@
+# tests/test_auth.py
+import time
+import uuid
+
+import jwt
+
+import models
+from config import Config
+from utils import auth
+
+
+def register(client, password='secret1'):
+    email = f'{uuid.uuid4().hex[:12]}@example.com'
+    assert client.post('/api/auth/register', json={'username': 'tester', 'email': email,
+                                                   'password': password}).status_code == 201
+    return email
+
+
+def login(client, email, password='secret1'):
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_logout_revokes_the_session_and_its_token(app):
+    client = app.test_client()
+    token = login(client, register(client))['token']
+    assert client.get('/api/auth/me').status_code == 200
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 200
+
+    assert client.post('/api/auth/logout').status_code == 200
+    assert client.get('/api/auth/me').status_code == 401
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 401
+
+
+def test_logout_with_a_bearer_token(app):
+    client = app.test_client()
+    token = login(client, register(client))['token']
+    other = app.test_client()
+    assert other.post('/api/auth/logout', headers=bearer(token)).status_code == 200
+    assert other.get('/api/auth/me', headers=bearer(token)).status_code == 401
+
+
+def test_logout_clears_the_session_when_the_revocation_fails(app, monkeypatch):
+    client = app.test_client()
+    login(client, register(client))
+    monkeypatch.setattr(models.Revocation, 'save', staticmethod(lambda *args: False))
+    response = client.post('/api/auth/logout')
+    assert response.status_code == 500
+    monkeypatch.undo()
+    assert client.get('/api/auth/me').status_code == 401
+
+
+def test_revoke_user_invalidates_every_session_and_token(app):
+    first, second = app.test_client(), app.test_client()
+    email = register(first)
+    user_id = login(first, email)['user']['id']
+    token = login(second, email)['token']
+
+    result = app.test_cli_runner().invoke(args=['revoke-user', str(user_id)])
+    assert result.exit_code == 0, result.output
+    assert first.get('/api/auth/me').status_code == 401
+    assert second.get('/api/auth/me', headers=bearer(token)).status_code == 401
+
+
+def test_revocations_are_read_from_the_database(app):
+    """Another worker's logout: stored directly, seen once the lookup cache expires."""
+    client = app.test_client()
+    token = login(client, register(client))['token']
+    claims = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 200
+    with models.db_session():
+        assert models.Revocation.save(f"jti:{claims['jti']}", int(time.time()), int(time.time()) + 60)
+    auth.revocation_lookups.clear()
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 401
+
+
+def test_role_comes_from_the_database_not_the_token(app):
+    client = app.test_client()
+    user = login(client, register(client))['user']
+    forged = jwt.encode({'user_id': user['id'], 'role': 'admin', 'jti': uuid.uuid4().hex,
+                         'iat': int(time.time()), 'exp': int(time.time()) + 60},
+                        Config.JWT_SECRET_KEY, algorithm='HS256')
+    anonymous = app.test_client()
+    assert anonymous.get('/api/auth/me', headers=bearer(forged)).get_json()['user']['role'] == 'user'
+    assert anonymous.get('/api/admin/stats', headers=bearer(forged)).status_code == 403
+    other_key = jwt.encode({'user_id': user['id'], 'iat': int(time.time())}, 'some-other-key', algorithm='HS256')
+    assert anonymous.get('/api/auth/me', headers=bearer(other_key)).status_code == 401
@@ -0,0 +1,77 @@
+# tests/test_cache.py
+import os
+import time
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import CacheBackend, FileCache, TTLCache
+
+
+def test_backend_must_implement_the_interface():
+    class Incomplete(CacheBackend):
+        def get(self, key, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)                      # evicts b, the least recently used
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+    cache.set('short', 'x', ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('short', 'gone') == 'gone'
+
+
+def test_get_or_load_does_not_cache_none():
+    cache = TTLCache()
+    calls = []
+    load = lambda: calls.append(1)
+    assert cache.get_or_load('missing', load) is None
+    assert cache.get_or_load('missing', load) is None
+    assert len(calls) == 2
+    assert cache.get_or_load('found', lambda: {'id': 1}) == {'id': 1}
+    assert cache.get_or_load('found', lambda: pytest.fail('loaded twice')) == {'id': 1}
+
+
+def test_file_cache_is_shared_between_instances(tmp_path):
+    writer = FileCache(str(tmp_path), namespace='content')
+    reader = FileCache(str(tmp_path), namespace='content')
+    writer.set('quiz:1', {'title': 'Shared'})
+    assert reader.get('quiz:1') == {'title': 'Shared'}
+    reader.delete('quiz:1')                # another worker's invalidation
+    assert writer.get('quiz:1') is None
+    writer.set('quiz:2', 'expired', ttl=-1)
+    assert reader.get('quiz:2') is None
+    assert os.listdir(writer.directory) == []
+
+
+def test_file_cache_refuses_a_shared_directory(tmp_path):
+    os.chmod(tmp_path, 0o777)
+    with pytest.raises(RuntimeError):
+        FileCache(str(tmp_path))
+    os.chmod(tmp_path, 0o700)
+    FileCache(str(tmp_path))
+    assert os.stat(tmp_path / 'cache').st_mode & 0o777 == 0o700
+
+
+def test_file_cache_sweep_bounds_the_directory(tmp_path):
+    cache = FileCache(str(tmp_path), maxsize=10)
+    for n in range(35):
+        cache.set(f'key:{n}', n, ttl=60 + n)
+    assert len(os.listdir(cache.directory)) <= 10
+    assert cache.get('key:34') == 34       # the longest-lived entries are kept
+
+
+def test_build_cache_file_backend_needs_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv('CACHE_DIR', raising=False)
+    with pytest.raises(RuntimeError):
+        cache_module._create_cache('file', 'tests', 60, 16)
+    monkeypatch.setenv('CACHE_DIR', str(tmp_path))
+    assert isinstance(cache_module._create_cache('file', 'tests', 60, 16), FileCache)
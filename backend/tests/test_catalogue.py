@@ -0,0 +1,50 @@
+# tests/test_catalogue.py
+import uuid
+
+
+def catalogue(client, **args):
+    return client.get('/api/quizzes', query_string=args)
+
+
+def test_pages_follow_the_cursor_without_gaps_or_repeats(client, make_quiz):
+    word = uuid.uuid4().hex[:10]
+    created = [make_quiz(title=f'Catalogue {word} {n}')[0] for n in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        args = {'q': word, 'limit': 2, 'fields': 'summary'}
+        if cursor:
+            args['after'] = cursor
+        body = catalogue(client, **args).get_json()
+        assert len(body['quizzes']) <= 2
+        seen += [quiz['id'] for quiz in body['quizzes']]
+        cursor = body['next']
+        if cursor is None:
+            break
+
+    # Quizzes created within the same second are ordered by id
+    assert seen == sorted(created, reverse=True)
+
+
+def test_inactive_quizzes_are_left_out(client, make_quiz, sql):
+    word = uuid.uuid4().hex[:10]
+    kept, _ = make_quiz(title=f'Catalogue {word} kept')
+    hidden, _ = make_quiz(title=f'Catalogue {word} hidden')
+    sql("UPDATE quizzes SET is_active = 0 WHERE id = %s", (hidden,))
+    body = catalogue(client, q=word).get_json()
+    assert [quiz['id'] for quiz in body['quizzes']] == [kept]
+    assert body['next'] is None
+
+
+def test_short_search_terms_are_rejected(client):
+    for q in ('ab', 'a b', '++'):
+        response = catalogue(client, q=q)
+        assert response.status_code == 400, q
+        assert 'at least 3 characters' in response.get_json()['message']
+
+
+def test_invalid_arguments_are_rejected(client):
+    assert catalogue(client, fields='everything').status_code == 400
+    assert catalogue(client, after='not-a-cursor').status_code == 400
+    assert catalogue(client, limit='many').status_code == 400
+    assert catalogue(client, category='books').status_code == 400
@@ -0,0 +1,54 @@
+# tests/test_content_cache.py
+import pytest
+
+import models
+
+
+def question_texts(client, quiz_id):
+    response = client.get(f'/api/quizzes/{quiz_id}/questions')
+    assert response.status_code == 200
+    return [q['question_text'] for q in response.get_json()['questions']]
+
+
+def test_question_set_is_served_from_the_cache(user_client, make_quiz, sql):
+    quiz_id, question_ids = make_quiz('AB')
+    assert question_texts(user_client, quiz_id) == ['Question 1', 'Question 2']
+    # A write that bypasses the models is not seen until the set is invalidated
+    sql("UPDATE questions SET question_text = 'Edited' WHERE id = %s", (question_ids[0],))
+    assert question_texts(user_client, quiz_id) == ['Question 1', 'Question 2']
+
+
+def test_admin_writes_invalidate_the_question_set(user_client, admin_client, make_quiz, sql):
+    quiz_id, question_ids = make_quiz('AB')
+    assert len(question_texts(user_client, quiz_id)) == 2
+    sql("UPDATE questions SET question_text = 'Edited' WHERE id = %s", (question_ids[0],))
+
+    response = admin_client.post('/api/admin/questions', json={
+        'quiz_id': quiz_id, 'question_text': 'Question 3', 'option_a': 'a', 'option_b': 'b',
+        'option_c': 'c', 'option_d': 'd', 'correct_option': 'C'})
+    assert response.status_code == 201
+    assert question_texts(user_client, quiz_id) == ['Edited', 'Question 2', 'Question 3']
+
+    admin_client.delete(f"/api/admin/questions/{response.get_json()['question_id']}")
+    assert question_texts(user_client, quiz_id) == ['Edited', 'Question 2']
+
+
+def test_deleting_a_quiz_drops_it_from_the_cached_list(client, admin_client, make_quiz):
+    quiz_id, _ = make_quiz('A')
+    assert client.get(f'/api/quizzes/{quiz_id}').get_json()['quiz']['is_active']
+    listed = lambda: [q['id'] for q in client.get('/api/quizzes').get_json()['quizzes']]
+    assert quiz_id in listed()
+    assert admin_client.delete(f'/api/admin/quizzes/{quiz_id}').status_code == 200
+    assert quiz_id not in listed()
+    assert not client.get(f'/api/quizzes/{quiz_id}').get_json()['quiz']['is_active']
+
+
+def test_uncommitted_reads_are_not_cached(make_quiz):
+    quiz_id, _ = make_quiz('AB')
+    with pytest.raises(RuntimeError):
+        with models.db_session():
+            models.Question.create(quiz_id, 'Rolled back', 'a', 'b', 'c', 'd', 'A')
+            assert len(models.Question.get_questions_by_quiz(quiz_id)) == 3
+            raise RuntimeError('roll back')
+    with models.db_session():
+        assert len(models.Question.get_questions_by_quiz(quiz_id)) == 2
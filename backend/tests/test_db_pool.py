@@ -0,0 +1,51 @@
+# tests/test_db_pool.py
+import threading
+
+import pytest
+
+from utils.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rollbacks = 0
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        pass
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_released_connections():
+    created = []
+    pool = ConnectionPool(lambda: created.append(FakeConnection()) or created[-1], pool_size=2, max_overflow=0)
+    first = pool.acquire()
+    first.close()
+    second = pool.acquire()
+    assert len(created) == 1
+    assert created[0].rollbacks == 1      # returned connections are rolled back
+    second.close()
+    assert pool.status() == {'pool_size': 2, 'max_overflow': 0, 'opened': 1, 'idle': 1, 'checked_out': 0}
+
+
+def test_pool_overflow_then_timeout():
+    pool = ConnectionPool(FakeConnection, pool_size=1, max_overflow=1, timeout=0.05)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    held[0].close()
+    held[1].close()                       # beyond pool_size: closed, not kept idle
+    assert pool.status()['opened'] == 1
+    assert pool.status()['idle'] == 1
+
+
+def test_pool_waiter_gets_released_connection():
+    pool = ConnectionPool(FakeConnection, pool_size=1, max_overflow=0, timeout=2)
+    held = pool.acquire()
+    threading.Timer(0.05, held.close).start()
+    pool.acquire().close()
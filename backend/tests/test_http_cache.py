@@ -0,0 +1,98 @@
+# tests/test_http_cache.py
+import pytest
+from werkzeug.http import http_date, parse_date
+
+import models
+from utils import http_cache
+from utils.http_cache import matches
+
+
+def test_matches():
+    assert matches('"v-1"', '"v-1"')
+    assert matches('W/"v-1"', '"v-1"')
+    assert matches('"v-0", "v-1"', '"v-1"')
+    assert matches('*', '"v-1"')
+    assert not matches('"v-2"', '"v-1"')
+    assert not matches(None, '"v-1"')
+
+
+def test_quiz_revalidates_with_304_until_quizzes_change(client, make_quiz):
+    quiz_id, _ = make_quiz('A')
+    first = client.get(f'/api/quizzes/{quiz_id}')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert 'max-age=' in first.headers['Cache-Control']
+
+    cached = client.get(f'/api/quizzes/{quiz_id}', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+    assert cached.headers['ETag'] == etag
+
+    with models.db_session():
+        models.Quiz.create('Another quiz', '', None, 30, 1)     # bumps the quizzes version on commit
+    changed = client.get(f'/api/quizzes/{quiz_id}', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_etag_depends_on_the_query(client, make_quiz):
+    quiz_id, _ = make_quiz('A')
+    plain = client.get(f'/api/quizzes/{quiz_id}').headers['ETag']
+    assert client.get(f'/api/quizzes/{quiz_id}?x=1').headers['ETag'] != plain
+
+
+def test_rendered_questions_revalidate(user_client, make_quiz):
+    quiz_id, _ = make_quiz('AB')
+    first = user_client.get(f'/api/quizzes/{quiz_id}/questions')
+    assert first.status_code == 200
+    again = user_client.get(f'/api/quizzes/{quiz_id}/questions', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def quizzes_version(sql):
+    rows = sql("SELECT version, updated_at FROM table_versions WHERE table_name = 'quizzes'")
+    return rows[0] if rows else (0, 0)
+
+
+def test_versions_are_stored_with_the_write(client, make_quiz, sql):
+    quiz_id, _ = make_quiz('A')
+    version, _ = quizzes_version(sql)
+    etag = client.get(f'/api/quizzes/{quiz_id}').headers['ETag']
+
+    # Another worker: its own (empty) lookup cache, the same database
+    http_cache.versions.clear()
+    assert client.get(f'/api/quizzes/{quiz_id}').headers['ETag'] == etag
+
+    # A rolled back write leaves the version alone
+    with pytest.raises(RuntimeError):
+        with models.db_session():
+            models.Quiz.create('Never committed', '', None, 30, 1)
+            raise RuntimeError('abort')
+    assert quizzes_version(sql)[0] == version
+
+    # A write committed by another worker shows once the cached lookup expires
+    sql("UPDATE table_versions SET version = version + 1 WHERE table_name = 'quizzes'")
+    http_cache.versions.clear()
+    assert client.get(f'/api/quizzes/{quiz_id}').headers['ETag'] != etag
+
+
+def test_last_modified_and_if_modified_since(client, make_quiz, sql):
+    quiz_id, _ = make_quiz('A')
+    # Not sent while the last change is in the current second
+    assert 'Last-Modified' not in client.get(f'/api/quizzes/{quiz_id}').headers
+
+    sql("UPDATE table_versions SET updated_at = updated_at - 60")
+    http_cache.versions.clear()
+    first = client.get(f'/api/quizzes/{quiz_id}')
+    last_modified = first.headers['Last-Modified']
+    assert parse_date(last_modified).timestamp() == max(
+        updated_at for _, updated_at in sql("SELECT version, updated_at FROM table_versions"
+                                            " WHERE table_name IN ('quizzes', 'categories')"))
+
+    assert client.get(f'/api/quizzes/{quiz_id}', headers={'If-Modified-Since': last_modified}).status_code == 304
+    earlier = http_date(parse_date(last_modified).timestamp() - 1)
+    assert client.get(f'/api/quizzes/{quiz_id}', headers={'If-Modified-Since': earlier}).status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    assert client.get(f'/api/quizzes/{quiz_id}', headers={'If-Modified-Since': last_modified,
+                                                          'If-None-Match': '"v-other"'}).status_code == 200
+    assert client.get(f'/api/quizzes/{quiz_id}', headers={'If-Modified-Since': 'not a date'}).status_code == 200
@@ -0,0 +1,75 @@
+# tests/test_migrations.py
+import pytest
+
+import models
+from utils import migrations
+from utils.storage import MySQLDialect
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if 'information_schema.statistics' in sql:
+            self.rows = [(table, name, column) for (table, name), columns in sorted(self.conn.indexes.items())
+                         for column in columns]
+        else:
+            self.conn.statements.append(sql)
+            table, rest = sql.split('ALTER TABLE ', 1)[1].split(' ', 1)
+            if rest.startswith('DROP INDEX '):
+                rest = rest.split(', ', 1)[1]
+            name, columns = rest.split(' (', 1)[0].split()[-1], rest.split(' (', 1)[1].rstrip(')')
+            self.conn.indexes[(table, name)] = tuple(columns.split(', '))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeMySQL:
+    """Just enough of a MySQL connection: information_schema and ALTER TABLE ... ADD INDEX."""
+    def __init__(self, indexes):
+        self.indexes = dict(indexes)
+        self.statements = []
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+
+@pytest.fixture
+def mysql(monkeypatch):
+    monkeypatch.setattr(migrations, 'dialect', MySQLDialect())
+
+
+def test_missing_and_changed_indexes_are_added_once(mysql):
+    conn = FakeMySQL({
+        ('quizzes', 'primary'): ('id',),
+        ('attempts', 'idx_completed'): ('completed_at',),
+    })
+    missing = [index[1] for index in migrations.missing_indexes(conn)]
+    assert missing == ['idx_active_created', 'idx_active_category_created',
+                       'ft_quiz_title', 'ft_quiz', 'ft_question', 'idx_completed']
+
+    assert migrations.add_missing_indexes(conn) == missing
+    assert conn.statements[-1] == ('ALTER TABLE attempts DROP INDEX idx_completed, '
+                                   'ADD INDEX idx_completed (completed_at, started_at)')
+    assert migrations.missing_indexes(conn) == []
+    assert migrations.add_missing_indexes(conn) == []
+    assert len(conn.statements) == 6
+    assert 'ALTER TABLE questions ADD FULLTEXT INDEX ft_question (question_text, ' in conn.statements[4]
+
+
+def test_sqlite_needs_no_migration(app):
+    result = app.test_cli_runner().invoke(args=['migrate-indexes'])
+    assert result.exit_code == 0, result.output
+    assert 'up to date' in result.output
+
+
+def test_search_errors_are_not_hidden_as_empty_results(client, monkeypatch):
+    """A database without the FULLTEXT indexes fails the MATCH; that must not read as "no hits"."""
+    monkeypatch.setattr(models.dialect, 'match', lambda columns, query: ('missing_fulltext_index()', []))
+    assert client.get('/api/search', query_string={'q': 'algebra'}).status_code == 500
+    assert client.get('/api/quizzes', query_string={'q': 'algebra'}).status_code == 500
@@ -0,0 +1,71 @@
+# tests/test_question_io.py
+import json
+
+HEADER = 'question_text,option_a,option_b,option_c,option_d,correct_option,points\n'
+
+
+def import_body(admin_client, quiz_id, body, content_type='text/csv'):
+    response = admin_client.post(f'/api/admin/quizzes/{quiz_id}/questions/import', data=body,
+                                 content_type=content_type)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_csv_import_reports_bad_rows_and_keeps_the_rest(admin_client, make_quiz, sql):
+    quiz_id, _ = make_quiz('A')
+    body = (HEADER
+            + 'Capital of France?,Paris,Rome,Oslo,Bern,A,5\n'
+            + 'Missing options,a,,c,d,A,\n'
+            + 'Bad option,a,b,c,d,E,\n'
+            + 'Bad points,a,b,c,d,B,-3\n'
+            + 'Default points,a,b,c,d,C,\n').encode('utf-8')
+    result = import_body(admin_client, quiz_id, body)
+    assert (result['imported'], result['error_count']) == (2, 3)
+    assert result['errors'] == [
+        {'line': 3, 'message': 'All fields are required'},
+        {'line': 4, 'message': 'Correct option must be A, B, C, or D'},
+        {'line': 5, 'message': 'Points must be a positive integer'},
+    ]
+    assert sql("SELECT question_text, points FROM questions WHERE quiz_id = %s ORDER BY id", (quiz_id,)) == [
+        ('Question 1', 10), ('Capital of France?', 5), ('Default points', 10)]
+
+
+def test_csv_with_bom_and_invalid_utf8(admin_client, make_quiz, sql):
+    quiz_id, _ = make_quiz('A')
+    body = (b'\xef\xbb\xbf' + HEADER.encode('utf-8')
+            + 'Café?,oui,non,peut-être,jamais,A,\n'.encode('utf-8')
+            + b'Broken \xff bytes,a,b,c,d,A,\n')
+    result = import_body(admin_client, quiz_id, body)
+    assert (result['imported'], result['errors']) == (1, [{'line': 3, 'message': 'Invalid UTF-8'}])
+    assert sql("SELECT COUNT(*) FROM questions WHERE quiz_id = %s AND question_text = 'Café?'", (quiz_id,)) == [(1,)]
+
+
+def test_jsonl_import_errors(admin_client, make_quiz):
+    quiz_id, _ = make_quiz('A')
+    good = {'question_text': 'Q', 'option_a': 'a', 'option_b': 'b', 'option_c': 'c', 'option_d': 'd',
+            'correct_option': 'D'}
+    body = '\n'.join([json.dumps(good), '{not json', '[1, 2]', '', json.dumps(dict(good, points='x'))]) + '\n'
+    result = import_body(admin_client, quiz_id, body.encode('utf-8'), 'application/x-ndjson')
+    assert result['imported'] == 1
+    assert [(e['line'], e['message'].split(':')[0]) for e in result['errors']] == [
+        (2, 'Invalid JSON'), (3, 'Each line must be a JSON object'), (5, 'Points must be a positive integer')]
+
+
+def test_import_needs_a_known_format_and_quiz(admin_client, make_quiz):
+    quiz_id, _ = make_quiz('A')
+    response = admin_client.post(f'/api/admin/quizzes/{quiz_id}/questions/import', data=b'x',
+                                 content_type='application/octet-stream')
+    assert response.status_code == 415
+    response = admin_client.post('/api/admin/quizzes/999999/questions/import', data=HEADER.encode(),
+                                 content_type='text/csv')
+    assert response.status_code == 404
+
+
+def test_export_round_trips_through_import(admin_client, make_quiz):
+    source, _ = make_quiz('ABCD')
+    target, _ = make_quiz('')
+    exported = admin_client.get(f'/api/admin/quizzes/{source}/questions/export?format=jsonl').get_data()
+    assert import_body(admin_client, target, exported, 'application/x-ndjson')['imported'] == 4
+    again = admin_client.get(f'/api/admin/quizzes/{target}/questions/export?format=jsonl').get_data()
+    strip_ids = lambda data: [{k: v for k, v in json.loads(line).items() if k != 'id'} for line in data.splitlines()]
+    assert strip_ids(again) == strip_ids(exported)
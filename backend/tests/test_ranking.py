@@ -0,0 +1,111 @@
+# tests/test_ranking.py
+import threading
+import time
+
+import pytest
+
+from utils.ranking import BoardRegistry, RankIndex, decode_cursor, encode_cursor
+
+
+def board(*entries):
+    index = RankIndex()
+    for user_id, scores in entries:
+        index.update(user_id, scores)
+    return index
+
+
+def test_best_first_and_ties_share_a_rank():
+    index = board((1, (50,)), (2, (80,)), (3, (50,)), (4, (10,)))
+    assert [index.rank(u) for u in (2, 1, 3, 4)] == [1, 2, 2, 4]
+    assert index.rank(99) is None
+
+
+def test_later_scores_break_ties():
+    index = board((1, (80, 100)), (2, (80, 300)))
+    assert index.rank(2) == 1
+    assert index.rank(1) == 2
+
+
+def test_update_moves_a_user():
+    index = board((1, (50,)), (2, (60,)))
+    index.update(1, (70,), extra={'attempts': 3})
+    assert len(index) == 2
+    assert index.rank(1) == 1
+    assert index.get(1) == ((70.0,), {'attempts': 3})
+
+
+def test_keyset_pages_cover_the_board_once():
+    index = board(*((user_id, (user_id % 7,)) for user_id in range(1, 26)))
+    seen, cursor = [], None
+    while True:
+        entries, cursor = index.page(after=cursor, limit=10)
+        seen.extend(user_id for _, user_id, _, _ in entries)
+        if cursor is None:
+            break
+        cursor = decode_cursor(encode_cursor(cursor))
+    assert sorted(seen) == list(range(1, 26))
+    ranks = [index.rank(user_id) for user_id in seen]
+    assert ranks == sorted(ranks)
+
+
+def test_decode_cursor_rejects_garbage():
+    assert decode_cursor('') is None
+    with pytest.raises(ValueError):
+        decode_cursor('abc,1')
+
+
+def test_load_matches_one_update_per_entry():
+    entries = [(user_id, ((user_id * 37) % 11, user_id % 3), {'n': user_id}) for user_id in range(1, 200)]
+    bulk = RankIndex()
+    bulk.load(reversed(entries))
+    one_by_one = board(*((user_id, scores) for user_id, scores, _ in entries))
+    assert bulk.page(limit=500)[0] == [entry[:3] + ({'n': entry[1]},) for entry in one_by_one.page(limit=500)[0]]
+    assert bulk.get(5) == ((9.0, 2.0), {'n': 5})
+
+
+def test_registry_loads_a_board_once_for_concurrent_readers():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        started.set()
+        release.wait(2)
+        return [(1, (10,), None)]
+
+    boards = BoardRegistry(loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(boards.get('global'))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    started.wait(2)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert calls == ['global']
+    assert len(results) == 5 and all(index is results[0] for index in results)
+
+
+def test_registry_serves_the_stale_board_while_reloading():
+    release = threading.Event()
+    generation = []
+
+    def loader(name):
+        generation.append(name)
+        if len(generation) > 1:
+            release.wait(2)
+        return [(len(generation), (10,), None)]
+
+    boards = BoardRegistry(loader, ttl=0.01)
+    first = boards.get('quiz:1')
+    time.sleep(0.02)
+    reloading = threading.Thread(target=boards.get, args=('quiz:1',))
+    reloading.start()
+    while len(generation) < 2:
+        time.sleep(0.001)
+    assert boards.get('quiz:1') is first        # does not wait for the reload
+    release.set()
+    reloading.join(2)
+    assert boards.loaded('quiz:1').rank(2) == 1
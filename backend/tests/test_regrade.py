@@ -0,0 +1,99 @@
+# tests/test_regrade.py
+import time
+
+import pytest
+
+from conftest import _logged_in_client
+from regrade import RegradeJob, get_job
+
+STATS = "SELECT total_attempts, total_score FROM user_stats WHERE user_id = %s"
+
+
+def submit(client, quiz_id, question_ids, options):
+    attempt_id = client.post(f'/api/quizzes/{quiz_id}/start').get_json()['attempt_id']
+    answers = {str(qid): option for qid, option in zip(question_ids, options)}
+    response = client.post(f'/api/quizzes/{quiz_id}/submit', json={'attempt_id': attempt_id, 'answers': answers})
+    assert response.status_code == 200
+    return attempt_id, response.get_json()['score']
+
+
+def test_regrade_applies_per_user_deltas(app, make_quiz, sql):
+    quiz_id, question_ids = make_quiz('ABC')
+    alice, bob = _logged_in_client(app), _logged_in_client(app)
+    alice_attempt, alice_score = submit(alice, quiz_id, question_ids, 'ACC')
+    bob_attempt, bob_score = submit(bob, quiz_id, question_ids, 'ABC')
+    assert (alice_score, bob_score) == (20, 30)
+
+    # The key changes: question 2's correct option becomes C
+    sql("UPDATE questions SET correct_option = 'C' WHERE id = %s", (question_ids[1],))
+    job = RegradeJob(quiz_id)
+    job.run()
+    assert (job.status, job.processed, job.changed, job.skipped) == ('finished', 2, 2, 0)
+    assert sql("SELECT id, score FROM attempts WHERE id IN (%s, %s) ORDER BY id",
+               (alice_attempt, bob_attempt)) == [(alice_attempt, 30), (bob_attempt, 20)]
+    assert sql(STATS, (alice.user_id,)) == [(1, 30)]
+    assert sql(STATS, (bob.user_id,)) == [(1, 20)]
+    assert sql("SELECT best_score FROM user_quiz_stats WHERE user_id = %s AND quiz_id = %s",
+               (alice.user_id, quiz_id)) == [(30,)]
+
+    # Running again starts the counters over and changes nothing
+    job.run()
+    assert (job.processed, job.changed) == (2, 0)
+    assert sql(STATS, (alice.user_id,)) == [(1, 30)]
+
+
+def test_job_progress_is_stored(admin_client, make_quiz):
+    quiz_id, _ = make_quiz('AB')
+    job = RegradeJob(quiz_id)
+    assert get_job(job.id)['status'] == 'queued'
+    job.run()
+    stored = get_job(job.id)
+    assert stored == job.to_dict()
+    assert stored['status'] == 'finished'
+
+    response = admin_client.get(f'/api/admin/regrade/{job.id}')
+    assert response.status_code == 200
+    assert response.get_json()['job']['job_id'] == job.id
+    assert admin_client.get('/api/admin/regrade/999999').status_code == 404
+
+
+def wait_for_regrade(sql, quiz_id):
+    for _ in range(200):
+        rows = sql("SELECT status FROM regrade_jobs WHERE quiz_id = %s ORDER BY id DESC", (quiz_id,))
+        if rows and rows[0][0] in ('finished', 'failed'):
+            return rows[0][0]
+        time.sleep(0.01)
+    return rows[0][0] if rows else None
+
+
+def test_changing_points_regrades(admin_client, user_client, make_quiz, sql):
+    quiz_id, question_ids = make_quiz('AB')
+    attempt_id, score = submit(user_client, quiz_id, question_ids, 'AB')
+    assert score == 20
+
+    response = admin_client.put(f'/api/admin/questions/{question_ids[0]}', json={'points': '25'})
+    assert response.status_code == 200
+    assert response.get_json()['regrade_started'] is True
+    assert wait_for_regrade(sql, quiz_id) == 'finished'
+    assert sql("SELECT score FROM attempts WHERE id = %s", (attempt_id,)) == [(35,)]
+
+
+def test_unchanged_points_do_not_regrade(admin_client, make_quiz, sql):
+    quiz_id, question_ids = make_quiz('AB')
+    for points in ('10', 10, 10.0):
+        response = admin_client.put(f'/api/admin/questions/{question_ids[0]}', json={'points': points})
+        assert response.status_code == 200
+        assert response.get_json()['regrade_started'] is False
+    assert sql("SELECT COUNT(*) FROM regrade_jobs WHERE quiz_id = %s", (quiz_id,)) == [(0,)]
+
+
+@pytest.mark.parametrize('points', [0, -5, 'ten', 2.5, None, True, [10]])
+def test_invalid_points_are_rejected(admin_client, make_quiz, sql, points):
+    quiz_id, question_ids = make_quiz('A')
+    response = admin_client.put(f'/api/admin/questions/{question_ids[0]}', json={'points': points})
+    assert response.status_code == 400
+    response = admin_client.post('/api/admin/questions', json={
+        'quiz_id': quiz_id, 'question_text': 'New', 'option_a': 'a', 'option_b': 'b',
+        'option_c': 'c', 'option_d': 'd', 'correct_option': 'A', 'points': points})
+    assert response.status_code == (201 if points is None else 400)
+    assert sql("SELECT points FROM questions WHERE id = %s", (question_ids[0],)) == [(10,)]
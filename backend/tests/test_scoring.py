@@ -0,0 +1,51 @@
+# tests/test_scoring.py
+import pickle
+
+from scoring import AnswerKey, score_many, score_submission
+
+QUESTIONS = [
+    {'id': 11, 'correct_answer': 'A', 'points': 10},
+    {'id': 12, 'correct_answer': 'B', 'points': 20},
+    {'id': 13, 'correct_answer': 'C', 'points': 30},
+]
+
+
+def test_score_submission():
+    key = AnswerKey.from_questions(1, QUESTIONS)
+    scored = score_submission(key, {'11': 'A', 12: 'C', '13': 'C', '99': 'A'})
+    assert scored.score == 40
+    assert scored.options() == ['A', 'C', 'C']
+    assert [r['is_correct'] for r in scored.results()] == [True, False, True]
+    assert scored.results()[1] == {'question_id': 12, 'selected_option': 'C', 'correct_option': 'B',
+                                   'is_correct': False, 'points_awarded': 0}
+
+
+def test_unanswered_and_invalid_options_score_nothing():
+    key = AnswerKey.from_questions(1, QUESTIONS)
+    assert score_submission(key, {}).score == 0
+    assert score_submission(key, {'11': 'Z', '12': None}).score == 0
+
+
+def test_score_many_matches_score_submission():
+    key = AnswerKey.from_questions(1, QUESTIONS)
+    submissions = [{'11': 'A'}, {'12': 'B', '13': 'C'}, {}, {'11': 'A', '12': 'B', '13': 'C'}]
+    assert score_many(key, submissions) == [score_submission(key, s).score for s in submissions]
+    assert score_many(key, [key.encode(s) for s in submissions]) == [10, 50, 0, 60]
+
+
+def test_answer_key_pickles():
+    key = AnswerKey.from_questions(1, QUESTIONS)
+    copy = pickle.loads(pickle.dumps(key))
+    assert copy.question_ids == key.question_ids and copy.total_points == 60
+    assert score_submission(copy, {'13': 'C'}).score == 30
+
+
+def test_submit_scores_against_the_cached_key(user_client, make_quiz):
+    quiz_id, question_ids = make_quiz('ABC')
+    attempt_id = user_client.post(f'/api/quizzes/{quiz_id}/start').get_json()['attempt_id']
+    answers = {str(question_ids[0]): 'A', str(question_ids[1]): 'D', 'not-a-question': 'A'}
+    response = user_client.post(f'/api/quizzes/{quiz_id}/submit', json={'attempt_id': attempt_id, 'answers': answers})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['score'], body['total_questions']) == (10, 3)
+    assert [r['selected_option'] for r in body['results']] == ['A', 'D', None]
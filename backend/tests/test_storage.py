@@ -0,0 +1,50 @@
+# tests/test_storage.py
+import models
+from utils.storage import translate
+
+
+def test_translate_placeholders_and_literal_percent():
+    sql, locks = translate("SELECT * FROM quizzes WHERE title LIKE '%%quiz' AND id = %s")
+    assert sql == "SELECT * FROM quizzes WHERE title LIKE '%quiz' AND id = ?"
+    assert locks is False
+
+
+def test_translate_insert_ignore():
+    sql, _ = translate("INSERT IGNORE INTO user_stats (user_id) VALUES (%s)")
+    assert sql == "INSERT OR IGNORE INTO user_stats (user_id) VALUES (?)"
+
+
+def test_translate_upsert():
+    sql, _ = translate(
+        "INSERT INTO user_quiz_stats (user_id, quiz_id, best_score) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE best_score = GREATEST(best_score, VALUES(best_score))"
+    )
+    assert sql == (
+        "INSERT INTO user_quiz_stats (user_id, quiz_id, best_score) VALUES (?, ?, ?) "
+        "ON CONFLICT DO UPDATE SET best_score = MAX(best_score, excluded.best_score)"
+    )
+
+
+def test_translate_for_update_becomes_lock_flag():
+    sql, locks = translate("SELECT score FROM attempts WHERE id=%s FOR UPDATE")
+    assert sql == "SELECT score FROM attempts WHERE id=?"
+    assert locks is True
+
+
+def test_translated_upsert_runs_on_sqlite(sql):
+    (user_id,) = sql("INSERT INTO users (username, email, password) VALUES ('u', 'upsert@example.com', 'x') "
+                     "RETURNING id")[0]
+    upsert = ("INSERT INTO user_stats (user_id, total_attempts, total_score) VALUES (%s, %s, %s) "
+              "ON DUPLICATE KEY UPDATE total_attempts = total_attempts + VALUES(total_attempts), "
+              "total_score = total_score + VALUES(total_score)")
+    sql(upsert, (user_id, 1, 30))
+    sql(upsert, (user_id, 1, 20))
+    assert sql("SELECT total_attempts, total_score, avg_score FROM user_stats WHERE user_id = %s",
+               (user_id,)) == [(2, 50, 25.0)]
+
+
+def test_dictionary_cursor(sql):
+    with models.db_session():
+        cur = models.get_db_connection().cursor(dictionary=True)
+        cur.execute("SELECT id, email FROM users WHERE id = %s", (1,))
+        assert cur.fetchone() == {'id': 1, 'email': 'admin@quiz.com'}
@@ -0,0 +1,66 @@
+# tests/test_unit_of_work.py
+import pytest
+
+import models
+
+
+def _insert_category(name):
+    conn = models.get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("INSERT INTO categories (name) VALUES (%s)", (name,))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def test_session_commits_once_at_the_end(sql):
+    committed = []
+    with models.db_session() as uow:
+        _insert_category('uow-commit')
+        models.after_commit(lambda: committed.append(True))
+        assert uow.dirty and not committed
+    assert committed == [True]
+    assert sql("SELECT COUNT(*) FROM categories WHERE name = 'uow-commit'") == [(1,)]
+
+
+def test_session_rolls_back_on_exception(sql):
+    committed = []
+    with pytest.raises(RuntimeError):
+        with models.db_session():
+            _insert_category('uow-exception')
+            models.after_commit(lambda: committed.append(True))
+            raise RuntimeError('boom')
+    assert committed == []
+    assert sql("SELECT COUNT(*) FROM categories WHERE name = 'uow-exception'") == [(0,)]
+
+
+def test_failed_statement_poisons_the_unit(sql):
+    with models.db_session() as uow:
+        _insert_category('uow-failed')
+        assert models.Category.create('uow-failed', 'duplicate name') is None
+        assert uow.failed
+        _insert_category('uow-after-failure')
+    assert sql("SELECT COUNT(*) FROM categories WHERE name IN ('uow-failed', 'uow-after-failure')") == [(0,)]
+
+
+def test_after_rollback_runs_only_without_a_commit():
+    events = []
+    with models.db_session():
+        _insert_category('uow-rollback-committed')
+        models.after_rollback(lambda: events.append('committed unit'))
+    with pytest.raises(RuntimeError):
+        with models.db_session():
+            _insert_category('uow-rollback')
+            models.after_rollback(lambda: events.append('rolled back unit'))
+            raise RuntimeError('boom')
+    assert events == ['rolled back unit']
+
+
+def test_clean_unit_runs_after_commit_callbacks():
+    events = []
+    with models.db_session():
+        models.after_commit(lambda: events.append('commit'))
+        models.after_rollback(lambda: events.append('rollback'))
+    assert events == ['commit']
@@ -0,0 +1,115 @@
+# tests/test_write_behind.py
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+import models
+import write_behind
+from conftest import ADMIN_ID
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return write_behind.WriteBehindQueue(spill_file=str(tmp_path / 'spill.jsonl'), flush_interval=3600)
+
+
+@pytest.fixture
+def create_ops(make_quiz):
+    """`count` attempt creations with reserved ids, for the pipeline to write."""
+    quiz_id, _ = make_quiz('A')
+
+    def ops(count):
+        with models.db_session():
+            ids = list(models.Attempt.reserve_ids(count))
+        return [{'op': 'create', 'id': attempt_id, 'user_id': ADMIN_ID, 'quiz_id': quiz_id,
+                 'at': datetime.utcnow().isoformat()} for attempt_id in ids]
+    return ops
+
+
+def stored_ids(sql, ops):
+    ids = [op['id'] for op in ops]
+    rows = sql(f"SELECT id FROM attempts WHERE id IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+    return sorted(row[0] for row in rows)
+
+
+def test_failed_batch_is_spilled_then_replayed(pipeline, create_ops, sql, monkeypatch):
+    ops = create_ops(3)
+    for op in ops:
+        pipeline._queue.put_nowait(op)
+
+    def unavailable(batch):
+        raise RuntimeError('database unavailable')
+    monkeypatch.setattr(write_behind, '_write_batch', unavailable)
+    assert pipeline.flush() == 0
+    with open(pipeline.spill_file, encoding='utf-8') as f:
+        assert [json.loads(line)['id'] for line in f] == [op['id'] for op in ops]
+
+    monkeypatch.undo()
+    assert pipeline.flush() == 3
+    assert stored_ids(sql, ops) == [op['id'] for op in ops]
+    assert not os.path.exists(pipeline.spill_file)
+    assert not os.path.exists(pipeline.spill_file + '.replay')
+
+
+def test_interrupted_replay_and_exited_workers_are_resumed(pipeline, create_ops, sql, tmp_path):
+    ops = create_ops(3)
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                            capture_output=True, text=True, check=True)
+    leftovers = [
+        pipeline.spill_file + '.replay',                            # ours, interrupted
+        str(tmp_path / f'spill.{exited.stdout.strip()}.jsonl'),     # a worker that has exited
+        str(tmp_path / f'spill.{exited.stdout.strip()}.jsonl.replay'),
+    ]
+    for path, op in zip(leftovers, ops):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(op) + '\n')
+
+    assert pipeline.flush() == 3
+    assert stored_ids(sql, ops) == [op['id'] for op in ops]
+    assert sorted(os.listdir(tmp_path)) == []
+
+
+def test_spill_files_of_live_workers_are_left_alone(pipeline, tmp_path):
+    other = tmp_path / f'spill.{os.getppid()}.jsonl'
+    other.write_text('{}\n', encoding='utf-8')
+    assert pipeline.flush() == 0
+    assert other.exists()
+
+
+def test_unparseable_lines_are_parked(pipeline, tmp_path):
+    with open(pipeline.spill_file, 'w', encoding='utf-8') as f:
+        f.write('not json\n')
+    assert pipeline.flush() == 0
+    assert (tmp_path / 'spill.failed.jsonl').read_text(encoding='utf-8') == 'not json\n'
+
+
+def test_replay_errors_do_not_stop_the_flush(pipeline, create_ops, sql, monkeypatch):
+    def broken():
+        raise OSError('disk error')
+    monkeypatch.setattr(pipeline, '_collect_spills', broken)
+    ops = create_ops(1)
+    pipeline._queue.put_nowait(ops[0])
+    assert pipeline.flush() == 1
+    assert stored_ids(sql, ops) == [ops[0]['id']]
+
+
+def test_reserved_blocks_start_above_existing_attempts(make_quiz, sql):
+    quiz_id, _ = make_quiz('A')
+    with models.db_session():
+        first = models.Attempt.reserve_ids(5)
+    # WRITE_BEHIND switched off: AUTO_INCREMENT inserts run past the reserved block
+    for _ in range(3):
+        sql("INSERT INTO attempts (id, user_id, quiz_id) VALUES (%s, %s, %s)",
+            (sql("SELECT MAX(id) FROM attempts")[0][0] + 10, ADMIN_ID, quiz_id))
+    highest = sql("SELECT MAX(id) FROM attempts")[0][0]
+    assert highest >= first.stop
+    with models.db_session():
+        second = models.Attempt.reserve_ids(5)
+    assert second.start == highest + 1 and len(second) == 5
+    with models.db_session():
+        third = models.Attempt.reserve_ids(5)
+    assert third.start == second.stop
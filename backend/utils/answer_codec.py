@@ -0,0 +1,36 @@
+# utils/answer_codec.py
+import struct
+
+OPTIONS = ('A', 'B', 'C', 'D')
+# One byte per answer: 0 = unanswered / invalid, 1..4 = A..D
+OPTION_CODES = {opt: i + 1 for i, opt in enumerate(OPTIONS)}
+CODE_OPTIONS = {code: opt for opt, code in OPTION_CODES.items()}
+
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<BI')   # version, answer count
+
+
+def pack_answers(answers):
+    """
+    Pack [(question_id, option or None), ...] into one compact blob:
+    a 5-byte header, the question ids as little-endian uint32, then one
+    option byte per question. 5 bytes per answer instead of a row each.
+    """
+    answers = list(answers)
+    count = len(answers)
+    return (
+        _HEADER.pack(_FORMAT_VERSION, count)
+        + struct.pack(f'<{count}I', *(qid for qid, _ in answers))
+        + bytes(OPTION_CODES.get(option, 0) for _, option in answers)
+    )
+
+
+def unpack_answers(blob):
+    """Inverse of pack_answers(): return {question_id: option or None}."""
+    version, count = _HEADER.unpack_from(blob, 0)
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported packed answers version: {version}")
+    offset = _HEADER.size
+    question_ids = struct.unpack_from(f'<{count}I', blob, offset)
+    codes = blob[offset + 4 * count:offset + 5 * count]
+    return {qid: CODE_OPTIONS.get(code) for qid, code in zip(question_ids, codes)}
@@ -0,0 +1,87 @@
+# utils/async_db.py
+import os
+
+try:
+    import aiomysql
+except ImportError:  # optional: only the async serving mode needs it
+    aiomysql = None
+
+
+class AsyncDatabase:
+    """
+    Lazily created aiomysql pool for the async serving mode (asgi.py).
+
+    Uses the same MYSQL_* settings as models._connect(). Pool sizes are
+    separate (MYSQL_ASYNC_POOL_MIN / _MAX): one event loop multiplexes
+    many requests over these connections instead of holding a thread each.
+    """
+
+    def __init__(self, minsize=None, maxsize=None, recycle=None):
+        self.minsize = minsize or int(os.getenv('MYSQL_ASYNC_POOL_MIN', 1))
+        self.maxsize = maxsize or int(os.getenv('MYSQL_ASYNC_POOL_MAX', 50))
+        self.recycle = recycle or int(os.getenv('MYSQL_POOL_RECYCLE', 3600))
+        self._pool = None
+
+    async def pool(self):
+        if self._pool is None:
+            if aiomysql is None:
+                raise RuntimeError('SERVER_MODE=async requires the aiomysql package')
+            self._pool = await aiomysql.create_pool(
+                host=os.getenv('MYSQL_HOST', 'localhost'),
+                user=os.getenv('MYSQL_USER', 'quiz_user'),
+                password=os.getenv('MYSQL_PASSWORD', 'quiz_pass'),
+                db=os.getenv('MYSQL_DB', 'quiz_app'),
+                minsize=self.minsize,
+                maxsize=self.maxsize,
+                pool_recycle=self.recycle,
+                autocommit=False
+            )
+        return self._pool
+
+    async def fetchall(self, sql, params=()):
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(sql, params)
+                rows = await cur.fetchall()
+            await conn.commit()   # end the read transaction (REPEATABLE READ snapshot)
+            return list(rows)
+
+    async def fetchone(self, sql, params=()):
+        rows = await self.fetchall(sql, params)
+        return rows[0] if rows else None
+
+    def transaction(self):
+        """`async with db.transaction() as cur:` commits on success, rolls back on error."""
+        return _Transaction(self)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+
+class _Transaction:
+    def __init__(self, db):
+        self._db = db
+        self._conn = None
+        self._cur = None
+
+    async def __aenter__(self):
+        pool = await self._db.pool()
+        self._conn = await pool.acquire()
+        self._cur = await self._conn.cursor(aiomysql.DictCursor)
+        return self._cur
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pool = await self._db.pool()
+        try:
+            await self._cur.close()
+            if exc_type is None:
+                await self._conn.commit()
+            else:
+                await self._conn.rollback()
+        finally:
+            pool.release(self._conn)
+        return False
@@ -0,0 +1,159 @@
+# utils/auth.py
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import jwt
+from flask import g, request, session
+
+from config import Config
+from utils.cache import build_cache
+
+TOKEN_LIFETIME = timedelta(hours=2)
+# Secrets that must never sign tokens: unset, or the value this repo used to ship with
+INSECURE_JWT_SECRETS = {None, '', 'super-secret-jwt-key'}
+REVOCATION_TTL = int(os.getenv('AUTH_REVOCATION_TTL', 24 * 3600))
+REVOCATION_CACHE_TTL = int(os.getenv('AUTH_REVOCATION_CACHE_TTL', 5))
+
+# Revoked token / session ids and per-user "revoked before" timestamps live
+# in the database (models.Revocation, set by models), so logout and the
+# revoke-user command reach every worker. Lookups are cached for
+# REVOCATION_CACHE_TTL seconds: another worker may accept a revoked token
+# for at most that long.
+revocation_store = None
+revocation_lookups = build_cache('revocation_lookups', ttl=REVOCATION_CACHE_TTL, maxsize=10000)
+
+
+# Loads {id, username, email, role} of a user id, or None (set by models:
+# the role always comes from the database, never from the token or cookie).
+profile_loader = None
+
+
+class AuthError(Exception):
+    """A bearer token was presented but cannot be accepted."""
+
+
+def tokens_enabled():
+    """Bearer tokens are only issued and accepted with a JWT_SECRET_KEY of our own."""
+    return Config.JWT_SECRET_KEY not in INSECURE_JWT_SECRETS
+
+
+def issue_claims(user):
+    """Identity claims for a freshly authenticated user (stored in the session and the JWT)."""
+    return {
+        'user_id': user['id'],
+        'username': user['username'],
+        'email': user['email'],
+        'role': user['role'],
+        'jti': uuid.uuid4().hex,
+        'iat': int(time.time()),
+    }
+
+
+def issue_token(claims):
+    """A signed JWT for the claims, or None when bearer tokens are disabled."""
+    if not tokens_enabled():
+        return None
+    return jwt.encode({**claims, 'exp': datetime.utcnow() + TOKEN_LIFETIME},
+                      Config.JWT_SECRET_KEY, algorithm='HS256')
+
+
+def identity_from_token(token):
+    """Verify a bearer token; return the caller's identity or raise AuthError with the legacy messages."""
+    if not tokens_enabled():
+        raise AuthError('Token is invalid!')
+    try:
+        claims = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        raise AuthError('Token has expired!')
+    except jwt.InvalidTokenError:
+        raise AuthError('Token is invalid!')
+    identity = _with_profile(claims) if 'user_id' in claims and not is_revoked(claims) else None
+    if identity is None:
+        raise AuthError('Token is invalid!')
+    return identity
+
+
+def identity_from_session(data):
+    """Return the identity of a (signed) session mapping, or None."""
+    if 'user_id' not in data or is_revoked(data):
+        return None
+    return _with_profile(data)
+
+
+def _with_profile(claims):
+    """
+    The verified claims with username, email and role of the user as stored
+    now (cached profile), or None when the user no longer exists.
+    """
+    profile = profile_loader(claims['user_id']) if profile_loader is not None else None
+    if not profile:
+        return None
+    return {
+        'user_id': profile['id'],
+        'username': profile['username'],
+        'email': profile['email'],
+        'role': profile['role'],
+        'jti': claims.get('jti'),
+        'iat': claims.get('iat'),
+    }
+
+
+def current_identity():
+    """
+    Claims of the caller (Authorization: Bearer token first, then the
+    session cookie), verified once per request and memoized on `g`. The
+    profile fields come from User.get_profile() (cached), not from the
+    claims. Raises AuthError for a bad bearer token.
+    """
+    if '_identity' not in g:
+        header = request.headers.get('Authorization', '')
+        if header:
+            g._identity = identity_from_token(header[7:] if header.startswith('Bearer ') else header)
+        else:
+            g._identity = identity_from_session(session)
+    return g._identity
+
+
+def current_user_id():
+    identity = current_identity()
+    return identity['user_id'] if identity else None
+
+
+# ----------------- revocation ----------------- #
+def _revocation_names(claims):
+    return [f"jti:{claims.get('jti')}", f"user:{claims.get('user_id')}"]
+
+
+def is_revoked(claims):
+    names = _revocation_names(claims)
+    key = '|'.join(names)
+    revoked = revocation_lookups.get(key)
+    if revoked is None:
+        if revocation_store is None:
+            raise RuntimeError('utils.auth.revocation_store is not set (import models first)')
+        revoked = revocation_store.lookup(names, int(time.time()))
+        revocation_lookups.set(key, revoked)
+    if claims.get('jti') and names[0] in revoked:
+        return True
+    revoked_before = revoked.get(names[1])
+    return revoked_before is not None and (claims.get('iat') or 0) <= revoked_before
+
+
+def _save_revocation(name):
+    now = int(time.time())
+    if revocation_store is None or not revocation_store.save(name, now, now + REVOCATION_TTL):
+        raise RuntimeError(f'Could not store the revocation of {name}')
+    revocation_lookups.clear()
+
+
+def revoke(claims):
+    """Revoke one token / session (logout)."""
+    if claims and claims.get('jti'):
+        _save_revocation(f"jti:{claims['jti']}")
+
+
+def revoke_user(user_id):
+    """Revoke every token and session issued to a user so far."""
+    _save_revocation(f'user:{user_id}')
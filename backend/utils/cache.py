@@ -0,0 +1,371 @@
+# utils/cache.py
+import hashlib
+import json
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # optional: only needed for CACHE_BACKEND=redis
+    redis = None
+
+_MISSING = object()
+
+# Every cache built by build_cache(), by namespace (for utils.metrics).
+CACHES = {}
+
+
+class CacheBackend(ABC):
+    """
+    Interface shared by every cache backend:
+    get / set / delete / clear, plus the get_or_load read-through helper.
+    A backend missing one of them cannot be instantiated.
+    """
+
+    @abstractmethod
+    def get(self, key, default=None):
+        """Return the cached value, or `default` when it is absent or expired."""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Cache `value` for `ttl` seconds (the backend's default when None)."""
+
+    @abstractmethod
+    def delete(self, *keys):
+        """Drop the given keys (missing ones are ignored)."""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry of this cache."""
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Read-through helper: return the cached value or call loader() and cache
+        its result. None (the models' "not found / error" value) is not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+
+class TTLCache(CacheBackend):
+    """
+    Thread-safe in-process cache with a per-entry TTL and an LRU size bound.
+    Values are stored as-is: callers must treat what they get back as read-only.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileCache(CacheBackend):
+    """
+    Cache shared by every worker process on one host: one pickle file per key
+    under `directory`, written atomically. No invalidation messages are needed
+    because every process reads the same files.
+
+    Files are unpickled, so the directory must be private to the app's user:
+    it is created with mode 0700, and an existing one must belong to us and
+    not be writable by anyone else. Each file's mtime is its expiry time;
+    expired files are removed when read, and every `maxsize // 10` writes a
+    sweep removes the expired ones and, above `maxsize` entries, those
+    closest to expiry.
+    """
+
+    def __init__(self, directory, ttl=300, namespace='cache', maxsize=1024):
+        _private_directory(directory)
+        self.directory = os.path.join(directory, namespace)
+        _private_directory(self.directory)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._sweep_every = max(1, maxsize // 10)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        if expires_at < time.time():
+            self._unlink(path)
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.utime(tmp, (expires_at, expires_at))
+            os.replace(tmp, self._path(key))
+        except Exception:
+            self._unlink(tmp)
+            raise
+        self._writes += 1
+        if self._writes % self._sweep_every == 0:
+            self.sweep()
+
+    def sweep(self):
+        """Remove expired entries, then the ones closest to expiry beyond maxsize."""
+        now = time.time()
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith('.tmp-'):
+                    continue
+                try:
+                    expires_at = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if expires_at < now:
+                    self._unlink(entry.path)
+                else:
+                    entries.append((expires_at, entry.path))
+        if len(entries) > self.maxsize:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.maxsize]:
+                self._unlink(path)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._unlink(self._path(key))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            self._unlink(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _private_directory(path):
+    """Create `path` with mode 0700, or check that an existing one is ours and not writable by others."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise RuntimeError(f"Cache directory {path} is not a directory")
+    if hasattr(os, 'geteuid'):
+        if info.st_uid != os.geteuid():
+            raise RuntimeError(f"Cache directory {path} belongs to another user")
+        if info.st_mode & 0o022:
+            raise RuntimeError(f"Cache directory {path} is writable by other users (use mode 0700)")
+
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis (or any Redis-protocol server), shared by all workers and hosts."""
+
+    def __init__(self, client, ttl=300, namespace='cache'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = f'{namespace}:'
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        seconds = self.ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                        ex=max(1, int(seconds)))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+
+class RedisInvalidationBus:
+    """
+    Pub/sub channel carrying "these keys changed" messages between processes.
+    The subscriber thread is started lazily per process, so it also works when
+    the app is imported before Gunicorn forks its workers.
+    """
+
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+        self._handlers = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def publish(self, keys):
+        self.client.publish(self.channel, json.dumps(list(keys)))
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+    def ensure_listening(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._on_message})
+            pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+            self._pid = os.getpid()
+
+    def _on_message(self, message):
+        try:
+            keys = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+        for handler in self._handlers:
+            handler(keys)
+
+
+class NearCache(CacheBackend):
+    """
+    Two-level cache: a small per-process TTLCache in front of a shared backend.
+    delete() clears both levels here and broadcasts the keys on the bus so
+    every other worker drops its local copy too.
+    """
+
+    def __init__(self, local, shared, bus):
+        self.local = local
+        self.shared = shared
+        self.bus = bus
+        bus.subscribe(lambda keys: self.local.delete(*keys))
+
+    @property
+    def hits(self):
+        return self.local.hits + self.shared.hits
+
+    @property
+    def misses(self):
+        return self.shared.misses
+
+    def get(self, key, default=None):
+        self.bus.ensure_listening()
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.shared.set(key, value, ttl)
+        self.local.set(key, value, None if ttl is None else min(ttl, self.local.ttl))
+
+    def delete(self, *keys):
+        self.local.delete(*keys)
+        self.shared.delete(*keys)
+        self.bus.publish(keys)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+
+def build_cache(namespace, ttl=300, maxsize=1024):
+    """
+    Create a cache for `namespace` using the backend selected by environment:
+
+    - CACHE_BACKEND=memory (default): per-process TTLCache
+    - CACHE_BACKEND=file:   FileCache under CACHE_DIR (required, private to the app's
+                            user), shared by workers on one host
+    - CACHE_BACKEND=redis:  RedisCache at CACHE_REDIS_URL, fronted by a per-process
+                            near cache (CACHE_NEAR_TTL seconds, 0 disables) that is
+                            invalidated over Redis pub/sub
+    """
+    cache = _create_cache(os.getenv('CACHE_BACKEND', 'memory').lower(), namespace, ttl, maxsize)
+    CACHES[namespace] = cache
+    return cache
+
+
+def _create_cache(backend, namespace, ttl, maxsize):
+    if backend == 'memory':
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+
+    if backend == 'file':
+        directory = os.getenv('CACHE_DIR')
+        if not directory:
+            raise RuntimeError("CACHE_BACKEND=file requires CACHE_DIR (a directory private to the app's user)")
+        return FileCache(directory, ttl=ttl, namespace=namespace, maxsize=maxsize)
+
+    if backend == 'redis':
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        client = redis.Redis.from_url(os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+        shared = RedisCache(client, ttl=ttl, namespace=namespace)
+        near_ttl = int(os.getenv('CACHE_NEAR_TTL', 5))
+        if near_ttl <= 0:
+            return shared
+        bus = RedisInvalidationBus(client, f'{namespace}:invalidate')
+        return NearCache(TTLCache(maxsize=maxsize, ttl=min(near_ttl, ttl)), shared, bus)
+
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
@@ -0,0 +1,187 @@
+# utils/db_pool.py
+import queue
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the pool timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a raw DB-API connection checked out of a ConnectionPool.
+    Everything is forwarded to the raw connection except close(), which hands
+    the connection back to the pool instead of tearing down the socket.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+    def invalidate(self):
+        """Drop the underlying connection instead of returning it to the pool."""
+        if self._released:
+            return
+        self._released = True
+        self._pool._discard(self._raw)
+
+
+class ConnectionPool:
+    """
+    Fixed-size connection pool with overflow.
+
+    - pool_size:    connections kept open between checkouts
+    - max_overflow: extra connections opened under burst load, closed on release
+    - timeout:      seconds to wait for a free connection before PoolTimeout
+    - recycle:      reconnect connections older than this many seconds (-1 = never)
+    - pre_ping:     health-check a connection on checkout and replace it if dead
+    """
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, timeout=30, recycle=3600, pre_ping=True):
+        self._creator = creator
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        # Optional callback(seconds) told how long each checkout took (utils.metrics)
+        self.on_checkout = None
+
+    # ----------------- public API ----------------- #
+    def acquire(self):
+        """Check out a connection, creating one if the pool has room."""
+        if self.on_checkout is None:
+            return self._checkout()
+        started = time.perf_counter()
+        try:
+            return self._checkout()
+        finally:
+            self.on_checkout(time.perf_counter() - started)
+
+    def dispose(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        while True:
+            try:
+                raw, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(raw)
+
+    def status(self):
+        with self._lock:
+            opened = self._opened
+        idle = self._idle.qsize()
+        return {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'opened': opened,
+            'idle': idle,
+            'checked_out': opened - idle,
+        }
+
+    # ----------------- internals ----------------- #
+    def _checkout(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                raw, created_at = self._idle.get_nowait()
+            except queue.Empty:
+                raw = None
+
+            if raw is None:
+                if self._reserve_slot():
+                    return self._open()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"QueuePool limit of size {self.pool_size} overflow {self.max_overflow} "
+                        f"reached, connection timed out after {self.timeout}s"
+                    )
+                try:
+                    # Wait in short slices so a slot freed by a discarded
+                    # connection is noticed as well as a returned one.
+                    raw, created_at = self._idle.get(timeout=min(remaining, 0.1))
+                except queue.Empty:
+                    continue
+
+            if self._is_stale(created_at) or not self._is_alive(raw):
+                self._discard(raw)
+                continue
+
+            return PooledConnection(self, raw, created_at)
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._opened < self.pool_size + self.max_overflow:
+                self._opened += 1
+                return True
+            return False
+
+    def _open(self):
+        try:
+            raw = self._creator()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+        return PooledConnection(self, raw, time.monotonic())
+
+    def _release(self, raw, created_at):
+        # End whatever transaction the caller left open so the next checkout
+        # does not inherit locks or a stale REPEATABLE READ snapshot.
+        try:
+            if getattr(raw, 'in_transaction', True):
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        if self._is_stale(created_at):
+            self._discard(raw)
+            return
+        try:
+            self._idle.put_nowait((raw, created_at))
+        except queue.Full:
+            # Overflow connection: the steady-state pool is already full.
+            self._discard(raw)
+
+    def _discard(self, raw):
+        self._close_raw(raw)
+        with self._lock:
+            self._opened -= 1
+
+    def _is_stale(self, created_at):
+        return self.recycle is not None and self.recycle >= 0 and time.monotonic() - created_at > self.recycle
+
+    def _is_alive(self, raw):
+        if not self.pre_ping:
+            return True
+        try:
+            # mysql.connector: ping(reconnect=False) raises if the server went away
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_raw(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
@@ -1,67 +1,47 @@
 from functools import wraps
-from flask import request, jsonify, session
-import jwt
-from config import Config
+from flask import jsonify
+from utils.auth import current_identity, AuthError
+
+def _authenticate(missing_message):
+    """Return (identity, None) or (None, error response) for the current request."""
+    try:
+        identity = current_identity()
+    except AuthError as e:
+        return None, (jsonify({'message': str(e)}), 401)
+    if identity is None:
+        return None, (jsonify({'message': missing_message}), 401)
+    return identity, None
 
 def token_required(f):
-    """Decorator to require JWT token"""
+    """Decorator to require a JWT token (or a logged-in session)"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        
-        if not token:
-            return jsonify({'message': 'Token is missing!'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token.split(' ')[1]
-            
-            data = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=["HS256"])
-            current_user_id = data['user_id']
-            current_user_role = data['role']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token has expired!'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Token is invalid!'}), 401
-        
-        return f(current_user_id, current_user_role, *args, **kwargs)
-    
+        identity, error = _authenticate('Token is missing!')
+        if error:
+            return error
+        return f(identity['user_id'], identity['role'], *args, **kwargs)
+
     return decorated
 
 def admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        
-        if not token:
-            return jsonify({'message': 'Token is missing!'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token.split(' ')[1]
-            
-            data = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=["HS256"])
-            
-            if data['role'] != 'admin':
-                return jsonify({'message': 'Admin access required!'}), 403
-            
-            current_user_id = data['user_id']
-            current_user_role = data['role']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token has expired!'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Token is invalid!'}), 401
-        
-        return f(current_user_id, current_user_role, *args, **kwargs)
-    
+        identity, error = _authenticate('Token is missing!')
+        if error:
+            return error
+        if identity['role'] != 'admin':
+            return jsonify({'message': 'Admin access required!'}), 403
+        return f(identity['user_id'], identity['role'], *args, **kwargs)
+
     return decorated
 
 def login_required(f):
-    """Decorator to require session login"""
+    """Decorator to require session login (or a JWT token)"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
-            return jsonify({'message': 'Please log in to access this page'}), 401
+        identity, error = _authenticate('Please log in to access this page')
+        if error:
+            return error
         return f(*args, **kwargs)
-    return decorated_function
\ No newline at end of file
+    return decorated_function
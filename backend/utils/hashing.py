@@ -0,0 +1,109 @@
+# utils/hashing.py
+import hmac
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+
+from utils import metrics
+
+LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'process')      # 'process' | 'thread'
+WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+
+
+class HasherBusy(Exception):
+    """Too many hashes are already waiting; the caller should answer 503 and let the client retry."""
+
+
+# Run in the worker processes: module-level so they can be pickled.
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _check(hashed, password):
+    hashed = hashed.encode('utf-8')
+    return hmac.compare_digest(bcrypt.hashpw(password, hashed), hashed)
+
+
+class PasswordHasher:
+    """
+    bcrypt off the request threads.
+
+    Hashes run on a dedicated executor (a process pool by default, so a
+    login storm burns the spare cores instead of holding the GIL the quiz
+    reads need). At most MAX_PENDING hashes may be queued or running per
+    process; a caller that cannot get a slot within QUEUE_TIMEOUT seconds
+    gets HasherBusy instead of piling up behind the others.
+
+    Hashes are compatible with flask_bcrypt's. needs_rehash() tells whether
+    a stored hash was made with a different BCRYPT_LOG_ROUNDS, so logins can
+    upgrade it transparently.
+    """
+
+    def __init__(self, rounds=LOG_ROUNDS, executor=EXECUTOR, workers=WORKERS,
+                 max_pending=MAX_PENDING, queue_timeout=QUEUE_TIMEOUT):
+        self.rounds = rounds
+        self.executor = executor
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def hash(self, password):
+        """Return the bcrypt hash (str) of a password."""
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        return self._run(_hash, password.encode('utf-8'), self.rounds)
+
+    def check(self, hashed, password):
+        """Compare a password with a stored hash in constant time."""
+        return self._run(_check, hashed, password.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def _run(self, fn, *args):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            if metrics.ENABLED:
+                metrics.HASH_REJECTED.inc()
+            raise HasherBusy('Password hashing queue is full')
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+            if metrics.ENABLED:
+                metrics.HASH_SECONDS.observe(time.perf_counter() - started, op=fn.__name__.lstrip('_'))
+
+    def _executor(self):
+        # A pool inherited through fork() has no live workers: make a new one per process.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    if self.executor == 'thread':
+                        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='bcrypt')
+                    else:
+                        self._pool = ProcessPoolExecutor(
+                            self.workers, mp_context=multiprocessing.get_context('spawn'))
+                    self._pid = os.getpid()
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pid = None
+
+
+hasher = PasswordHasher()
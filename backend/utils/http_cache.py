@@ -0,0 +1,121 @@
+# utils/http_cache.py
+import hashlib
+import os
+import time
+from functools import wraps
+
+from flask import make_response, request
+from werkzeug.http import http_date, parse_date
+
+from utils.cache import build_cache
+
+# Version and last-change time of each versioned table. They live in the
+# database (models.TableVersion, set by models) and are advanced in the same
+# transaction as the write (models.touch), so every worker derives the same
+# ETag from the same data and "same versions" means "same data": an ETag can
+# be computed without reading the data at all. Lookups are cached for
+# VERSION_CACHE_TTL seconds: another worker may answer 304 for a changed
+# table for at most that long.
+version_store = None
+VERSION_CACHE_TTL = int(os.getenv('TABLE_VERSION_CACHE_TTL', 2))
+versions = build_cache('versions', ttl=VERSION_CACHE_TTL, maxsize=64)
+
+
+def table_versions(tables):
+    """{table: (version, updated_at epoch seconds)}; tables never written are (0, 0)."""
+    key = ','.join(tables)
+    found = versions.get(key)
+    if found is None:
+        if version_store is None:
+            raise RuntimeError('utils.http_cache.version_store is not set (import models first)')
+        found = version_store.lookup(tables)
+        versions.set(key, found)
+    return found
+
+
+def forget_versions():
+    """Drop cached lookups after a commit that bumped versions, so this worker sees it at once."""
+    versions.clear()
+
+
+class CachePolicy:
+    """
+    HTTP caching of one read endpoint: a version-based ETag over `tables`
+    (plus the request path and query) and the Cache-Control it is served with.
+    """
+
+    def __init__(self, tables=(), max_age=0, stale_while_revalidate=0, private=False):
+        self.tables = tuple(tables)
+        directives = ['private' if private else 'public', f'max-age={max_age}']
+        if stale_while_revalidate:
+            directives.append(f'stale-while-revalidate={stale_while_revalidate}')
+        self.cache_control = ', '.join(directives)
+
+    def validators(self, path):
+        """
+        (ETag, Last-Modified epoch seconds or None) of `path`, from the table
+        versions alone. Last-Modified is left out until its second has passed,
+        so a write later in the same second cannot hide behind it.
+        """
+        if not self.tables:
+            return None, None
+        try:
+            found = table_versions(self.tables)
+        except Exception as e:
+            # Without versions the response is simply not validated
+            print(f"[http_cache.CachePolicy.validators] Error: {e}")
+            return None, None
+        key = '|'.join([path] + [f'{t}={found[t][0]}' for t in self.tables])
+        etag = '"v-%s"' % hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+        last_modified = max(updated_at for _, updated_at in found.values())
+        if not last_modified or last_modified >= int(time.time()):
+            last_modified = None
+        return etag, last_modified
+
+
+def matches(if_none_match, etag):
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)."""
+    if not if_none_match or not etag:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def not_modified(if_none_match, if_modified_since, etag, last_modified):
+    """
+    Whether a conditional GET can be answered 304. If-Modified-Since only
+    counts without If-None-Match (RFC 9110 13.2.2).
+    """
+    if if_none_match:
+        return matches(if_none_match, etag)
+    since = parse_date(if_modified_since) if if_modified_since else None
+    return since is not None and last_modified is not None and last_modified <= since.timestamp()
+
+
+def http_cache(policy):
+    """
+    Decorator for GET views: answers 304 from the table versions alone when
+    If-None-Match (or If-Modified-Since) matches (the view does not run),
+    otherwise tags the 200 with the ETag, Last-Modified and Cache-Control.
+    Views returning their own ETag (utils.rendered) keep it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            etag, last_modified = policy.validators(request.full_path)
+            if not_modified(request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since'),
+                            etag, last_modified):
+                response = make_response('', 304)
+                response.headers['ETag'] = etag
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code not in (200, 304):
+                    return response
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            response.headers['Cache-Control'] = policy.cache_control
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,273 @@
+# utils/metrics.py
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import Response, g, has_app_context, request
+
+from utils import tracing
+from utils.cache import CACHES
+
+# Off by default: nothing is wrapped or hooked unless METRICS_ENABLED=1, so
+# the disabled cost is one boolean check in a few places.
+ENABLED = os.getenv('METRICS_ENABLED', '0') == '1'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"') for _, v in key)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, key, value
+
+
+class Histogram:
+    """Prometheus histogram: per label set, bucket counts plus sum and count."""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                yield f'{self.name}_bucket', key + (('le', _format_value(float(bound))),), cumulative
+            yield f'{self.name}_bucket', key + (('le', '+Inf'),), count
+            yield f'{self.name}_sum', key, total
+            yield f'{self.name}_count', key, count
+
+
+class Registry:
+    """
+    Metrics of this process, rendered in the Prometheus text format.
+    Collectors are callables returning (name, kind, help, [(labels, value)])
+    tuples computed at scrape time (pool and cache state).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        return self._register(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._register(name, lambda: Histogram(name, help_text, buckets))
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _register(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, key, value in metric.samples():
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"[utils.metrics.Registry.render] Error: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(_label_key(labels))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    'quiz_http_request_duration_seconds', 'Request latency by endpoint, including the commit.')
+REQUEST_QUERIES = registry.histogram(
+    'quiz_http_request_db_queries', 'Database round trips per request.', buckets=COUNT_BUCKETS)
+QUERY_SECONDS = registry.histogram(
+    'quiz_db_query_duration_seconds', 'Statement latency by SQL verb.')
+POOL_WAIT_SECONDS = registry.histogram(
+    'quiz_db_pool_wait_seconds', 'Time spent checking a connection out of the pool.')
+MODEL_SECONDS = registry.histogram(
+    'quiz_model_call_duration_seconds', 'Model method latency (nested calls are counted in both).')
+HASH_SECONDS = registry.histogram(
+    'quiz_password_hash_seconds', 'bcrypt hash/check latency, queueing included.')
+HASH_REJECTED = registry.counter(
+    'quiz_password_hash_rejected_total', 'Hashes refused because the queue was full (HTTP 503).')
+
+
+# ----------------- hooks ----------------- #
+def _on_query(operation, params, seconds):
+    verb = operation.lstrip().split(None, 1)[0].upper() if operation.strip() else 'EMPTY'
+    QUERY_SECONDS.observe(seconds, verb=verb)
+    if has_app_context():
+        g._metrics_queries = g.get('_metrics_queries', 0) + 1
+
+
+def timed(histogram, **labels):
+    """Decorator recording the wrapped function's wall time in histogram."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+        return wrapped
+    return decorator
+
+
+def instrument_models(*classes):
+    """Time every static method of the model classes (no-op when disabled)."""
+    if not ENABLED:
+        return
+    for cls in classes:
+        for name, attr in list(vars(cls).items()):
+            if isinstance(attr, staticmethod):
+                fn = timed(MODEL_SECONDS, method=f'{cls.__name__}.{name}')(attr.__func__)
+                setattr(cls, name, staticmethod(fn))
+
+
+def watch_pool(pool, name='mysql'):
+    """Record checkout waits of a utils.db_pool.ConnectionPool and export its size."""
+    if not ENABLED:
+        return
+    pool.on_checkout = lambda seconds: POOL_WAIT_SECONDS.observe(seconds, pool=name)
+
+    def collect():
+        status = pool.status()
+        return [
+            ('quiz_db_pool_connections', 'gauge', 'Open pool connections by state.',
+             [({'pool': name, 'state': 'idle'}, status['idle']),
+              ({'pool': name, 'state': 'checked_out'}, status['checked_out'])]),
+            ('quiz_db_pool_capacity', 'gauge', 'pool_size + max_overflow.',
+             [({'pool': name}, status['pool_size'] + status['max_overflow'])]),
+        ]
+    registry.add_collector(collect)
+
+
+def _collect_caches():
+    hits, misses, ratios = [], [], []
+    for namespace, cache in sorted(CACHES.items()):
+        cache_hits, cache_misses = getattr(cache, 'hits', None), getattr(cache, 'misses', None)
+        if cache_hits is None or cache_misses is None:
+            continue
+        labels = {'cache': namespace}
+        hits.append((labels, cache_hits))
+        misses.append((labels, cache_misses))
+        lookups = cache_hits + cache_misses
+        ratios.append((labels, round(cache_hits / lookups, 4) if lookups else 0.0))
+    return [
+        ('quiz_cache_hits_total', 'counter', 'Cache lookups answered from the cache.', hits),
+        ('quiz_cache_misses_total', 'counter', 'Cache lookups that went to the loader.', misses),
+        ('quiz_cache_hit_ratio', 'gauge', 'hits / (hits + misses) since process start.', ratios),
+    ]
+
+
+# ----------------- Flask ----------------- #
+def _start_request():
+    g._metrics_started = time.perf_counter()
+    g._metrics_queries = 0
+
+
+def _finish_request(response):
+    started = g.pop('_metrics_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint,
+                                method=request.method, status=str(response.status_code))
+        REQUEST_QUERIES.observe(g.pop('_metrics_queries', 0), endpoint=endpoint)
+    return response
+
+
+def metrics_view():
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def init_app(app):
+    """
+    Time every request per endpoint and serve GET /metrics (only when
+    METRICS_ENABLED=1). Register it before models.init_app so the timing
+    includes the end-of-request commit. Metrics are per process: scrape
+    each worker, or run one worker per scrape target.
+    """
+    if not ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+if ENABLED:
+    tracing.add_query_hook(_on_query)
+    registry.add_collector(_collect_caches)
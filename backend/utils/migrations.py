@@ -0,0 +1,67 @@
+# utils/migrations.py
+from utils.storage import dialect
+
+# Indexes added to database/schema.sql after tables were first created.
+# CREATE TABLE only builds them in new databases, so existing MySQL databases
+# are checked against this list at startup and brought up to date with
+# `flask --app app migrate-indexes`. SQLite needs neither: its schema script
+# uses CREATE INDEX IF NOT EXISTS and re-runs when a table is added.
+# (table, index name, columns, index kind)
+INDEXES = [
+    ('quizzes', 'idx_active_created', ('is_active', 'created_at', 'id'), 'INDEX'),
+    ('quizzes', 'idx_active_category_created', ('is_active', 'category_id', 'created_at', 'id'), 'INDEX'),
+    ('quizzes', 'ft_quiz_title', ('title',), 'FULLTEXT INDEX'),
+    ('quizzes', 'ft_quiz', ('title', 'description'), 'FULLTEXT INDEX'),
+    ('questions', 'ft_question', ('question_text', 'option_a', 'option_b', 'option_c', 'option_d'), 'FULLTEXT INDEX'),
+    ('attempts', 'idx_completed', ('completed_at', 'started_at'), 'INDEX'),
+]
+
+
+def existing_indexes(conn):
+    """{(table, index name): (columns, ...)} of the current MySQL database."""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT table_name, index_name, column_name
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+            ORDER BY table_name, index_name, seq_in_index
+        """)
+        indexes = {}
+        for table, name, column in cur.fetchall():
+            indexes.setdefault((table.lower(), name.lower()), []).append(column.lower())
+        return {key: tuple(columns) for key, columns in indexes.items()}
+    finally:
+        cur.close()
+
+
+def missing_indexes(conn):
+    """Entries of INDEXES that are absent, or present with other columns."""
+    if dialect.name != 'mysql':
+        return []
+    return _missing(existing_indexes(conn))
+
+
+def _missing(existing):
+    return [index for index in INDEXES if existing.get(index[:2]) != index[2]]
+
+
+def add_missing_indexes(conn):
+    """
+    Create (or rebuild) every missing index; safe to re-run. One ALTER per
+    index, as InnoDB builds only one FULLTEXT index per statement. Returns
+    the names of the indexes that were changed.
+    """
+    if dialect.name != 'mysql':
+        return []
+    existing = existing_indexes(conn)
+    changed = []
+    cur = conn.cursor()
+    try:
+        for table, name, columns, kind in _missing(existing):
+            drop = f"DROP INDEX {name}, " if (table, name) in existing else ""
+            cur.execute(f"ALTER TABLE {table} {drop}ADD {kind} {name} ({', '.join(columns)})")
+            changed.append(name)
+        return changed
+    finally:
+        cur.close()
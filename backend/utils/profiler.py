@@ -0,0 +1,161 @@
+# utils/profiler.py
+import cProfile
+import json
+import os
+import pstats
+import time
+
+from flask import Response, g, has_app_context, has_request_context, request
+
+from utils import tracing
+
+# QUERY_PROFILER=1: slow-query log (statements at or above SLOW_QUERY_MS,
+# with parameters and EXPLAIN; SLOW_QUERY_MS=0 logs every statement), and
+# requests sent with "X-Query-Profile: 1" log all of their statements.
+# REQUEST_PROFILER=1: any request with ?profile=1 answers with a cProfile
+# summary instead of its normal response. Development/staging tools: the
+# logs contain query parameters and the profile exposes code paths.
+QUERY_PROFILER = os.getenv('QUERY_PROFILER', '0') == '1'
+REQUEST_PROFILER = os.getenv('REQUEST_PROFILER', '0') == '1'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG')        # file path; stdout when unset
+PROFILE_TOP = int(os.getenv('PROFILE_TOP', 40))
+PROFILE_HEADER = 'X-Query-Profile'
+
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+MAX_PARAMS_LENGTH = 500
+
+# Opens an untraced connection for EXPLAIN (set by models: a separate
+# connection, so a statement's unread results are never disturbed).
+explain_connector = None
+explain_prefix = 'EXPLAIN '
+
+
+def _loggable(params):
+    text = repr(params)
+    return text if len(text) <= MAX_PARAMS_LENGTH else text[:MAX_PARAMS_LENGTH] + '...'
+
+
+def explain(operation, params):
+    """EXPLAIN rows for a statement, or None when it cannot be explained."""
+    verb = operation.lstrip().split(None, 1)[0].upper() if operation.strip() else ''
+    if explain_connector is None or verb not in EXPLAINABLE:
+        return None
+    conn = None
+    try:
+        conn = explain_connector()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(explain_prefix + operation, params)
+        return cur.fetchall()
+    except Exception as e:
+        print(f"[utils.profiler.explain] Error: {e}")
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def write_log(record):
+    line = json.dumps(record, default=str)
+    if not SLOW_QUERY_LOG:
+        print(f"[query profile] {line}")
+        return
+    try:
+        with open(SLOW_QUERY_LOG, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except OSError as e:
+        print(f"[utils.profiler.write_log] Error: {e}")
+
+
+def _on_query(operation, params, seconds):
+    queries = g.get('_profiled_queries') if has_app_context() else None
+    slow = QUERY_PROFILER and seconds * 1000 >= SLOW_QUERY_MS
+    if queries is None and not slow:
+        return
+    entry = {'sql': ' '.join(operation.split()), 'params': _loggable(params), 'ms': round(seconds * 1000, 3)}
+    if slow:
+        # executemany() passes a sequence of parameter sets: nothing to explain
+        is_many = isinstance(params, list) and params and isinstance(params[0], (list, tuple, dict))
+        entry['explain'] = None if is_many else explain(operation, params)
+        write_log(dict(entry, slow=True, endpoint=request.endpoint if has_request_context() else None))
+    if queries is not None:
+        queries.append(entry)
+
+
+# ----------------- Flask ----------------- #
+def _start_request():
+    profiling = REQUEST_PROFILER and request.args.get('profile') == '1'
+    if profiling or (QUERY_PROFILER and request.headers.get(PROFILE_HEADER) == '1'):
+        g._profiled_queries = []
+        g._profile_started = time.perf_counter()
+    if profiling:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:  # another profiler is already active in this thread
+            print(f"[utils.profiler._start_request] Error: {e}")
+            return
+        g._request_profiler = profiler
+
+
+def _finish_request(response):
+    queries = g.pop('_profiled_queries', None)
+    if queries is None:
+        return response
+    elapsed_ms = round((time.perf_counter() - g.pop('_profile_started')) * 1000, 3)
+    query_ms = round(sum(q['ms'] for q in queries), 3)
+    profiler = g.pop('_request_profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        return _profile_response(profiler, response, elapsed_ms, query_ms, queries)
+
+    write_log({'method': request.method, 'path': request.full_path, 'endpoint': request.endpoint,
+               'status': response.status_code, 'ms': elapsed_ms, 'query_ms': query_ms, 'queries': queries})
+    response.headers['X-Query-Count'] = str(len(queries))
+    response.headers['X-Query-Time-Ms'] = str(query_ms)
+    return response
+
+
+def _profile_response(profiler, response, elapsed_ms, query_ms, queries):
+    """The ?profile=1 answer: hottest functions by cumulative time plus every statement."""
+    stats = pstats.Stats(profiler)
+    stats.sort_stats('cumulative')
+    functions = []
+    for func in stats.fcn_list[:PROFILE_TOP]:
+        primitive_calls, calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        functions.append({
+            'function': name if filename == '~' else f'{name} ({_short_path(filename)}:{line})',
+            'calls': calls if calls == primitive_calls else f'{calls}/{primitive_calls}',
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+    payload = {
+        'status': response.status_code,
+        'elapsed_ms': elapsed_ms,
+        'query_count': len(queries),
+        'query_ms': query_ms,
+        'queries': queries,
+        'functions': functions,
+    }
+    return Response(json.dumps(payload, indent=2, default=str), mimetype='application/json')
+
+
+def _short_path(filename):
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+
+def init_app(app):
+    """
+    Register the profiling hooks (only when QUERY_PROFILER or REQUEST_PROFILER
+    is set). Register it before models.init_app so the commit is included.
+    """
+    if not (QUERY_PROFILER or REQUEST_PROFILER):
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+if QUERY_PROFILER or REQUEST_PROFILER:
+    tracing.add_query_hook(_on_query)
@@ -0,0 +1,131 @@
+# utils/question_io.py
+import csv
+import io
+import json
+
+FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option', 'points')
+REQUIRED = FIELDS[:-1]
+FORMATS = ('csv', 'jsonl')
+
+
+INVALID_UTF8 = 'Invalid UTF-8'
+
+
+class RowError(Exception):
+    """A single import row failed to parse or validate."""
+
+
+def _undecodable(value):
+    """Whether text decoded with errors='surrogateescape' (or a list of it) held invalid bytes."""
+    if isinstance(value, list):
+        return any(_undecodable(item) for item in value)
+    if not isinstance(value, str):
+        return False
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def detect_format(content_type, explicit=None):
+    """Pick 'csv' or 'jsonl' from a ?format= value or the request Content-Type."""
+    if explicit:
+        return explicit if explicit in FORMATS else None
+    content_type = (content_type or '').lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'ndjson' in content_type or 'jsonl' in content_type or 'json-lines' in content_type:
+        return 'jsonl'
+    return None
+
+
+def iter_rows(stream, fmt):
+    """
+    Parse an uploaded byte stream incrementally, one record at a time.
+    Yields (line_number, dict) or (line_number, RowError) so one bad line
+    does not abort the whole import. A UTF-8 byte order mark is skipped;
+    bytes that are not UTF-8 make only their record fail.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='surrogateescape', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            if any(_undecodable(value) for item in row.items() for value in item):
+                yield reader.line_num, RowError(INVALID_UTF8)
+            else:
+                yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if _undecodable(line):
+            yield line_no, RowError(INVALID_UTF8)
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(row, dict):
+            yield line_no, RowError('Each line must be a JSON object')
+            continue
+        yield line_no, row
+
+
+def validate_row(row):
+    """
+    Apply the same rules as POST /api/admin/questions to one record and
+    return the column values in FIELDS order. Raises RowError.
+    """
+    values = {name: row.get(name) for name in FIELDS}
+    for name in REQUIRED:
+        if isinstance(values[name], str):
+            values[name] = values[name].strip()
+    if not all(values[name] for name in REQUIRED):
+        raise RowError('All fields are required')
+    if values['correct_option'] not in ['A', 'B', 'C', 'D']:
+        raise RowError('Correct option must be A, B, C, or D')
+    values['points'] = parse_points(values['points'])
+    return tuple(values[name] for name in FIELDS)
+
+
+def parse_points(value, default=10):
+    """
+    Points of a question as a positive int ("10" and 10.0 are accepted);
+    `default` when missing (required when default is None). Raises RowError.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if default is None:
+            raise RowError('Points must be a positive integer')
+        return default
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise RowError('Points must be a positive integer')
+    try:
+        points = int(value)
+    except (TypeError, ValueError):
+        raise RowError('Points must be a positive integer')
+    if points < 1:
+        raise RowError('Points must be a positive integer')
+    return points
+
+
+def export_lines(questions, fmt):
+    """Serialize question dicts lazily, one chunk per question (plus a CSV header)."""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(('id',) + FIELDS)
+        for q in questions:
+            writer.writerow([q['id']] + [q[name] for name in FIELDS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+
+    for q in questions:
+        yield json.dumps({'id': q['id'], **{name: q[name] for name in FIELDS}}) + '\n'
@@ -0,0 +1,166 @@
+# utils/ranking.py
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+
+
+class RankIndex:
+    """
+    Order-statistic index over (score tuple, user_id).
+
+    Entries are kept in one sorted list of keys (-s1, -s2, ..., user_id), so
+    the best score sorts first and ties are broken by user id. rank() and
+    page() are binary searches (O(log n)); update() is a bisect + list insert,
+    which is a memmove and stays cheap for the board sizes we deal with.
+    load() fills a whole board with one sort.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._by_user = {}
+        self._extra = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    @staticmethod
+    def _key(user_id, scores):
+        return tuple(-float(s or 0) for s in scores) + (user_id,)
+
+    def load(self, entries):
+        """Replace the contents with (user_id, scores, extra) entries: one O(n log n) sort."""
+        by_user = {}
+        extras = {}
+        for user_id, scores, extra in entries:
+            by_user[user_id] = self._key(user_id, scores)
+            if extra is not None:
+                extras[user_id] = extra
+        keys = sorted(by_user.values())
+        with self._lock:
+            self._keys = keys
+            self._by_user = by_user
+            self._extra = extras
+
+    def update(self, user_id, scores, extra=None):
+        """Insert or move a user. `scores` is a tuple, compared lexicographically, higher is better."""
+        key = self._key(user_id, scores)
+        with self._lock:
+            old = self._by_user.get(user_id)
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+            insort(self._keys, key)
+            self._by_user[user_id] = key
+            if extra is not None:
+                self._extra[user_id] = extra
+
+    def get(self, user_id):
+        """Return (scores, extra) for a user, or None."""
+        with self._lock:
+            key = self._by_user.get(user_id)
+            if key is None:
+                return None
+            return tuple(-s for s in key[:-1]), self._extra.get(user_id, {})
+
+    def rank(self, user_id):
+        """1-based competition rank (tied scores share a rank), or None if absent."""
+        with self._lock:
+            key = self._by_user.get(user_id)
+            if key is None:
+                return None
+            # Everything strictly better than this score tuple, whatever its user id
+            return bisect_left(self._keys, key[:-1]) + 1
+
+    def page(self, after=None, limit=10):
+        """
+        Keyset pagination: up to `limit` entries after the cursor key `after`
+        (as returned in a previous page), best first.
+        Returns ([(rank, user_id, scores, extra), ...], next_cursor).
+        """
+        with self._lock:
+            start = 0 if after is None else bisect_right(self._keys, tuple(after))
+            keys = self._keys[start:start + limit]
+            entries = []
+            for key in keys:
+                scores = key[:-1]
+                user_id = key[-1]
+                entries.append((
+                    bisect_left(self._keys, scores) + 1,
+                    user_id,
+                    tuple(-s for s in scores),
+                    self._extra.get(user_id, {}),
+                ))
+            has_more = start + limit < len(self._keys)
+        next_cursor = keys[-1] if keys and has_more else None
+        return entries, next_cursor
+
+
+def encode_cursor(key):
+    return None if key is None else ','.join(repr(part) for part in key)
+
+
+def decode_cursor(value):
+    """Parse a cursor produced by encode_cursor(); raises ValueError if malformed."""
+    if not value:
+        return None
+    parts = value.split(',')
+    return tuple(float(p) for p in parts[:-1]) + (int(parts[-1]),)
+
+
+class BoardRegistry:
+    """
+    Lazily built RankIndex per board name ('global', 'quiz:<id>',
+    'category:<id>'). A board is loaded with loader(name) -> iterable of
+    (user_id, scores, extra), patched in place by this process's own
+    submissions, and rebuilt after `ttl` seconds to pick up writes made by
+    other worker processes.
+
+    Each board has one load in flight at a time: while a stale board is
+    rebuilt the other threads keep reading the stale one, and threads
+    asking for a board that is not loaded yet wait for the first load.
+    """
+
+    def __init__(self, loader, ttl=60, max_boards=512):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_boards = max_boards
+        self._boards = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._boards.get(name)
+            loading = self._loading.setdefault(name, threading.Lock())
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+
+        if not loading.acquire(blocking=entry is None):
+            return entry[1]                       # being rebuilt by another thread
+        try:
+            with self._lock:
+                current = self._boards.get(name)
+            if current is not None and time.monotonic() - current[0] < self.ttl:
+                return current[1]                 # loaded while we waited
+            loaded_at = time.monotonic()
+            index = RankIndex()
+            index.load(self._loader(name))
+            with self._lock:
+                if len(self._boards) >= self.max_boards and name not in self._boards:
+                    oldest = min(self._boards, key=lambda n: self._boards[n][0])
+                    del self._boards[oldest]
+                    self._loading.pop(oldest, None)
+                self._boards[name] = (loaded_at, index)
+            return index
+        finally:
+            loading.release()
+
+    def loaded(self, name):
+        """Return the board if it is already in memory (never triggers a load)."""
+        with self._lock:
+            entry = self._boards.get(name)
+        return entry[1] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._boards.clear()
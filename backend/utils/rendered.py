@@ -0,0 +1,82 @@
+# utils/rendered.py
+import gzip
+import hashlib
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from flask import Response, request
+from werkzeug.http import http_date
+
+from utils.http_cache import matches
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+
+class RenderedJSON:
+    """
+    A JSON payload serialized once, with pre-compressed variants and a
+    strong ETag derived from the bytes. Cache it and serve it with
+    rendered_response() instead of calling jsonify() per request.
+    """
+
+    def __init__(self, payload):
+        # Same output as jsonify() outside debug mode
+        self.body = (json.dumps(payload, separators=(',', ':'), sort_keys=True, default=_default)
+                     + '\n').encode('utf-8')
+        self.etag = '"%s"' % hashlib.sha256(self.body).hexdigest()[:32]
+        self.encoded = {'gzip': gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encoded['br'] = brotli.compress(self.body)
+        # Only keep variants that are actually smaller
+        self.encoded = {coding: data for coding, data in self.encoded.items() if len(data) < len(self.body)}
+
+    def negotiate(self, accept_encoding):
+        """Return (content_encoding or None, bytes) for an Accept-Encoding header."""
+        accepted = _accepted_codings(accept_encoding)
+        for coding in ('br', 'gzip'):
+            if coding in accepted and coding in self.encoded:
+                return coding, self.encoded[coding]
+        return None, self.body
+
+    def matches(self, if_none_match):
+        return matches(if_none_match, self.etag)
+
+
+def _default(o):
+    """The types Flask's JSON provider handles beyond plain json."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (Decimal, UUID)):
+        return str(o)
+    if is_dataclass(o):
+        return asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def _accepted_codings(header):
+    codings = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '').lower() in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        codings.add(coding.strip().lower())
+    return codings
+
+
+def rendered_response(rendered, cache_control='private, no-cache'):
+    """Serve a RenderedJSON for the current request: 304 on a matching If-None-Match."""
+    headers = {'ETag': rendered.etag, 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+    if rendered.matches(request.headers.get('If-None-Match')):
+        return Response(status=304, headers=headers)
+    coding, data = rendered.negotiate(request.headers.get('Accept-Encoding'))
+    if coding:
+        headers['Content-Encoding'] = coding
+    return Response(data, status=200, mimetype='application/json', headers=headers)
@@ -0,0 +1,27 @@
+# utils/search.py
+import os
+import re
+
+# InnoDB ignores shorter tokens (innodb_ft_min_token_size); keep in sync with the server.
+MIN_TOKEN_SIZE = int(os.getenv('FT_MIN_TOKEN_SIZE', 3))
+MAX_TERMS = 8
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def boolean_query(text):
+    """
+    Turn free text into a MySQL BOOLEAN MODE query: every word is required
+    and matched as a prefix ("+alge* +line*"). Operator characters are
+    dropped, so user input cannot change the query syntax. Returns None when
+    no searchable word is left.
+    """
+    words = [w for w in _WORD.findall((text or '').lower()) if len(w) >= MIN_TOKEN_SIZE]
+    if not words:
+        return None
+    return ' '.join(f'+{word}*' for word in dict.fromkeys(words[:MAX_TERMS]))
+
+
+def query_terms(query):
+    """The words of a boolean_query() string ("+alge* +line*" -> ['alge', 'line'])."""
+    return _WORD.findall(query or '')
@@ -0,0 +1,256 @@
+# utils/storage.py
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+
+from utils.search import query_terms
+
+try:
+    import mysql.connector
+except ImportError:  # optional with DB_BACKEND=sqlite
+    mysql = None
+
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'quiz_app.db')
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 30))
+SQLITE_SCHEMA = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'schema_sqlite.sql')
+SQLITE_NEWEST_TABLE = 'table_versions'    # last table added to the schema script
+
+
+# ----------------- dialects ----------------- #
+class MySQLDialect:
+    """SQL that differs between engines. The models are written in MySQL; this is the identity."""
+    name = 'mysql'
+    explain = 'EXPLAIN '
+
+    def match(self, columns, query):
+        """(sql, params) of a full-text condition for a utils.search.boolean_query() string."""
+        return f"MATCH({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)", [query]
+
+    def relevance(self, columns, query):
+        """(sql, params) of a numeric relevance expression for the same query."""
+        return self.match(columns, query)
+
+
+class SQLiteDialect(MySQLDialect):
+    """
+    No FULLTEXT index: every term must occur in one of the columns
+    (case-insensitive substring), and relevance counts the matches.
+    """
+    name = 'sqlite'
+    explain = 'EXPLAIN QUERY PLAN '
+
+    def match(self, columns, query):
+        terms = query_terms(query) or ['']
+        sql = ' AND '.join(
+            '(' + ' OR '.join(f'instr(lower({column}), %s) > 0' for column in columns) + ')' for _ in terms
+        )
+        return f'({sql})', [term for term in terms for _ in columns]
+
+    def relevance(self, columns, query):
+        terms = query_terms(query) or ['']
+        sql = ' + '.join(f'(instr(lower({column}), %s) > 0)' for _ in terms for column in columns)
+        return f'({sql})', [term for term in terms for _ in columns]
+
+
+# ----------------- SQLite translation ----------------- #
+_PARAM = re.compile(r'%%|%s')
+_FOR_UPDATE = re.compile(r'\s+FOR\s+UPDATE\b', re.IGNORECASE)
+_UPSERT = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_REF = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_FUNCTIONS = {'GREATEST(': 'MAX(', 'LEAST(': 'MIN('}
+
+
+@lru_cache(maxsize=1024)
+def translate(operation):
+    """
+    Rewrite a MySQL statement of the models for SQLite; returns (sql, locks).
+    Placeholders become ?, INSERT IGNORE becomes INSERT OR IGNORE, ON DUPLICATE
+    KEY UPDATE ... VALUES(col) becomes ON CONFLICT DO UPDATE SET ... excluded.col
+    and GREATEST/LEAST the scalar MAX/MIN. FOR UPDATE is dropped; `locks` tells
+    the caller to take SQLite's write lock up front instead.
+    """
+    sql, locks = _FOR_UPDATE.subn('', operation)
+    sql = _PARAM.sub(lambda m: '%' if m.group() == '%%' else '?', sql)
+    sql = re.sub(r'\bINSERT\s+IGNORE\b', 'INSERT OR IGNORE', sql, flags=re.IGNORECASE)
+    upsert = _UPSERT.search(sql)
+    if upsert:
+        head, tail = sql[:upsert.start()], sql[upsert.end():]
+        tail = _VALUES_REF.sub(r'excluded.\1', tail)
+        for mysql_name, sqlite_name in _FUNCTIONS.items():
+            tail = re.sub(re.escape(mysql_name), sqlite_name, tail, flags=re.IGNORECASE)
+        sql = f'{head}ON CONFLICT DO UPDATE SET{tail}'
+    return sql, bool(locks)
+
+
+def _adapt_datetime(value):
+    # Same text as CURRENT_TIMESTAMP, so stored values compare and sort correctly
+    return value.isoformat(' ')
+
+
+def _convert_timestamp(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('TIMESTAMP', _convert_timestamp)
+
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3: %s parameters, optional dict rows."""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, operation, params=None, **kwargs):
+        sql, locks = translate(operation)
+        if locks and not self._connection.raw.in_transaction:
+            # SELECT ... FOR UPDATE: take the write lock now, so the read and
+            # the writes that follow it cannot interleave with another writer.
+            self._connection.raw.execute('BEGIN IMMEDIATE')
+        self._cursor.execute(sql, tuple(params) if params is not None else ())
+
+    def executemany(self, operation, seq_params, **kwargs):
+        sql, _ = translate(operation)
+        self._cursor.executemany(sql, [tuple(params) for params in seq_params])
+
+    def _rows(self, rows):
+        if not self._dictionary or not rows:
+            return rows
+        names = [column[0] for column in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._rows([row])[0]
+
+    def fetchmany(self, size=1):
+        return self._rows(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """The part of the mysql.connector connection API the models use, over sqlite3."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self, dictionary)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        self.raw.execute('SELECT 1')
+
+    def close(self):
+        self.raw.close()
+
+
+# ----------------- backends ----------------- #
+class MySQLBackend:
+    dialect = MySQLDialect()
+
+    def connect(self):
+        """Open a raw MySQL connection using environment vars with sensible defaults."""
+        if mysql is None:
+            raise RuntimeError("DB_BACKEND=mysql requires the 'mysql-connector-python' package")
+        return mysql.connector.connect(
+            host=os.getenv('MYSQL_HOST', 'localhost'),
+            user=os.getenv('MYSQL_USER', 'quiz_user'),
+            password=os.getenv('MYSQL_PASSWORD', 'quiz_pass'),
+            database=os.getenv('MYSQL_DB', 'quiz_app'),
+            autocommit=False
+        )
+
+
+class SQLiteBackend:
+    """
+    Embedded database file in WAL mode: readers never block the (single)
+    writer, and writers wait up to SQLITE_BUSY_TIMEOUT seconds for each
+    other. The schema is created on first use. Needs SQLite 3.35+ (UPSERT
+    without a conflict target, RETURNING).
+    """
+    dialect = SQLiteDialect()
+
+    def __init__(self, path=SQLITE_PATH, busy_timeout=SQLITE_BUSY_TIMEOUT):
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            raise RuntimeError(f"DB_BACKEND=sqlite needs SQLite 3.35 or newer, found {sqlite3.sqlite_version}")
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def connect(self):
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                              check_same_thread=False)   # pooled: used by one thread at a time
+        raw.execute('PRAGMA journal_mode=WAL')
+        raw.execute('PRAGMA synchronous=NORMAL')
+        raw.execute('PRAGMA foreign_keys=ON')
+        self._ensure_schema(raw)
+        return SQLiteConnection(raw)
+
+    def _ensure_schema(self, raw):
+        if self._schema_ready:
+            return
+        with self._lock:
+            if self._schema_ready:
+                return
+            # The script is idempotent: also adds tables newer than the database
+            newest = raw.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                 (SQLITE_NEWEST_TABLE,)).fetchone()
+            if newest is None:
+                with open(SQLITE_SCHEMA, encoding='utf-8') as f:
+                    raw.executescript(f.read())
+            self._schema_ready = True
+
+
+def build_storage(backend=DB_BACKEND):
+    """The storage backend selected by DB_BACKEND (mysql, the default, or sqlite)."""
+    if backend == 'mysql':
+        return MySQLBackend()
+    if backend == 'sqlite':
+        return SQLiteBackend()
+    raise ValueError(f"Unknown DB_BACKEND: {backend}")
+
+
+storage = build_storage()
+dialect = storage.dialect
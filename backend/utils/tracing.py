@@ -0,0 +1,69 @@
+# utils/tracing.py
+import time
+
+# Called as hook(sql, params, seconds) after every statement run on a traced
+# connection. Registered once at import time (utils.metrics, ...); with no
+# hooks, connections are not wrapped at all.
+_hooks = []
+
+
+def add_query_hook(hook):
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def enabled():
+    return bool(_hooks)
+
+
+def trace(conn):
+    """Wrap a raw DB-API connection so its cursors report to the query hooks."""
+    return TracedConnection(conn) if _hooks else conn
+
+
+def _notify(operation, params, seconds):
+    for hook in _hooks:
+        try:
+            hook(operation, params, seconds)
+        except Exception as e:
+            print(f"[utils.tracing._notify] Error: {e}")
+
+
+class TracedConnection:
+    """Connection proxy whose cursors are TracedCursors; everything else is forwarded."""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return TracedCursor(self._raw.cursor(*args, **kwargs))
+
+
+class TracedCursor:
+    """Cursor proxy timing execute()/executemany(); everything else is forwarded."""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def execute(self, operation, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.execute(operation, params, **kwargs)
+        finally:
+            _notify(operation, params, time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.executemany(operation, seq_params, **kwargs)
+        finally:
+            _notify(operation, seq_params, time.perf_counter() - started)
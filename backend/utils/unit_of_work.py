@@ -0,0 +1,125 @@
+# utils/unit_of_work.py
+import contextvars
+from contextlib import contextmanager
+
+# Unit of work explicitly opened with session_scope() (scripts, background jobs)
+_current = contextvars.ContextVar('unit_of_work', default=None)
+
+
+class UnitOfWork:
+    """
+    One pooled connection and one transaction shared by every model call made
+    while it is active. Model methods keep calling commit()/rollback()/close()
+    as before; through SessionConnection those become "mark dirty",
+    "mark failed" and no-op, and the real commit happens once in finish().
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.dirty = False
+        self.failed = False
+        self.closed = False
+        self._after_commit = []
+        self._after_rollback = []
+
+    def connection(self):
+        return SessionConnection(self)
+
+    def after_commit(self, callback):
+        """Run callback once the transaction has been committed (dropped on rollback)."""
+        self._after_commit.append(callback)
+
+    def after_rollback(self, callback):
+        """Run callback if the unit ends without committing (rolled back, failed or abandoned)."""
+        self._after_rollback.append(callback)
+
+    def finish(self, success=True):
+        """
+        Commit pending writes (or roll them back) and fire the after-commit
+        callbacks. A successful unit with nothing to write counts as
+        committed: its callbacks may depend on writes made elsewhere
+        (e.g. queued for write-behind).
+        """
+        if self.closed:
+            return
+        if success and not self.failed:
+            if self.dirty:
+                self._conn.commit()
+                self.dirty = False
+            self._after_rollback = []
+            callbacks, self._after_commit = self._after_commit, []
+            _run_callbacks(callbacks, 'after_commit')
+        else:
+            self._rollback()
+
+    def close(self):
+        """Roll back anything not finished and return the connection to the pool."""
+        if self.closed:
+            return
+        if self.dirty or self._after_rollback:
+            self._rollback()
+        self.closed = True
+        self._conn.close()
+
+    def _rollback(self):
+        self._after_commit = []
+        self.dirty = False
+        try:
+            self._conn.rollback()
+        except Exception as e:
+            print(f"[unit_of_work.rollback] Error: {e}")
+        callbacks, self._after_rollback = self._after_rollback, []
+        _run_callbacks(callbacks, 'after_rollback')
+
+
+def _run_callbacks(callbacks, kind):
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"[unit_of_work.{kind}] Error: {e}")
+
+
+class SessionConnection:
+    """Connection proxy handed to model methods while a unit of work is active."""
+
+    def __init__(self, uow):
+        self._uow = uow
+
+    def __getattr__(self, name):
+        return getattr(self._uow._conn, name)
+
+    def commit(self):
+        self._uow.dirty = True
+
+    def rollback(self):
+        # A failed statement poisons the whole unit: undo now, and make sure
+        # finish() does not commit whatever runs after it.
+        self._uow.failed = True
+        self._uow._rollback()
+
+    def close(self):
+        pass
+
+
+def current_unit_of_work():
+    return _current.get()
+
+
+@contextmanager
+def session_scope(conn):
+    """
+    Bind a unit of work on `conn` to the current context for the duration of
+    the block; commit on normal exit, roll back on exception.
+    """
+    uow = UnitOfWork(conn)
+    token = _current.set(uow)
+    try:
+        yield uow
+        uow.finish(success=True)
+    except Exception:
+        uow.finish(success=False)
+        raise
+    finally:
+        _current.reset(token)
+        uow.close()
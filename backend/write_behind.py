@@ -0,0 +1,318 @@
+# write_behind.py
+import atexit
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import uuid
+from datetime import datetime
+
+from models import Attempt, db_session
+
+ENABLED = os.getenv('WRITE_BEHIND', '0') == '1'
+QUEUE_SIZE = int(os.getenv('WRITE_BEHIND_QUEUE_SIZE', 10000))
+BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 500))
+FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', 0.5))
+ID_BLOCK_SIZE = int(os.getenv('WRITE_BEHIND_ID_BLOCK', 1000))
+# Base name of the spill files: each process spills to <base>.<pid>.jsonl
+SPILL_FILE = os.path.abspath(os.getenv('WRITE_BEHIND_SPILL_FILE',
+                                       os.path.join(os.path.dirname(__file__), 'write_behind_spill.jsonl')))
+
+
+class WriteBehindQueue:
+    """
+    Optional write-behind pipeline for attempt rows (WRITE_BEHIND=1).
+
+    start_quiz / submit_quiz enqueue an operation and return at once; a
+    background thread drains the queue every FLUSH_INTERVAL seconds (or as
+    soon as BATCH_SIZE operations are waiting) and writes each batch in one
+    transaction: runs of attempt creations become one multi-row INSERT,
+    completions go through Attempt.complete_attempt.
+
+    Attempt ids are handed out from blocks reserved in id_blocks, so a new
+    attempt's id is known before its row exists. Each block starts above
+    the highest attempt id at the time it is reserved.
+
+    The queue is bounded: when full, callers write synchronously instead.
+    A batch that fails to write, and anything left at shutdown, is appended
+    to this process's spill file (SPILL_FILE with the pid added) and
+    replayed by the flusher once the database is back, together with a
+    replay that was interrupted and, on POSIX, the spill files of worker
+    processes that have exited.
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, spill_file=SPILL_FILE):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        root, ext = os.path.splitext(spill_file)
+        self._spill_root, self._spill_ext = root, ext or '.jsonl'
+        self._spill_pattern = re.compile(
+            re.escape(os.path.basename(root)) + r'\.(\d+)' + re.escape(self._spill_ext) + r'(\.replay|\.claimed\.\w+)?$'
+        )
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._ids = iter(())
+        self._ids_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    # ----------------- producers ----------------- #
+    def create_attempt(self, user_id, quiz_id):
+        """Allocate an attempt id and enqueue the INSERT. Returns the id (None on failure)."""
+        try:
+            attempt_id = self._next_id()
+        except Exception as e:
+            print(f"[write_behind.create_attempt] Error reserving ids: {e}")
+            return None
+        op = {'op': 'create', 'id': attempt_id, 'user_id': user_id, 'quiz_id': quiz_id,
+              'at': datetime.utcnow().isoformat()}
+        if not self._offer(op):
+            with db_session():
+                Attempt.create_attempts_bulk([_create_row(op)])
+        return attempt_id
+
+    def complete_attempt(self, attempt_id, score, total_questions, answers):
+        """Enqueue an attempt completion. Returns True once it is queued or written."""
+        op = {'op': 'complete', 'id': attempt_id, 'score': score, 'total': total_questions,
+              'answers': [list(pair) for pair in answers], 'at': datetime.utcnow().isoformat()}
+        if self._offer(op):
+            return True
+        return Attempt.complete_attempt(attempt_id, score, total_questions, answers=op['answers'])
+
+    def _offer(self, op):
+        self._ensure_flusher()
+        try:
+            self._queue.put_nowait(op)
+        except queue.Full:
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wake()
+        return True
+
+    def _next_id(self):
+        with self._ids_lock:
+            attempt_id = next(self._ids, None)
+            if attempt_id is None:
+                with db_session():
+                    self._ids = iter(Attempt.reserve_ids(ID_BLOCK_SIZE))
+                attempt_id = next(self._ids)
+            return attempt_id
+
+    # ----------------- consumer ----------------- #
+    @property
+    def spill_file(self):
+        """This process's spill file (per pid: workers never append to the same file)."""
+        return f'{self._spill_root}.{os.getpid()}{self._spill_ext}'
+
+    def flush(self):
+        """Write everything queued (and any spilled batches). Returns the number of ops written."""
+        with self._flush_lock:
+            try:
+                written = self._replay_spill()
+            except Exception as e:
+                print(f"[write_behind.flush] Error replaying the spill files: {e}")
+                written = 0
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return written
+                try:
+                    _write_batch(batch)
+                    written += len(batch)
+                except Exception as e:
+                    print(f"[write_behind.flush] Error, spilling {len(batch)} ops: {e}")
+                    self._spill(batch)
+                    return written
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _spill(self, ops):
+        with open(self.spill_file, 'a', encoding='utf-8') as f:
+            for op in ops:
+                f.write(json.dumps(op) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _collect_spills(self):
+        """
+        Append our spill file and the claimed spills of exited workers to our
+        .replay file (which may remain from an interrupted replay) and return
+        its path, or None when nothing is waiting.
+        """
+        replaying = self.spill_file + '.replay'
+        sources = self._claim_orphans()
+        if os.path.exists(self.spill_file):
+            sources.append(self.spill_file)
+        if sources:
+            with open(replaying, 'a', encoding='utf-8') as out:
+                for path in sources:
+                    with open(path, encoding='utf-8') as f:
+                        for line in f:
+                            out.write(line if line.endswith('\n') else line + '\n')
+                out.flush()
+                os.fsync(out.fileno())
+            for path in sources:
+                os.remove(path)
+        return replaying if os.path.exists(replaying) else None
+
+    def _claim_orphans(self):
+        """Take over (rename to a name of ours) the spill files left by processes that are gone."""
+        claimed = []
+        me = os.getpid()
+        for path in glob.glob(glob.escape(self._spill_root) + '.*'):
+            match = self._spill_pattern.match(os.path.basename(path))
+            if not match or int(match.group(1)) == me or _process_alive(int(match.group(1))):
+                continue
+            target = f'{self.spill_file}.claimed.{uuid.uuid4().hex}'
+            try:
+                os.replace(path, target)   # atomic: only one worker wins each file
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+        # Claims of ours that an earlier, interrupted collect left behind
+        claimed.extend(p for p in glob.glob(glob.escape(self.spill_file) + '.claimed.*') if p not in claimed)
+        return claimed
+
+    def _replay_spill(self):
+        replaying = self._collect_spills()
+        if replaying is None:
+            return 0
+        ops, unreadable = [], []
+        with open(replaying, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    unreadable.append(line.rstrip('\n'))
+        written = 0
+        failed = []
+        for start in range(0, len(ops), self.batch_size):
+            batch = ops[start:start + self.batch_size]
+            try:
+                _write_batch(batch)
+                written += len(batch)
+                continue
+            except Exception as e:
+                print(f"[write_behind.replay] Batch failed, retrying ops one by one: {e}")
+            batch_failed = []
+            for op in batch:
+                try:
+                    _write_batch([op])
+                    written += 1
+                except Exception:
+                    batch_failed.append(op)
+            if len(batch_failed) == len(batch):
+                # Nothing goes through: the database is still unavailable.
+                self._spill(ops[start:])
+                break
+            failed.extend(batch_failed)
+        if failed or unreadable:
+            # The database works but these ops cannot be applied: park them for inspection.
+            with open(self._spill_root + '.failed' + self._spill_ext, 'a', encoding='utf-8') as f:
+                for op in failed:
+                    f.write(json.dumps(op) + '\n')
+                for line in unreadable:
+                    f.write(line + '\n')
+        os.remove(replaying)
+        return written
+
+    def _wake(self):
+        self._wakeup.set()
+
+    def _ensure_flusher(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._wakeup = threading.Event()
+            threading.Thread(target=self._run, name='write-behind-flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:   # e.g. the spill file cannot be written: keep the flusher alive
+                print(f"[write_behind._run] Error: {e}")
+
+    def shutdown(self):
+        """Flush what we can; whatever cannot be written ends up in the spill file."""
+        self.flush()
+        with self._flush_lock:
+            remaining = self._drain()
+            while remaining:
+                self._spill(remaining)
+                remaining = self._drain()
+
+
+def _process_alive(pid):
+    """Whether a process exists (always assumed on Windows, where there is no signal-0 probe)."""
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _create_row(op):
+    return (op['id'], op['user_id'], op['quiz_id'], datetime.fromisoformat(op['at']))
+
+
+def _write_batch(ops):
+    """Apply ops in order in one transaction; consecutive creates share one INSERT."""
+    with db_session():
+        creates = []
+        for op in ops:
+            if op['op'] == 'create':
+                creates.append(_create_row(op))
+                continue
+            if creates:
+                Attempt.create_attempts_bulk(creates)
+                creates = []
+            ok = Attempt.complete_attempt(
+                op['id'], op['score'], op['total'],
+                answers=[tuple(pair) for pair in op['answers']],
+                completed_at=datetime.fromisoformat(op['at'])
+            )
+            if not ok:
+                raise RuntimeError(f"could not complete attempt {op['id']}")
+        if creates:
+            Attempt.create_attempts_bulk(creates)
+
+
+pipeline = WriteBehindQueue()
+if ENABLED:
+    atexit.register(pipeline.shutdown)
+
+
+def create_attempt(user_id, quiz_id):
+    """Start an attempt: queued when WRITE_BEHIND=1, written immediately otherwise."""
+    if ENABLED:
+        return pipeline.create_attempt(user_id, quiz_id)
+    return Attempt.create_attempt(user_id, quiz_id)
+
+
+def complete_attempt(attempt_id, score, total_questions, answers):
+    """Complete an attempt: queued when WRITE_BEHIND=1, written immediately otherwise."""
+    if ENABLED:
+        return pipeline.complete_attempt(attempt_id, score, total_questions, answers)
+    return Attempt.complete_attempt(attempt_id, score, total_questions, answers=answers)
@@ -48,7 +48,11 @@ CREATE TABLE IF NOT EXISTS quizzes (
     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL,
     FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_category (category_id),
-    INDEX idx_active (is_active)
+    INDEX idx_active (is_active),
+    INDEX idx_active_created (is_active, created_at, id),
+    INDEX idx_active_category_created (is_active, category_id, created_at, id),
+    FULLTEXT INDEX ft_quiz_title (title),
+    FULLTEXT INDEX ft_quiz (title, description)
 );
 
 -- ===========================
@@ -66,7 +70,8 @@ CREATE TABLE IF NOT EXISTS questions (
     points INT DEFAULT 10,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE,
-    INDEX idx_quiz (quiz_id)
+    INDEX idx_quiz (quiz_id),
+    FULLTEXT INDEX ft_question (question_text, option_a, option_b, option_c, option_d)
 );
 
 -- ===========================
@@ -84,7 +89,107 @@ CREATE TABLE IF NOT EXISTS attempts (
     FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE,
     INDEX idx_user (user_id),
     INDEX idx_quiz (quiz_id),
-    INDEX idx_completed (completed_at)
+    INDEX idx_completed (completed_at, started_at)
+);
+
+-- ===========================
+-- Id Blocks Table (hi-lo id allocation for WRITE_BEHIND=1)
+-- ===========================
+CREATE TABLE IF NOT EXISTS id_blocks (
+    name VARCHAR(50) PRIMARY KEY,
+    next_id BIGINT NOT NULL
+);
+
+-- ===========================
+-- Revocations Table (logout / revoke-user, shared by every worker)
+-- name is 'jti:<token or session id>' or 'user:<user id>'; for a user, every
+-- token and session issued at or before revoked_at (unix time) is invalid.
+-- ===========================
+CREATE TABLE IF NOT EXISTS revocations (
+    name VARCHAR(64) PRIMARY KEY,
+    revoked_at BIGINT NOT NULL,
+    expires_at BIGINT NOT NULL,
+    INDEX idx_expires (expires_at)
+);
+
+-- ===========================
+-- Regrade Jobs Table (progress of background regrades, so any worker
+-- can answer GET /api/admin/regrade/<id>)
+-- ===========================
+CREATE TABLE IF NOT EXISTS regrade_jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    quiz_id INT NOT NULL,
+    status ENUM('queued', 'running', 'finished', 'failed') NOT NULL DEFAULT 'queued',
+    processed INT NOT NULL DEFAULT 0,
+    changed INT NOT NULL DEFAULT 0,
+    skipped INT NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    started_at DOUBLE NULL,
+    finished_at DOUBLE NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE
+);
+
+-- ===========================
+-- Table Versions Table (version and last change of the tables behind
+-- HTTP ETags / Last-Modified, the same for every worker)
+-- ===========================
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at BIGINT NOT NULL
+);
+
+-- ===========================
+-- Attempt Answers Table (per-question answers, used for regrading)
+-- ===========================
+CREATE TABLE IF NOT EXISTS attempt_answers (
+    attempt_id INT NOT NULL,
+    question_id INT NOT NULL,
+    selected_option ENUM('A', 'B', 'C', 'D') NULL,
+    PRIMARY KEY (attempt_id, question_id),
+    FOREIGN KEY (attempt_id) REFERENCES attempts(id) ON DELETE CASCADE,
+    INDEX idx_question (question_id)
+);
+
+-- ===========================
+-- Attempt Answer Blobs Table (ANSWER_STORAGE=packed: one compact
+-- blob of question ids + option bytes per attempt)
+-- ===========================
+CREATE TABLE IF NOT EXISTS attempt_answer_blobs (
+    attempt_id INT PRIMARY KEY,
+    answers MEDIUMBLOB NOT NULL,
+    FOREIGN KEY (attempt_id) REFERENCES attempts(id) ON DELETE CASCADE
+);
+
+-- ===========================
+-- User Stats Table (leaderboard aggregate)
+-- Maintained incrementally by Attempt.complete_attempt;
+-- backfill with `flask rebuild-leaderboard`
+-- ===========================
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INT PRIMARY KEY,
+    total_attempts INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    avg_score DECIMAL(14,4) AS (total_score / NULLIF(total_attempts, 0)) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_rank (avg_score, total_score)
+);
+
+-- ===========================
+-- User Quiz Stats Table (per-quiz / per-category leaderboards)
+-- ===========================
+CREATE TABLE IF NOT EXISTS user_quiz_stats (
+    user_id INT NOT NULL,
+    quiz_id INT NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    best_score INT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, quiz_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE,
+    INDEX idx_quiz_best (quiz_id, best_score)
 );
 
 -- ===========================
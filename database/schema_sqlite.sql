@@ -0,0 +1,180 @@
+-- ===========================
+-- SQLite schema (DB_BACKEND=sqlite)
+-- Same tables as schema.sql; applied automatically to an empty database.
+-- No FULLTEXT indexes: search falls back to substring matching.
+-- ===========================
+
+-- ===========================
+-- Users Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(100) NOT NULL,
+    email VARCHAR(150) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    role TEXT NOT NULL DEFAULT 'user' CHECK (role IN ('user', 'admin')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_role ON users (role);
+
+-- ===========================
+-- Categories Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ===========================
+-- Quizzes Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS quizzes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
+    time_limit INTEGER DEFAULT 30,
+    created_by INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_category ON quizzes (category_id);
+CREATE INDEX IF NOT EXISTS idx_active_created ON quizzes (is_active, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_active_category_created ON quizzes (is_active, category_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_created_by ON quizzes (created_by);
+
+-- ===========================
+-- Questions Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+    question_text TEXT NOT NULL,
+    option_a VARCHAR(255) NOT NULL,
+    option_b VARCHAR(255) NOT NULL,
+    option_c VARCHAR(255) NOT NULL,
+    option_d VARCHAR(255) NOT NULL,
+    correct_option TEXT NOT NULL CHECK (correct_option IN ('A', 'B', 'C', 'D')),
+    points INTEGER DEFAULT 10,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_quiz ON questions (quiz_id);
+
+-- ===========================
+-- Attempts Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+    score INTEGER DEFAULT 0,
+    total_questions INTEGER DEFAULT 0,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_user ON attempts (user_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_quiz ON attempts (quiz_id);
+CREATE INDEX IF NOT EXISTS idx_completed ON attempts (completed_at, started_at);
+
+-- ===========================
+-- ID Blocks Table (write-behind attempt ids)
+-- ===========================
+CREATE TABLE IF NOT EXISTS id_blocks (
+    name VARCHAR(50) PRIMARY KEY,
+    next_id BIGINT NOT NULL
+);
+
+-- ===========================
+-- Revocations Table (logout / revoke-user)
+-- ===========================
+CREATE TABLE IF NOT EXISTS revocations (
+    name VARCHAR(64) PRIMARY KEY,
+    revoked_at BIGINT NOT NULL,
+    expires_at BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_expires ON revocations (expires_at);
+
+-- ===========================
+-- Regrade Jobs Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS regrade_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'finished', 'failed')),
+    processed INTEGER NOT NULL DEFAULT 0,
+    changed INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    started_at REAL NULL,
+    finished_at REAL NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ===========================
+-- Table Versions Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at BIGINT NOT NULL
+);
+
+-- ===========================
+-- Attempt Answers Table
+-- ===========================
+CREATE TABLE IF NOT EXISTS attempt_answers (
+    attempt_id INTEGER NOT NULL REFERENCES attempts(id) ON DELETE CASCADE,
+    question_id INTEGER NOT NULL,
+    selected_option TEXT NULL CHECK (selected_option IN ('A', 'B', 'C', 'D')),
+    PRIMARY KEY (attempt_id, question_id)
+);
+CREATE INDEX IF NOT EXISTS idx_question ON attempt_answers (question_id);
+
+-- ===========================
+-- Attempt Answer Blobs Table (ANSWER_STORAGE=packed)
+-- ===========================
+CREATE TABLE IF NOT EXISTS attempt_answer_blobs (
+    attempt_id INTEGER PRIMARY KEY REFERENCES attempts(id) ON DELETE CASCADE,
+    answers BLOB NOT NULL
+);
+
+-- ===========================
+-- User Stats Table (leaderboard aggregate)
+-- ===========================
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_attempts INTEGER NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    avg_score REAL GENERATED ALWAYS AS (CAST(total_score AS REAL) / NULLIF(total_attempts, 0)) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_rank ON user_stats (avg_score, total_score);
+
+-- ===========================
+-- User Quiz Stats Table (per-quiz / per-category leaderboards)
+-- ===========================
+CREATE TABLE IF NOT EXISTS user_quiz_stats (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    best_score INTEGER NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, quiz_id)
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_best ON user_quiz_stats (quiz_id, best_score);
+
+-- ===========================
+-- Sample Categories and Users (passwords: admin123 / user123)
+-- ===========================
+INSERT OR IGNORE INTO categories (name, description) VALUES
+('General Knowledge', 'Questions about general knowledge and current affairs'),
+('Science', 'Questions related to science and technology'),
+('Mathematics', 'Mathematical problems and equations'),
+('History', 'Historical events and figures'),
+('Programming', 'Computer programming and coding questions');
+
+INSERT OR IGNORE INTO users (username, email, password, role) VALUES
+('admin', 'admin@quiz.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYzS4HcbqRG', 'admin'),
+('john_doe', 'john@example.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYzS4HcbqRG', 'user');
@@ -49,38 +49,31 @@ async function createCategory() {
 
 async function loadAdminStats() {
     try {
-        // Load quizzes
-        const quizzesResponse = await fetch('/api/quizzes');
-        const quizzesData = await quizzesResponse.json();
-        
-        // Load categories
-        const categoriesResponse = await fetch('/api/categories');
-        const categoriesData = await categoriesResponse.json();
-        
-        // Update stats
-        if (document.getElementById('totalQuizzes')) {
-            document.getElementById('totalQuizzes').textContent = quizzesData.quizzes.length;
-        }
-        
-        if (document.getElementById('totalCategories')) {
-            document.getElementById('totalCategories').textContent = categoriesData.categories.length;
-        }
-        
-        // Count total questions
-        let totalQuestions = 0;
-        for (const quiz of quizzesData.quizzes) {
-            const questionsResponse = await fetch(`/api/admin/quizzes/${quiz.id}/questions`);
-            const questionsData = await questionsResponse.json();
-            totalQuestions += questionsData.questions.length;
+        // One aggregated call for every dashboard number
+        const response = await fetch('/api/admin/stats');
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.message || 'Failed to load stats');
         }
-        
-        if (document.getElementById('totalQuestions')) {
-            document.getElementById('totalQuestions').textContent = totalQuestions;
+
+        const totals = data.totals;
+        const cards = {
+            totalQuizzes: totals.quizzes,
+            totalQuestions: totals.questions,
+            totalCategories: totals.categories,
+            totalAttempts: totals.attempts,
+            averageScore: totals.average_score ?? '-',
+            activeTakers: totals.active_takers
+        };
+        for (const [id, value] of Object.entries(cards)) {
+            if (document.getElementById(id)) {
+                document.getElementById(id).textContent = value;
+            }
         }
-        
+
         // Display recent quizzes
-        displayRecentQuizzes(quizzesData.quizzes.slice(0, 5));
-        
+        displayRecentQuizzes(data.recent_quizzes.slice(0, 5));
+
     } catch (error) {
         console.error('Error loading stats:', error);
     }
@@ -1,14 +1,27 @@
 // quiz.js - Quiz functionality
 
-async function loadQuizzes() {
+const QUIZ_PAGE_SIZE = 20;
+let nextQuizCursor = null;
+
+async function loadQuizzes(more = false) {
     try {
-        const response = await fetch('/quizzes');  // FIXED
+        const params = new URLSearchParams({ limit: QUIZ_PAGE_SIZE });
+        if (more && nextQuizCursor) {
+            params.set('after', nextQuizCursor);
+        }
+        const response = await fetch(`/api/quizzes?${params}`);
         const data = await response.json();
 
         const container = document.getElementById('quizzesContainer');
-        container.innerHTML = '';
+        if (!more) {
+            container.innerHTML = '';
+        }
+        const loadMore = document.getElementById('loadMoreQuizzes');
+        if (loadMore) {
+            loadMore.remove();
+        }
 
-        if (!data.quizzes || data.quizzes.length === 0) {
+        if (!more && (!data.quizzes || data.quizzes.length === 0)) {
             container.innerHTML = '<p style="text-align: center; color: grey; grid-column: 1 / -1;">No quizzes available yet.</p>';
             return;
         }
@@ -25,6 +38,17 @@ async function loadQuizzes() {
 
             container.appendChild(quizCard);
         });
+
+        nextQuizCursor = data.next;
+        if (nextQuizCursor) {
+            const button = document.createElement('button');
+            button.id = 'loadMoreQuizzes';
+            button.className = 'btn btn-secondary';
+            button.style.gridColumn = '1 / -1';
+            button.textContent = 'Load more quizzes';
+            button.addEventListener('click', () => loadQuizzes(true));
+            container.appendChild(button);
+        }
     } catch (error) {
         console.error('Error loading quizzes:', error);
         document.getElementById('quizzesContainer').innerHTML =
@@ -32,6 +56,40 @@ async function loadQuizzes() {
     }
 }
 
+async function searchQuizzes(text) {
+    if (text.length < 3) {
+        return loadQuizzes();
+    }
+    try {
+        const response = await fetch(`/api/search?type=quizzes&q=${encodeURIComponent(text)}`);
+        const data = await response.json();
+
+        const container = document.getElementById('quizzesContainer');
+        container.innerHTML = '';
+        nextQuizCursor = null;
+
+        if (!data.quizzes || data.quizzes.length === 0) {
+            container.innerHTML = '<p style="text-align: center; color: grey; grid-column: 1 / -1;">No quizzes match your search.</p>';
+            return;
+        }
+
+        data.quizzes.forEach(quiz => {
+            const quizCard = document.createElement('div');
+            quizCard.className = 'quiz-card';
+
+            quizCard.innerHTML = `
+                <h3 class="quiz-title">${quiz.title}</h3>
+                <p class="quiz-description">${quiz.description}</p>
+                <button class="btn btn-primary" onclick="startQuiz(${quiz.id})">Start Quiz</button>
+            `;
+
+            container.appendChild(quizCard);
+        });
+    } catch (error) {
+        console.error('Error searching quizzes:', error);
+    }
+}
+
 function startQuiz(id) {
     window.location.href = `/quiz/${id}`;
 }